@@ -0,0 +1,226 @@
+# benchmarks/load.py
+"""
+Last-/Skalierungstest: der echte Stack (DataHandler + TradingStrategy pro Symbol)
+gegen den simulierten Broker mit konfigurierbarer API-Latenz. Kursdaten kommen aus
+sim/market_data.py; eine Uhr-Thread treibt die Simulator-Zeit mit --speeds
+Simulator-Sekunden pro Wall-Sekunde voran (60 = eine M1-Kerze pro Sekunde).
+
+Für jede Kombination aus Symbolanzahl und Geschwindigkeit wird gemessen:
+    setup        Dauer des parallelen Starts aller Symbole (startup.py)
+    cycle        Dauer eines Poll-Zyklus des Run-Loops (p50/p99)
+    lag          Erkennung der Kerze → Ende aller Callbacks (p50/p99, inkl. Inbox-Wartezeit)
+    bars/s       ausgelieferte Kerzen pro Sekunde, missed = erwartete − ausgelieferte E-Kerzen
+    CPU, RSS     Prozess-CPU in % eines Kerns und Speicher, jeweils auch pro Symbol
+
+    python -m benchmarks.load --symbols 50 100 200 --latency-ms 1 --duration 20
+    python -m benchmarks.load --symbols 100 --speeds 60 300 --dispatch inline --out load.json
+    python -m benchmarks.load --symbols 50 --tick-mode   # Tickstrom aus dem Tick-Replay des Simulators
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+# Simulator vor allen Bot-Imports als MetaTrader5 registrieren
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sim import mt5_sim, market_data
+mt5_sim.install()
+
+import config.runtime as runtime_cfg
+runtime_cfg.CHECKPOINT_ENABLED = False
+import MetaTrader5 as mt5
+import data_handler as data_handler_module
+from config.timeframes import K, B, E
+from core.latency import recorder as latency, LatencyHistogram
+from core.metrics import metrics, _rss_bytes
+from data_handler import DataHandler
+from core.events import BarClosed
+from startup import StartupOrchestrator
+
+# Montag 00:00 UTC; nach WARMUP_DAYS liegt die Simulator-Uhr an einem Handelstag
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+WARMUP_DAYS = 8
+CLOCK_TICK = 0.01
+
+
+def _merge(stage: str) -> LatencyHistogram:
+    """Fasst die Histogramme einer Stage über alle Symbole/TFs zusammen."""
+    merged = LatencyHistogram()
+    for (_, _, name), hist in list(latency._hists.items()):
+        if name != stage:
+            continue
+        merged.counts = [a + b for a, b in zip(merged.counts, hist.counts)]
+        merged.count += hist.count
+        merged.max = max(merged.max, hist.max)
+    return merged
+
+
+def _ms(hist: LatencyHistogram, q: float) -> float:
+    return hist.percentile(q) / 1e6
+
+
+def run_step(n_symbols: int, speed: float, duration: float, latency_ms: float, jitter_ms: float,
+             dispatch: str, poll: float, seed: int, tick_mode: bool = False) -> Dict:
+    symbols = market_data.symbol_names(n_symbols)
+    days = WARMUP_DAYS + duration * speed / 86400.0 + 1.0
+    data = market_data.generate_market(symbols, START, days, seed=seed)
+    start_now = int((START + timedelta(days=WARMUP_DAYS)).timestamp())
+
+    mt5_sim.reset(now=start_now)
+    market_data.load_into_sim(data)
+    mt5_sim.configure(latency=latency_ms / 1e3, jitter=jitter_ms / 1e3)
+    latency.reset()
+    data_handler_module.POLL_INTERVAL = poll
+    data_handler_module.TICK_POLL_INTERVAL = poll
+
+    # Poll-Zyklen über die vorhandene Messstelle loop_cycle_seconds abgreifen
+    cycles = LatencyHistogram()
+    observe = metrics.observe
+
+    def observe_cycle(name, value, labels=None, help_text=""):
+        if name == "loop_cycle_seconds":
+            cycles.record(int(value * 1e9))
+        observe(name, value, labels, help_text)
+
+    rss0 = _rss_bytes() or 0.0
+    threads0 = threading.active_count()
+    handler = DataHandler(mt5)
+    handler.dispatch_mode = dispatch
+    handler.tick_mode = tick_mode
+    # Sim-Zeit statt Wall-Clock: Polling unabhängig vom Session-Kalender messen
+    handler.session_polling = False
+    delivered = {"n": 0}
+
+    t_setup = time.perf_counter()
+    startup = StartupOrchestrator(handler, symbols)
+    startup.start(mt5.account_info().balance, startup.load_symbol_params())
+    for sym in symbols:
+        # Callback-Ende relativ zur Erkennung im Poll messen: Empfänger mit niedrigster
+        # Priorität läuft nach allen Strategie-Callbacks derselben Kerze
+        for tf in handler.series[sym]:
+            handler.bus.subscribe(BarClosed, _timed(sym, tf, delivered), symbol=sym, tf=tf, priority=-100)
+    setup_s = time.perf_counter() - t_setup
+
+    metrics.observe = observe_cycle
+    metrics.enabled, was_enabled = True, metrics.enabled
+    latency.enabled, lat_was_enabled = True, latency.enabled
+    stop = threading.Event()
+
+    def clock():
+        t0 = time.monotonic()
+        while not stop.is_set():
+            mt5_sim.set_time(start_now + int((time.monotonic() - t0) * speed))
+            time.sleep(CLOCK_TICK)
+
+    cpu0, wall0 = time.process_time(), time.monotonic()
+    clock_thread = threading.Thread(target=clock, name="sim-clock", daemon=True)
+    loop_thread = threading.Thread(target=handler.run, name="load-loop", daemon=True)
+    clock_thread.start()
+    loop_thread.start()
+    time.sleep(duration)
+    stop.set()
+    handler.stop()
+    loop_thread.join(timeout=max(5.0, poll * 2))
+    clock_thread.join()
+    wall = time.monotonic() - wall0
+    cpu = time.process_time() - cpu0
+    rss = _rss_bytes() or 0.0
+    threads = threading.active_count()
+
+    metrics.observe = observe
+    metrics.enabled = was_enabled
+    latency.enabled = lat_was_enabled
+
+    sim_seconds = mt5_sim.now() - start_now
+    m1 = data[(symbols[0], E)]["time"]
+    expected_e = int(((m1 > start_now) & (m1 <= start_now + sim_seconds - 60)).sum()) * n_symbols
+    delivered_e = _merge("detect_to_done").count
+    lag = _merge("detect_to_done")
+    queue_wait = _merge("detect_to_deliver")
+    return {
+        "symbols": n_symbols,
+        "speed": speed,
+        "latency_ms": latency_ms,
+        "dispatch": dispatch,
+        "tick_mode": tick_mode,
+        "setup_s": setup_s,
+        "cycles": cycles.count,
+        "cycle_p50_ms": _ms(cycles, 50),
+        "cycle_p99_ms": _ms(cycles, 99),
+        "lag_p50_ms": _ms(lag, 50),
+        "lag_p99_ms": _ms(lag, 99),
+        "queue_p99_ms": _ms(queue_wait, 99),
+        "bars_per_s": delivered["n"] / wall,
+        "missed_e": max(0, expected_e - delivered_e),
+        "cpu_pct": 100.0 * cpu / wall,
+        "cpu_pct_per_symbol": 100.0 * cpu / wall / n_symbols,
+        "rss_mb": rss / 2**20,
+        "rss_kb_per_symbol": (rss - rss0) / 1024 / n_symbols,
+        "threads": threads - threads0,
+        "broker_calls": sum(mt5_sim.call_counts().values()),
+    }
+
+
+def _timed(symbol: str, tf: int, delivered: Dict[str, int]):
+    stage = "detect_to_done" if tf == E else f"detect_to_done_{tf}"
+
+    def done(event):
+        delivered["n"] += 1
+        latency.since_detected(symbol, tf, event.candle.timestamp, stage)
+    return done
+
+
+def print_row(r: Dict) -> None:
+    print(
+        f"{r['symbols']:>5} {r['speed']:>6.0f} {r['dispatch']:>8} {r['setup_s']:>8.1f}"
+        f"{r['cycle_p50_ms']:>9.1f}{r['cycle_p99_ms']:>9.1f}{r['lag_p50_ms']:>9.1f}{r['lag_p99_ms']:>9.1f}"
+        f"{r['bars_per_s']:>8.0f}{r['missed_e']:>7}{r['cpu_pct']:>7.0f}{r['cpu_pct_per_symbol']:>8.2f}"
+        f"{r['rss_mb']:>8.0f}{r['rss_kb_per_symbol']:>9.0f}"
+    )
+
+
+HEADER = (
+    f"{'sym':>5} {'speed':>6} {'dispatch':>8} {'setup s':>8}{'cyc p50':>9}{'cyc p99':>9}"
+    f"{'lag p50':>9}{'lag p99':>9}{'bars/s':>8}{'missed':>7}{'CPU %':>7}{'CPU/sym':>8}{'RSS MB':>8}{'KB/sym':>9}"
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Last-Test des Bot-Stacks gegen den simulierten Broker")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--speeds", type=float, nargs="+", default=[60.0],
+                        help="Simulator-Sekunden pro Wall-Sekunde (60 = eine M1-Kerze/s)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Messdauer pro Stufe (s)")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="simulierte Latenz pro API-Aufruf")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--dispatch", choices=("threaded", "inline"), default=runtime_cfg.DISPATCH_MODE)
+    parser.add_argument("--poll", type=float, default=0.05, help="Poll-Intervall des Run-Loops (s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tick-mode", action="store_true", help="DataHandler im Tick-Modus betreiben")
+    parser.add_argument("--out", default=None, help="Ergebnisse als JSON schreiben")
+    args = parser.parse_args(argv)
+
+    results: List[Dict] = []
+    print(HEADER)
+    for n in args.symbols:
+        for speed in args.speeds:
+            # Bot-Ausgaben (DEBUG-Prints) verwerfen, sie würden die Messung dominieren
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                r = run_step(n, speed, args.duration, args.latency_ms, args.jitter_ms,
+                             args.dispatch, args.poll, args.seed, args.tick_mode)
+            results.append(r)
+            print_row(r)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": vars(args), "results": results}, f, indent=2)
+        print(f"[BENCH] Ergebnisse → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
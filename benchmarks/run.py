@@ -0,0 +1,290 @@
+# benchmarks/run.py
+"""
+Micro-/Makro-Benchmarks für Indikatoren, FSM, Entry-/Risk-Logik und Controller.
+Läuft gegen den simulierten Broker (sim/mt5_sim.py) mit synthetischen Kursdaten.
+
+    python -m benchmarks.run                              # alle Cases, 100/1k/10k Bars
+    python -m benchmarks.run --sizes 100 1000 --filter fsm
+    python -m benchmarks.run --out bench.json --baseline benchmarks/baseline.json
+
+Ergebnisse landen als JSON (Median/p90/Min in µs pro Aufruf). Mit --baseline werden
+Cases, deren Median um mehr als --threshold schlechter ist, als Regression markiert
+(Exit-Code 1).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Simulator vor allen Bot-Imports als MetaTrader5 registrieren
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sim import mt5_sim
+mt5_sim.install()
+
+import config.runtime as runtime_cfg
+runtime_cfg.CHECKPOINT_ENABLED = False
+import MetaTrader5 as mt5
+from config.timeframes import HISTORY_LIMIT, K, B, E
+from config.phase import is_base_switch_bull
+from config.entry_logic import ConfigEntryLogic
+from core.phase_manager import PhaseStateMachine
+from core.phase_state import PhaseState
+from core.risk_manager import RiskManager
+from core.stop_manager import StopManager
+from core.types import Candle, Phase
+import core.tf_manager as tf_manager
+from data_handler import DataHandler, calc_ema
+from core.prices import to_price
+
+SYMBOL = "EURUSD"
+DEFAULT_SIZES = (100, 1_000, 10_000)
+
+# Ein Case: name → setup(size) liefert die zu messende Funktion (ohne Argumente)
+Case = Callable[[int], Callable[[], object]]
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str):
+    def register(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+    return register
+
+
+# ---------------- Hilfen ----------------
+
+def _fresh_broker() -> None:
+    mt5_sim.reset(now=1_700_000_000 // 3600 * 3600)
+    mt5_sim.add_symbol(SYMBOL)
+
+
+def _candles(size: int, extra: int = 0, tf: int = E) -> List[Candle]:
+    """size + extra abgeschlossene Kerzen aus dem Simulator."""
+    _fresh_broker()
+    handler = DataHandler(mt5)
+    candles = handler.fetch_history(SYMBOL, tf, size + extra)
+    handler.executor.stop()
+    return candles
+
+
+def _set_history_limit(size: int) -> None:
+    for tf in (K, B, E):
+        HISTORY_LIMIT[tf] = size
+
+
+# ---------------- Cases ----------------
+
+@case("indicators.calc_ema")
+def bench_calc_ema(size: int):
+    closes = [c.close for c in _candles(size)]
+    return lambda: calc_ema(closes, 20)
+
+
+@case("data.fetch_history")
+def bench_fetch_history(size: int):
+    _fresh_broker()
+    handler = DataHandler(mt5)
+    handler.fetch_history(SYMBOL, E, size)  # Simulator-Serie einmalig erzeugen
+    return lambda: handler.fetch_history(SYMBOL, E, size)
+
+
+@case("data.append_and_get")
+def bench_append_and_get(size: int):
+    candles = _candles(size, extra=5_000)
+    _set_history_limit(size)
+    handler = DataHandler(mt5)
+    handler.history.seed(SYMBOL, E, list(candles[:size]))
+    feed = iter(candles[size:])
+    return lambda: handler.append_and_get(SYMBOL, E, next(feed))
+
+
+@case("fsm.update_with_candle")
+def bench_update_with_candle(size: int):
+    candles = _candles(size, extra=5_000)
+    fsm = PhaseStateMachine()
+    fsm.replay_batch(candles[:size])
+    feed = iter(candles[size:])
+    return lambda: fsm.update_with_candle(next(feed))
+
+
+@case("fsm.replay_from_scratch")
+def bench_replay_from_scratch(size: int):
+    candles = _candles(size)
+    fsm = PhaseStateMachine()
+    return lambda: fsm.replay_from_scratch(candles)
+
+
+@case("phase.is_base_switch_bull")
+def bench_is_base_switch_bull(size: int):
+    candles = _candles(size)
+    fsm = PhaseStateMachine()
+    fsm.replay_batch(candles)
+    ctx: PhaseState = fsm.state
+    return lambda: is_base_switch_bull(Phase.BASE_BULL, candles, ctx)
+
+
+@case("entry.check_buy_stop")
+def bench_check_buy_stop(size: int):
+    candles = _candles(size)
+    fsm = PhaseStateMachine()
+    fsm.replay_batch(candles)
+    logic = ConfigEntryLogic(fsm, spread=0.0001)
+    logic.pm.current_phase = Phase.BASE_SWITCH_BULL
+    logic._is_within_allowed_time = lambda: True  # unabhängig von der Uhrzeit messen
+    ask = to_price(candles[-1].close, 0.00001) + 0.0001
+    return lambda: logic.check_buy_stop(candles, ask, 10, 0.00001)
+
+
+@case("risk.try_trailing")
+def bench_try_trailing(size: int):
+    """Ein kompletter Trailing-Zyklus: Submit → Executor (order_check/send) → Verifikation."""
+    candles = _candles(size)
+    handler = DataHandler(mt5)
+    risk = RiskManager(10_000)
+    risk.executor = handler.executor
+    point = mt5.symbol_info(SYMBOL).point
+    entry = to_price(candles[-1].close, point) - 0.0050
+    req = {'action': mt5.TRADE_ACTION_DEAL, 'symbol': SYMBOL, 'type': mt5.ORDER_TYPE_BUY,
+           'volume': 0.1, 'price': entry, 'sl': entry - 0.0010}
+    ticket = mt5.order_send(req).order
+    stops = StopManager(ticket, 'buy', entry, entry - 0.0010, 0.0001, point, candles[0].timestamp)
+    stops.seed(candles)
+    stops.level = max(stops.level, 3)
+
+    def cycle():
+        risk.trailing_levels[ticket] = 0
+        risk.executor.forget()  # Idempotenz-Gedächtnis leeren, sonst nur ein echter Send
+        fut = risk.try_trailing(SYMBOL, 'buy', entry - 0.0010, ticket, stops)
+        risk.executor.drain(timeout=5.0)
+        risk.verify_pending(mt5.positions_get(symbol=SYMBOL))
+        sl = fut.result(timeout=5.0)
+        mt5_sim.order_send({'action': mt5.TRADE_ACTION_SLTP, 'position': ticket, 'sl': entry - 0.0010})
+        return sl
+    return cycle
+
+
+@case("controller.on_new_candle")
+def bench_on_new_candle(size: int):
+    """Makro: neue M1-Kerze pollen und über deliver() durch den kompletten Controller schicken."""
+    _fresh_broker()
+    _set_history_limit(size)
+    handler = DataHandler(mt5)
+    handler.dispatch_mode = "inline"
+    controller = tf_manager.MultiTimeframeController(SYMBOL, handler, 10_000, 0.00001, 0.0001)
+    for tf in (K, B, E):
+        handler.subscribe(SYMBOL, tf, lambda c, tf=tf: controller.on_new_candle(tf, c))
+    controller.initialize()
+    handler._last_times = {SYMBOL: {E: handler.histories[SYMBOL][E][-1].timestamp}}
+
+    def step():
+        mt5_sim.advance(60)
+        candle = handler.poll_closed_bar(SYMBOL, E)
+        if candle is not None:
+            handler.deliver(SYMBOL, E, candle)
+    return step
+
+
+# ---------------- Runner ----------------
+
+def measure(fn: Callable[[], object], min_time: float, max_runs: int, min_runs: int = 3) -> Dict[str, float]:
+    samples: List[int] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() < deadline):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "median_us": statistics.median(samples) / 1e3,
+        "p90_us": samples[int(0.9 * (len(samples) - 1))] / 1e3,
+        "min_us": samples[0] / 1e3,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, name_filter: Optional[str], min_time: float, max_runs: int) -> Dict:
+    results: Dict[str, Dict[str, float]] = {}
+    saved_limits = dict(HISTORY_LIMIT)
+    for name, setup in CASES.items():
+        if name_filter and name_filter not in name:
+            continue
+        for size in sizes:
+            key = f"{name}[{size}]"
+            # Bot-Ausgaben (DEBUG-Prints) während Setup und Messung verwerfen
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                fn = setup(size)
+                stats = measure(fn, min_time, max_runs)
+            HISTORY_LIMIT.update(saved_limits)
+            results[key] = stats
+            print(f"{key:<40}{stats['median_us']:>12.1f} µs  (p90 {stats['p90_us']:.1f}, n={stats['runs']})")
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Tuple[str, float, float]]:
+    """Liefert (case, baseline_us, current_us) für alle Cases mit Median > baseline * (1 + threshold)."""
+    regressions = []
+    for key, stats in current["results"].items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        if stats["median_us"] > base["median_us"] * (1.0 + threshold):
+            regressions.append((key, base["median_us"], stats["median_us"]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks gegen den simulierten Broker")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--filter", default=None, help="nur Cases, deren Name diesen Text enthält")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Messdauer pro Case/Größe (s)")
+    parser.add_argument("--max-runs", type=int, default=2000)
+    parser.add_argument("--out", default=None, help="Ergebnis als JSON schreiben")
+    parser.add_argument("--baseline", default=None, help="JSON eines früheren Laufs zum Vergleich")
+    parser.add_argument("--threshold", type=float, default=0.25, help="erlaubte Verschlechterung (0.25 = +25 %%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.filter, args.min_time, args.max_runs)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Ergebnisse → {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for key, base_us, cur_us in regressions:
+            print(f"[REGRESSION] {key}: {base_us:.1f} µs → {cur_us:.1f} µs ({cur_us / base_us - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"[BENCH] Keine Regressionen gegenüber {args.baseline} (Schwelle {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,41 +5,46 @@ from config.phase import (
     is_confirmation_bullish,
     is_confirmation_bearish
 )
-from datetime import datetime, time
-import pytz
 import math
 from config.phase import EMA_FAST_PERIOD, EMA_SLOW_PERIOD
 import pandas as pd
 from config.phase import ensure_list_of_candles
+from core.spread import SpreadTracker
+from core.sessions import calendar as sessions
+from core.prices import to_points, to_price
 
 # Fallback für Mindestabstand, falls Broker keine trade_stops_level liefert
 default_stop_level_points = 10
 
 
 class ConfigEntryLogic:
-    def __init__(self, phase_machine: PhaseStateMachine, spread: float):
+    def __init__(self, phase_machine: PhaseStateMachine, spread: float, spreads: Optional[SpreadTracker] = None):
         self.pm = phase_machine
         self.spread = spread
+        self.spreads = spreads
         self.default_stop_level_points = default_stop_level_points
 
-    def _min_dist(self, stop_level: float, tick_size: float) -> float:
+    def _spread_now(self) -> float:
+        """Aktueller Spread für den Entry-Offset (Startwert ohne Tracker)."""
+        value = self.spreads.current() if self.spreads else None
+        return self.spread if value is None else value
+
+    def _spread_typical(self) -> float:
+        """Typischer Spread für den SL-Puffer, unempfindlich gegen einzelne Ausreißer."""
+        value = self.spreads.typical() if self.spreads else None
+        return self.spread if value is None else value
+
+    def _min_dist(self, stop_level: float) -> int:
         """
-        Berechnet den minimalen Preisabstand (in Preis, nicht in Pips!) für Stop-Orders.
-        Gibt mindestens die Tickgröße zurück, selbst wenn stop_level=0.
+        Berechnet den minimalen Abstand für Stop-Orders in Punkten (wie die Kerzen).
+        Gibt mindestens einen Punkt zurück, selbst wenn stop_level=0.
         """
         level = stop_level if stop_level and stop_level > 0 else self.default_stop_level_points
-        return max(level * tick_size, tick_size)
+        return max(int(level), 1)
 
-    #Einstigeszeiten definieren
+    #Einstigeszeiten definieren (SESSION_WINDOWS in config/runtime.py, siehe core/sessions.py)
     def _is_within_allowed_time(self) -> bool:
-        berlin = pytz.timezone('Europe/Berlin')
-        now = datetime.now(berlin).timetz()
-        allowed = [
-            (time(8, 0), time(12, 00)),
-            (time(13, 0), time(15, 0)),
-            (time(15, 00), time(20, 0)),
-        ]
-        return any(start <= now <= end for start, end in allowed)
+        return sessions.is_trading()
 
     def check_buy_stop(self, candles: List[Candle], current_ask: float, stop_level: float, tick_size: float) -> Optional[Dict[str, float]]:
         if not self._is_within_allowed_time():
@@ -78,12 +83,15 @@ class ConfigEntryLogic:
         if prev_higher is None or initial_low is None:
             return None
 
+        # Gerechnet wird in Punkten (Kerzen, EMAs); Preise nur für Ask/Spread und das Ergebnis
         prev = candles[-2]
-        min_dist = max(self._min_dist(stop_level, tick_size), tick_size)
-        desired_entry = prev.high + self.spread
+        ask = to_points(current_ask, tick_size)
+        min_dist = self._min_dist(stop_level)
+        spread = self._spread_now()
+        desired_entry = prev.high + to_points(spread, tick_size)
 
-        if desired_entry - current_ask < min_dist:
-            entry_price = current_ask + min_dist + tick_size
+        if desired_entry - ask < min_dist:
+            entry_price = ask + min_dist + 1
         else:
             entry_price = desired_entry
 
@@ -98,23 +106,23 @@ class ConfigEntryLogic:
         dist_slow = abs(curr_close - ema_slow)
         ema_ref = ema_fast if dist_fast > dist_slow else ema_slow
 
-        stop_loss = ema_ref - 2 * self.spread
+        stop_loss = round(ema_ref - 2 * to_points(self._spread_typical(), tick_size))
         min_broker_dist = min_dist
 
-        if entry_price < current_ask + min_broker_dist:
-            entry_price = current_ask + min_broker_dist + tick_size
+        if entry_price < ask + min_broker_dist:
+            entry_price = ask + min_broker_dist + 1
         if abs(entry_price - stop_loss) < min_broker_dist:
             stop_loss = entry_price - min_broker_dist
 
-        entry_price = round(entry_price / tick_size) * tick_size
-        stop_loss = round(stop_loss / tick_size) * tick_size
+        entry_price = to_price(entry_price, tick_size)
+        stop_loss = to_price(stop_loss, tick_size)
 
         if stop_loss >= entry_price:
             print(f"[ERROR] SL >= Entry nach Adjustierung! SL={stop_loss}, Entry={entry_price}")
             return None
 
         print(
-            f"[DEBUG] check_buy_stop: prev.high={prev.high}, spread={self.spread}, "
+            f"[DEBUG] check_buy_stop: prev.high={prev.high}, spread={spread}, "
             f"stop_loss={stop_loss}, entry_price={entry_price}, ask={current_ask}, "
             f"min_broker_dist={min_broker_dist}"
         )
@@ -169,12 +177,15 @@ class ConfigEntryLogic:
         if prev_lower is None or initial_high is None:
             return None
 
+        # Gerechnet wird in Punkten (Kerzen, EMAs); Preise nur für Bid/Spread und das Ergebnis
         prev = candles[-2]
-        min_dist = max(self._min_dist(stop_level, tick_size), tick_size)
-        desired_entry = prev.low - self.spread
+        bid = to_points(current_bid, tick_size)
+        min_dist = self._min_dist(stop_level)
+        spread = self._spread_now()
+        desired_entry = prev.low - to_points(spread, tick_size)
 
-        if current_bid - desired_entry < min_dist:
-            entry_price = current_bid - min_dist - tick_size
+        if bid - desired_entry < min_dist:
+            entry_price = bid - min_dist - 1
         else:
             entry_price = desired_entry
 
@@ -190,24 +201,24 @@ class ConfigEntryLogic:
         ema_ref = ema_fast if dist_fast > dist_slow else ema_slow
 
         # Stop-Loss 2× Spread über weitestem EMA
-        stop_loss = ema_ref + 2 * self.spread
+        stop_loss = round(ema_ref + 2 * to_points(self._spread_typical(), tick_size))
 
         min_broker_dist = min_dist
 
-        if current_bid - entry_price < min_broker_dist:
-            entry_price = current_bid - min_broker_dist - tick_size
+        if bid - entry_price < min_broker_dist:
+            entry_price = bid - min_broker_dist - 1
         if abs(stop_loss - entry_price) < min_broker_dist:
             stop_loss = entry_price + min_broker_dist
 
-        entry_price = round(entry_price / tick_size) * tick_size
-        stop_loss = round(stop_loss / tick_size) * tick_size
+        entry_price = to_price(entry_price, tick_size)
+        stop_loss = to_price(stop_loss, tick_size)
 
         if stop_loss <= entry_price:
             print(f"[ERROR] SL <= Entry nach Adjustierung! SL={stop_loss}, Entry={entry_price}")
             return None
 
         print(
-            f"[DEBUG] check_sell_stop: prev.low={prev.low}, spread={self.spread}, "
+            f"[DEBUG] check_sell_stop: prev.low={prev.low}, spread={spread}, "
             f"stop_loss={stop_loss}, entry_price={entry_price}, bid={current_bid}, "
             f"min_broker_dist={min_broker_dist}"
         )
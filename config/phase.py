@@ -4,6 +4,13 @@ from datetime import datetime
 import pandas as pd
 from typing import Optional
 from core.phase_state import PhaseState
+from core.debug import debug_enabled
+
+
+def _debug(msg: str, *args, tag: str = "DEBUG") -> None:
+    """Debug-Ausgabe der Phasen-Regeln/FSM; formatiert (%-Stil) nur, wenn Debug im Thread aktiv ist."""
+    if debug_enabled():
+        print(f"[{tag}] " + (msg % args if args else msg))
 
 
 def ensure_list_of_candles(values: Any) -> List[Candle]:
@@ -51,31 +58,31 @@ EMA_SLOW_PERIOD = 20
 def is_confirmation_bullish(prev_phase: Phase, candles_input: Any, context: PhaseState) -> bool:
     candles = ensure_list_of_candles(candles_input)
     if len(candles) < 2:
-        print("[DEBUG] is_confirmation_bullish: Zu wenige Kerzen")
+        _debug("is_confirmation_bullish: Zu wenige Kerzen")
         return False
 
     if prev_phase not in (Phase.SWITCH_BULL, Phase.TREND_BULL):
-        print(f"[DEBUG] is_confirmation_bullish: Falsche Phase {prev_phase}")
+        _debug("is_confirmation_bullish: Falsche Phase %s", prev_phase)
         return False
 
     conf = context.last_confirmation_bullish
     if conf and conf.valid:
-        print("[DEBUG] is_confirmation_bullish: Schon bestätigt")
+        _debug("is_confirmation_bullish: Schon bestätigt")
         return False
 
     prev = candles[-2]
     curr = candles[-1]
-    print(f"[DEBUG] Prüfe Kerzen: prev_high={prev.high}, curr_high={curr.high}, curr_close={curr.close}")
+    _debug("Prüfe Kerzen: prev_high=%s, curr_high=%s, curr_close=%s", prev.high, curr.high, curr.close)
 
     # Symmetrische Bedingung zur Bearish-Version:
     if curr.high > prev.high:
-        print("[DEBUG] curr.high > prev.high -> kein bullish confirmation")
+        _debug("curr.high > prev.high -> kein bullish confirmation")
         return False
 
     ema_fast = getattr(curr, "ema10", None)
     ema_slow = getattr(curr, "ema20", None)
     if ema_fast is None or ema_slow is None:
-        print("[DEBUG] EMA Werte fehlen")
+        _debug("EMA Werte fehlen")
         return False
 
     dist_fast = abs(curr.close - ema_fast)
@@ -83,10 +90,10 @@ def is_confirmation_bullish(prev_phase: Phase, candles_input: Any, context: Phas
     
     # Prüfe, ob Schlusskurs unter beiden EMAs liegt - dann kein bullish confirmation
     if curr.close < ema_fast and curr.close < ema_slow:
-        print("[DEBUG] curr.close unter beiden EMAs -> kein bullish confirmation")
+        _debug("curr.close unter beiden EMAs -> kein bullish confirmation")
         return False
 
-    print("[DEBUG] is_confirmation_bullish: Bestätigung erkannt")
+    _debug("is_confirmation_bullish: Bestätigung erkannt")
     return True
 
 
@@ -98,29 +105,29 @@ def is_confirmation_bullish(prev_phase: Phase, candles_input: Any, context: Phas
 def is_confirmation_bearish(prev_phase: Phase, candles_input: Any, context: PhaseState) -> bool:
     candles = ensure_list_of_candles(candles_input)
     if len(candles) < 2:
-        print("[DEBUG] is_confirmation_bearish: Zu wenige Kerzen")
+        _debug("is_confirmation_bearish: Zu wenige Kerzen")
         return False
     if prev_phase not in (Phase.SWITCH_BEAR, Phase.TREND_BEAR):
-        print(f"[DEBUG] is_confirmation_bearish: Falsche Phase {prev_phase}")
+        _debug("is_confirmation_bearish: Falsche Phase %s", prev_phase)
         return False
 
     conf = context.last_confirmation_bearish
     if conf and conf.valid:
-        print("[DEBUG] is_confirmation_bearish: Schon bestätigt")
+        _debug("is_confirmation_bearish: Schon bestätigt")
         return False
 
     prev = candles[-2]
     curr = candles[-1]
-    print(f"[DEBUG] Prüfe Kerzen: prev_low={prev.low}, curr_low={curr.low}, curr_close={curr.close}")
+    _debug("Prüfe Kerzen: prev_low=%s, curr_low=%s, curr_close=%s", prev.low, curr.low, curr.close)
 
     if curr.low < prev.low:
-        print("[DEBUG] curr.low < prev.low -> kein bearish confirmation")
+        _debug("curr.low < prev.low -> kein bearish confirmation")
         return False
 
     ema_fast = getattr(curr, "ema10", None)
     ema_slow = getattr(curr, "ema20", None)
     if ema_fast is None or ema_slow is None:
-        print("[DEBUG] EMA Werte fehlen")
+        _debug("EMA Werte fehlen")
         return False
 
     dist_fast = abs(curr.close - ema_fast)
@@ -128,23 +135,18 @@ def is_confirmation_bearish(prev_phase: Phase, candles_input: Any, context: Phas
 
     # Prüfe, ob Schlusskurs über beiden EMAs liegt - dann kein bearish confirmation
     if curr.close > ema_fast and curr.close > ema_slow:
-        print("[DEBUG] curr.close über beiden EMAs -> kein bearish confirmation")
+        _debug("curr.close über beiden EMAs -> kein bearish confirmation")
         return False
 
-    print("[DEBUG] is_confirmation_bearish: Bestätigung erkannt")
+    _debug("is_confirmation_bearish: Bestätigung erkannt")
     return True
 
 
-
-
-
-
-
 # 1. Switch_Bull
 def is_switch_bull(prev_phase: Phase, candles_input: Any, context: PhaseState) -> bool:
-    print(f"[DEBUG] Kontext-Typ: {type(context)}")
-    print(f"[DEBUG] Kontext-ID: {id(context)}")
-    print(f"[DEBUG Bswitch bull] Prev={prev_phase}, Candles={len(candles_input)}")
+    _debug("Kontext-Typ: %s", type(context))
+    _debug("Kontext-ID: %s", id(context))
+    _debug("Bswitch bull: Prev=%s, Candles=%s", prev_phase, len(candles_input))
     candles = ensure_list_of_candles(candles_input)
 
     allowed = {
@@ -161,7 +163,7 @@ def is_switch_bull(prev_phase: Phase, candles_input: Any, context: PhaseState) -
         context.switch_bull_initial_low is not None and
         context.switch_bull_prev_higher_high is not None
     ):
-        print("[DEBUG] Kontextwerte für switch_bull sind bereits gesetzt, kein Phasenwechsel")
+        _debug("Kontextwerte für switch_bull sind bereits gesetzt, kein Phasenwechsel")
         return False
 
     curr_idx = len(candles) - 1
@@ -211,7 +213,7 @@ def is_switch_bull(prev_phase: Phase, candles_input: Any, context: PhaseState) -
     context.switch_bull_initial_low = initial_low
     context.switch_bull_prev_higher_high = prev_higher_high
 
-    print(f"[DEBUG] switch_bull context gesetzt: initial_low={initial_low}, prev_higher_high={prev_higher_high}")
+    _debug("switch_bull context gesetzt: initial_low=%s, prev_higher_high=%s", initial_low, prev_higher_high)
 
     return True
 
@@ -222,9 +224,9 @@ def is_switch_bull(prev_phase: Phase, candles_input: Any, context: PhaseState) -
 
 # 2. Switch_Bear
 def is_switch_bear(prev_phase: Phase, candles_input: Any, context: PhaseState) -> bool:
-    print(f"[DEBUG] Kontext-Typ: {type(context)}")
-    print(f"[DEBUG] Kontext-ID: {id(context)}")
-    print(f"[DEBUG Bswitch bear] Prev={prev_phase}, Candles={len(candles_input)}")
+    _debug("Kontext-Typ: %s", type(context))
+    _debug("Kontext-ID: %s", id(context))
+    _debug("Bswitch bear: Prev=%s, Candles=%s", prev_phase, len(candles_input))
     candles = ensure_list_of_candles(candles_input)
 
     allowed = {
@@ -290,7 +292,7 @@ def is_switch_bear(prev_phase: Phase, candles_input: Any, context: PhaseState) -
     context.switch_bear_initial_high = initial_high
     context.switch_bear_prev_lower_low = prev_lower_low
 
-    print(f"[DEBUG] switch_bear context gesetzt: initial_high={initial_high}, prev_lower_low={prev_lower_low}")
+    _debug("switch_bear context gesetzt: initial_high=%s, prev_lower_low=%s", initial_high, prev_lower_low)
 
     return True
 
@@ -371,7 +373,7 @@ def check_transition_to_base_bull(prev_phase: Phase, candles: List[Candle], cont
     current_candle = candles[-1]
     context.last_confirmation_bullish.valid = True
     context.last_confirmation_bullish.candle = current_candle
-    print(f"[DEBUG] Confirmation Bullish in TREND_BULL erkannt: {current_candle}")
+    _debug("Confirmation Bullish in TREND_BULL erkannt: %s", current_candle)
     return True
 
 
@@ -429,16 +431,16 @@ def is_base_switch_bull(prev_phase: Phase, candles_input: Any, context: PhaseSta
                 context.switch_bull_breakout_idx = breakout_idx
                 break
         if breakout_idx is None:
-            print("[DEBUG] Kein Breakout gefunden – Abbruch in is_base_switch_bull.")
+            _debug("Kein Breakout gefunden – Abbruch in is_base_switch_bull.")
             return False
 
-    print(f"[DEBUG] BREAKOUT gefunden: breakout_idx={breakout_idx}, candle={candles[breakout_idx]}")
+    _debug("BREAKOUT gefunden: breakout_idx=%s, candle=%s", breakout_idx, candles[breakout_idx])
 
     start_confirmation = breakout_idx + 1
     if start_confirmation >= len(candles):
         return False
 
-    print(f"[DEBUG] Prüfe Confirmation Bullish: breakout_idx={breakout_idx}, start={start_confirmation}, end={len(candles)}")
+    _debug("Prüfe Confirmation Bullish: breakout_idx=%s, start=%s, end=%s", breakout_idx, start_confirmation, len(candles))
 
     # Confirmation Candle bullish suchen und bei Treffer valid setzen
     for j in range(start_confirmation, len(candles)):
@@ -446,7 +448,7 @@ def is_base_switch_bull(prev_phase: Phase, candles_input: Any, context: PhaseSta
         if is_confirmation_bullish(prev_phase, subcandles, context):
             context.last_confirmation_bullish.valid = True
             context.last_confirmation_bullish.candle = candles[j]
-            print(f"[DEBUG] Confirmation Bullish gesetzt: idx={j}, candle={candles[j]}")
+            _debug("Confirmation Bullish gesetzt: idx=%s, candle=%s", j, candles[j])
             return True
 
     return False
@@ -484,16 +486,16 @@ def is_base_switch_bear(prev_phase: Phase, candles_input: Any, context: PhaseSta
                 context.breakdown_idx = breakdown_idx
                 break
         if breakdown_idx is None:
-            print("[DEBUG] Kein Breakdown gefunden – Abbruch in is_base_switch_bear.")
+            _debug("Kein Breakdown gefunden – Abbruch in is_base_switch_bear.")
             return False
         
-    print(f"[DEBUG] BREAKDOWN gefunden: breakdown_idx={breakdown_idx}, candle={candles[breakdown_idx]}")
+    _debug("BREAKDOWN gefunden: breakdown_idx=%s, candle=%s", breakdown_idx, candles[breakdown_idx])
 
     start_confirmation = breakdown_idx + 1
     if start_confirmation >= len(candles):
         return False
     
-    print(f"[DEBUG] Prüfe Confirmation Bearish: breakdown_idx={breakdown_idx}, start={start_confirmation}, end={len(candles)}")
+    _debug("Prüfe Confirmation Bearish: breakdown_idx=%s, start=%s, end=%s", breakdown_idx, start_confirmation, len(candles))
 
     # Confirmation Candle bearish suchen und bei Treffer valid setzen
     for j in range(start_confirmation, len(candles)):
@@ -501,7 +503,7 @@ def is_base_switch_bear(prev_phase: Phase, candles_input: Any, context: PhaseSta
         if is_confirmation_bearish(prev_phase, subcandles, context):
             context.last_confirmation_bearish.valid = True
             context.last_confirmation_bearish.candle = candles[j]
-            print(f"[DEBUG] Confirmation Bearish gesetzt: idx={j}, candle={candles[j]}")
+            _debug("Confirmation Bearish gesetzt: idx=%s, candle=%s", j, candles[j])
             return True
     return False
 
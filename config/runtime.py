@@ -0,0 +1,108 @@
+# config/runtime.py
+"""
+Laufzeit-Einstellungen des Bots (Persistenz, Threads, Monitoring).
+"""
+
+# FSM-/Controller-Checkpoints für Warm-Restart
+CHECKPOINT_ENABLED: bool = True
+CHECKPOINT_DIR: str = "checkpoints"
+# Mindestabstand zwischen zwei Checkpoint-Schreibvorgängen pro Symbol (Sekunden)
+CHECKPOINT_INTERVAL: float = 5.0
+
+# Polling-Intervall des Run-Loops (Sekunden)
+POLL_INTERVAL: float = 1.0
+
+# Sharded Runtime: Kerzen pro Shared-Memory-Ringpuffer (pro Symbol/TF)
+SHM_RING_CAPACITY: int = 256
+
+# Candle-Dispatch: "threaded" = ein Worker-Thread mit begrenzter Inbox pro Symbol,
+# "inline" = Callbacks direkt im Polling-Thread
+DISPATCH_MODE: str = "threaded"
+INBOX_MAXSIZE: int = 64
+# Verhalten bei voller Inbox: "block" | "drop_oldest" | "drop_newest" (siehe core/dispatch.py);
+# gilt nur für Kerzen/Ticks, Order-/Positions-Events werden nie verworfen
+INBOX_OVERFLOW: str = "block"
+
+# Latenz-Histogramme Bar-Close → Order-Submission (siehe core/latency.py).
+# Hinweis: close_to_detect vergleicht die Broker-Barzeit mit der lokalen Uhr und ist
+# bei Serverzeit ≠ UTC um den Zeitzonen-Offset verschoben.
+LATENCY_ENABLED: bool = False
+
+# Prometheus-Metriken (siehe core/metrics.py), nur an localhost gebunden
+METRICS_ENABLED: bool = False
+METRICS_HOST: str = "127.0.0.1"
+METRICS_PORT: int = 9108
+
+# Profiling zur Laufzeit (siehe core/profiler.py): SIGUSR1 oder Kontrolldatei anlegen
+PROFILE_DIR: str = "profiles"
+PROFILE_DURATION: float = 30.0
+PROFILE_SAMPLE_INTERVAL: float = 0.005
+PROFILE_CONTROL_FILE: str = "profile.request"
+# Gesampelte Threads (Name oder Präfix): Run-Loop, Symbol-Worker, Order-Executor
+PROFILE_THREADS: tuple = ("MainThread", "worker-", "order-executor")
+
+# Paralleler Start (siehe startup.py): Threads für History-Laden/Replay der Symbole
+STARTUP_WORKERS: int = 8
+
+# Terminal-Dashboard (siehe core/dashboard.py); leere Ausgabe = stdout,
+# sonst Pfad einer Datei/TTY (z.B. "/dev/pts/3" eines zweiten Terminals)
+DASHBOARD_ENABLED: bool = False
+DASHBOARD_REFRESH: float = 1.0
+DASHBOARD_OUTPUT: str = ""
+
+# Währungsumrechnung (siehe core/fx_rates.py): max. Alter (s) der Kurse von Hilfssymbolen,
+# die nicht abonniert sind und deshalb per symbol_info_tick nachgeladen werden
+FX_MAX_AGE: float = 60.0
+
+# Portfolio-Limits (siehe core/portfolio.py), jeweils relativ zur Balance:
+# Netto-Exposure je Währung (Vielfaches, 30 = 30× Balance) und Summe der offenen Risiken bis SL
+PORTFOLIO_MAX_CURRENCY_EXPOSURE: float = 30.0
+PORTFOLIO_MAX_OPEN_RISK: float = 0.05
+
+# Spread-Statistik (siehe core/spread.py): EWMA-Gewicht, Spike = Spread über dem
+# SPREAD_SPIKE_QUANTILE-Quantil und über SPREAD_SPIKE_FACTOR × Median; Spike-Erkennung
+# erst nach SPREAD_WARMUP Beobachtungen
+SPREAD_EWMA_ALPHA: float = 0.05
+SPREAD_SPIKE_FACTOR: float = 2.0
+SPREAD_SPIKE_QUANTILE: float = 0.95
+SPREAD_WARMUP: int = 30
+
+# Tick-Modus (siehe core/ticks.py): Ticks per copy_ticks_from, laufende M1-Kerze und
+# Intra-Bar-Stopmanagement; die Phasen-FSMs laufen weiter nur auf abgeschlossenen Kerzen.
+# Im Tick-Modus pollt der Run-Loop alle TICK_POLL_INTERVAL Sekunden, Kerzen werden nur
+# bei Minutenwechsel im Tickstrom bzw. spätestens nach POLL_INTERVAL abgefragt.
+TICK_MODE: bool = False
+TICK_POLL_INTERVAL: float = 0.1
+TICK_BATCH: int = 1000
+
+# Event-Bus (siehe core/events.py): Threads für asynchron abonnierte Empfänger
+EVENT_ASYNC_WORKERS: int = 4
+# Positions-Monitor (siehe core/position_monitor.py): Snapshot-Intervall (s) für
+# OrderFilled/SLModified/PositionClosed, 0 = aus
+POSITION_MONITOR_INTERVAL: float = 1.0
+
+# Buffer-only für untere TFs: solange die Kaskade B bzw. E nicht erreichen kann
+# (can_k_to_b/can_b_to_e, kein offener Trade), werden deren Kerzen nur in die History
+# gepuffert; FSM-Update, Entry- und Stop-Logik laufen erst wieder nach dem Nachholen
+# der gepufferten Kerzen bei Reaktivierung (gepuffert wird höchstens die History-Tiefe,
+# darüber hinaus wird die FSM aus der History neu aufgebaut). Standardmäßig aus.
+TF_BUFFER_ONLY: bool = False
+
+# Session-Kalender (siehe core/sessions.py). Entry-Fenster in SESSION_TIMEZONE an den
+# Wochentagen SESSION_DAYS (0 = Montag); Marktzeiten des Brokers als Wochen-Öffnung/-Schluss
+# (Wochentag, Stunde, Minute) in MARKET_TIMEZONE; Feiertage als "MM-DD" (jährlich) oder
+# "YYYY-MM-DD", an ihnen ist weder Markt noch Entry-Fenster offen.
+SESSION_TIMEZONE: str = "Europe/Berlin"
+SESSION_WINDOWS: tuple = ("08:00-12:00", "13:00-15:00", "15:00-20:00")
+SESSION_DAYS: tuple = (0, 1, 2, 3, 4)
+MARKET_TIMEZONE: str = "America/New_York"
+MARKET_WEEK_OPEN: tuple = (6, 17, 0)
+MARKET_WEEK_CLOSE: tuple = (4, 17, 0)
+SESSION_HOLIDAYS: tuple = ("12-25", "01-01")
+SESSION_HORIZON_DAYS: int = 14
+# Run-Loop außerhalb der Fenster (ohne offene Bot-Trades bzw. bei geschlossenem Markt):
+# nur alle SESSION_HEARTBEAT_INTERVAL Sekunden pollen, SESSION_WARMUP Sekunden vor
+# Fensterbeginn wieder im normalen Takt
+SESSION_POLLING: bool = True
+SESSION_HEARTBEAT_INTERVAL: float = 60.0
+SESSION_WARMUP: float = 300.0
@@ -16,6 +16,13 @@ HISTORY_LIMIT: dict[int, int] = {
     E: 100,
 }
 
+# Kerzenlänge in Sekunden (Takt für die Lückenerkennung im Run-Loop)
+TF_SECONDS: dict[int, int] = {
+    K: 3600,
+    B: 900,
+    E: 60,
+}
+
 # Als Base-Phase gelten alle Baseline-Zustände
 BASE_PHASES: set[Phase] = {
     Phase.BASE_BULL,
@@ -82,3 +89,7 @@ def should_switch_back_to_b(phase_b: Phase, entered_direction: str, current_k_di
 def get_history_limit(tf: int) -> int:
     """Anzahl der Bars, die beim TF-Wechsel für Initialisierung geladen werden sollen."""
     return HISTORY_LIMIT.get(tf, 100)
+
+def get_tf_seconds(tf: int) -> int:
+    """Kerzenlänge einer Zeiteinheit in Sekunden."""
+    return TF_SECONDS[tf]
@@ -0,0 +1,261 @@
+# core/checkpoint.py
+"""
+Persistenz des Controller-Zustands (FSMs, aktiver TF, Ticket-State) für Warm-Restarts.
+Ein Checkpoint pro Symbol als JSON mit explizitem Schema aus reinen Daten (Zahlen,
+Strings, Listen, Dicts): Zeitstempel als Epoch-Sekunden und Kerzen in Punkten wie im
+Speicher (Version 3; Version 2 hielt OHLC noch als Preise), Phasen/BE-Zustände als Namen,
+TF-/Ticket-Schlüssel als Strings. Kein pickle – ein Checkpoint hängt nicht an den
+Klassen-Interna und wird beim Laden gegen Version und Pflichtfelder geprüft.
+Geschrieben wird atomar (tmp-Datei + os.replace) und nicht im Kerzenpfad: Controller
+melden sich per writer.mark() als geändert, der Writer-Thread holt höchstens alle
+CHECKPOINT_INTERVAL Sekunden pro Symbol einen Snapshot und schreibt ihn.
+"""
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from config.runtime import CHECKPOINT_DIR, CHECKPOINT_INTERVAL
+from core.confirmation import Confirmation
+from core.phase_state import PhaseState
+from core.stop_manager import BEState, StopManager
+from core.types import Candle, Phase
+
+CHECKPOINT_VERSION = 3
+
+# Pflichtfelder des Controller-Zustands (siehe MultiTimeframeController.checkpoint_state)
+STATE_FIELDS = (
+    'fsm_states', 'phases', 'active_tf', 'entered_direction', 'switch_data', 'last_update_ts',
+    'entry_timestamps', 'trailing_levels', 'stop_managers', 'break_even_applied',
+    'processed_entry_candles', 'buffer_only', 'trade',
+)
+
+
+class CheckpointError(ValueError):
+    """Checkpoint passt nicht zum Schema (fehlende Felder, falsche Typen)."""
+
+
+# ---------------- Schema: Objekte ↔ reine Daten ----------------
+
+def plain(value):
+    """NumPy-Skalare (aus den MT5-Rates) → Python-Zahl, alles andere unverändert."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def ts_out(ts) -> Optional[int]:
+    return None if ts is None else int(ts)
+
+
+def ts_in(value) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+def phase_out(phase: Optional[Phase]) -> Optional[str]:
+    return None if phase is None else phase.name
+
+
+def phase_in(name: Optional[str]) -> Optional[Phase]:
+    return None if name is None else Phase[name]
+
+
+def candle_out(c: Optional[Candle]) -> Optional[Dict[str, Any]]:
+    if c is None:
+        return None
+    return {
+        'ts': ts_out(c.timestamp), 'open': plain(c.open), 'high': plain(c.high), 'low': plain(c.low),
+        'close': plain(c.close), 'volume': plain(c.volume), 'ema10': plain(c.ema10), 'ema20': plain(c.ema20),
+    }
+
+
+def candle_in(d: Optional[Dict[str, Any]]) -> Optional[Candle]:
+    if d is None:
+        return None
+    return Candle(
+        timestamp=ts_in(d['ts']), open=d['open'], high=d['high'], low=d['low'],
+        close=d['close'], volume=d['volume'], ema10=d['ema10'], ema20=d['ema20']
+    )
+
+
+_PHASE_STATE_VALUES = (
+    'switch_bull_initial_low', 'switch_bull_prev_higher_high', 'switch_bear_initial_high',
+    'switch_bear_prev_lower_low', 'switch_bull_pivot_idx', 'switch_bull_breakout_idx',
+    'pivot_idx_bear', 'breakdown_idx',
+)
+
+
+def phase_state_out(state: PhaseState) -> Dict[str, Any]:
+    d = {
+        'current_phase': phase_out(state.current_phase),
+        'prev_phase': phase_out(state.prev_phase),
+        'last_candle_ts': ts_out(state.last_candle_ts),
+        'last_candles': [candle_out(c) for c in getattr(state, 'last_candles', None) or []],
+        'confirmation_bullish': {
+            'valid': state.last_confirmation_bullish.valid,
+            'candle': candle_out(state.last_confirmation_bullish.candle),
+        },
+        'confirmation_bearish': {
+            'valid': state.last_confirmation_bearish.valid,
+            'candle': candle_out(state.last_confirmation_bearish.candle),
+        },
+    }
+    for name in _PHASE_STATE_VALUES:
+        d[name] = plain(getattr(state, name))
+    return d
+
+
+def phase_state_in(d: Dict[str, Any]) -> PhaseState:
+    state = PhaseState()
+    state.current_phase = phase_in(d['current_phase'])
+    state.prev_phase = phase_in(d['prev_phase'])
+    state.last_candle_ts = ts_in(d['last_candle_ts'])
+    state.last_candles = [candle_in(c) for c in d['last_candles']]
+    for attr, key in (('last_confirmation_bullish', 'confirmation_bullish'),
+                      ('last_confirmation_bearish', 'confirmation_bearish')):
+        setattr(state, attr, Confirmation(d[key]['valid'], candle_in(d[key]['candle'])))
+    for name in _PHASE_STATE_VALUES:
+        setattr(state, name, d[name])
+    return state
+
+
+def stop_manager_out(s: StopManager) -> Dict[str, Any]:
+    return {
+        'ticket': s.ticket, 'side': s.side, 'entry_price': plain(s.entry_price),
+        'initial_stop': plain(s.initial_stop), 'spread': plain(s.spread), 'point': s.point, 'entry_ts': ts_out(s.entry_ts),
+        'rr': plain(s.rr), 'go_candle': candle_out(s.go_candle), 'extreme': plain(s.extreme),
+        'level': s.level, 'be_state': s.be_state.name, 'last_ts': ts_out(s.last_ts),
+    }
+
+
+def stop_manager_in(d: Dict[str, Any]) -> StopManager:
+    s = StopManager(
+        d['ticket'], d['side'], d['entry_price'], d['initial_stop'], d['spread'], d['point'], ts_in(d['entry_ts'])
+    )
+    s.rr = d['rr']
+    s.go_candle = candle_in(d['go_candle'])
+    s.extreme = d['extreme']
+    s.level = d['level']
+    s.be_state = BEState[d['be_state']]
+    s.last_ts = ts_in(d['last_ts'])
+    return s
+
+
+def keyed_out(d: Dict[Any, Any], value: Callable = lambda v: v) -> Dict[str, Any]:
+    """Dict mit int-Schlüsseln (TF, Ticket) → JSON-Objekt."""
+    return {str(k): value(v) for k, v in d.items()}
+
+
+def keyed_in(d: Dict[str, Any], value: Callable = lambda v: v) -> Dict[int, Any]:
+    return {int(k): value(v) for k, v in d.items()}
+
+
+# ---------------- Dateien ----------------
+# directory=None → CHECKPOINT_DIR (zur Aufrufzeit gelesen)
+
+def checkpoint_path(symbol: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or CHECKPOINT_DIR, f"{symbol}.json")
+
+
+def save_checkpoint(symbol: str, state: Dict[str, Any], directory: Optional[str] = None) -> None:
+    missing = [f for f in STATE_FIELDS if f not in state]
+    if missing:
+        raise CheckpointError(f"Checkpoint für {symbol} unvollständig: {missing}")
+    path = checkpoint_path(symbol, directory)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    payload = {"version": CHECKPOINT_VERSION, "symbol": symbol, "state": state}
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(symbol: str, directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Reine Daten des Checkpoints oder None (fehlt, unlesbar, andere Version/Symbol, Felder fehlen)."""
+    path = checkpoint_path(symbol, directory)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except Exception as e:
+        print(f"[WARN] Checkpoint {path} nicht lesbar: {e}")
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != CHECKPOINT_VERSION or payload.get("symbol") != symbol:
+        version = payload.get("version") if isinstance(payload, dict) else None
+        print(f"[WARN] Checkpoint {path} inkompatibel (version={version}), ignoriert.")
+        return None
+    state = payload.get("state")
+    missing = [f for f in STATE_FIELDS if not isinstance(state, dict) or f not in state]
+    if missing:
+        print(f"[WARN] Checkpoint {path} unvollständig (fehlt: {missing}), ignoriert.")
+        return None
+    return state
+
+
+def delete_checkpoint(symbol: str, directory: Optional[str] = None) -> None:
+    path = checkpoint_path(symbol, directory)
+    if os.path.isfile(path):
+        os.remove(path)
+
+
+# ---------------- Writer-Thread ----------------
+
+class CheckpointWriter:
+    """
+    Schreibt Checkpoints außerhalb des Kerzenpfads. mark(symbol, snapshot) merkt nur vor;
+    mehrere Kerzen innerhalb eines Intervalls ergeben einen einzigen Schreibvorgang mit
+    dem dann aktuellen Zustand. snapshot() läuft im Writer-Thread und muss selbst
+    sperren (der Controller nimmt dafür seinen Lock).
+    """
+    def __init__(self, interval: float = CHECKPOINT_INTERVAL, directory: Optional[str] = None):
+        self.interval = interval
+        self.directory = directory
+        self._cond = threading.Condition()
+        self._dirty: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.writes = 0
+
+    def mark(self, symbol: str, snapshot: Callable[[], Dict[str, Any]]) -> None:
+        with self._cond:
+            self._dirty[symbol] = snapshot
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._loop, name="checkpoint-writer", daemon=True)
+                self._thread.start()
+
+    def pending(self) -> List[str]:
+        with self._cond:
+            return list(self._dirty)
+
+    def flush(self) -> None:
+        """Alle vorgemerkten Checkpoints sofort schreiben (Shutdown, Tests)."""
+        with self._cond:
+            dirty, self._dirty = self._dirty, {}
+        for symbol, snapshot in dirty.items():
+            self._write(symbol, snapshot)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self.flush()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait(timeout=self.interval)
+                if not self._running:
+                    return
+            self.flush()
+
+    def _write(self, symbol: str, snapshot: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            save_checkpoint(symbol, snapshot(), self.directory)
+            self.writes += 1
+        except Exception as e:
+            print(f"[ERROR] Checkpoint für {symbol} fehlgeschlagen: {e}")
+
+
+writer = CheckpointWriter()
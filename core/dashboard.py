@@ -0,0 +1,91 @@
+# core/dashboard.py
+"""
+Terminal-Dashboard über alle Symbole.
+Rendert in festem Takt ausschließlich aus den ControllerSnapshots (controller.snapshot):
+keine Broker-Aufrufe, keine Sperren, kein Zugriff auf den veränderlichen Controller-Zustand.
+Ausgabe auf stdout oder in eine eigene Datei/TTY (z.B. ein zweites Terminal, /dev/pts/N),
+damit die DEBUG-Ausgaben des Bots das Bild nicht zerreißen.
+"""
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+from config.runtime import DASHBOARD_REFRESH
+from core.types import ControllerSnapshot
+
+CLEAR = "\033[2J\033[H"
+BOLD, RESET = "\033[1m", "\033[0m"
+PHASE_COLORS = {"BULL": "\033[32m", "BEAR": "\033[31m"}
+
+
+def _phase(name: Optional[str], active: bool) -> str:
+    text = (name or "-")[:16]
+    color = next((c for k, c in PHASE_COLORS.items() if k in text), "")
+    cell = f"{text:<16}"
+    if active:
+        cell = BOLD + cell
+    return f"{color}{cell}{RESET}" if color or active else cell
+
+
+def _fmt(value: Optional[float], digits: int = 5) -> str:
+    return f"{value:.{digits}f}" if value is not None else "-"
+
+
+def render(snapshots: Iterable[ControllerSnapshot], now: Optional[datetime] = None) -> str:
+    """Tabelle: eine Zeile pro Symbol; aktiver TF fett, Phasen nach Richtung eingefärbt."""
+    now = now or datetime.now()
+    lines: List[str] = [
+        f"{BOLD}Forex-Bot Dashboard{RESET}  {now:%Y-%m-%d %H:%M:%S}",
+        f"{'Symbol':<10} {'1h':<16} {'15m':<16} {'1m':<16} {'Dir':<5} "
+        f"{'EMA10 (1m)':>11} {'EMA20 (1m)':>11} {'Conf':<9} {'Trade':<34} {'Alter':>6}",
+    ]
+    for snap in snapshots:
+        cells = [_phase(t.phase, t.tf == snap.active_tf) for t in snap.tfs]
+        e = snap.tfs[-1]
+        conf = ",".join(t.label for t in snap.tfs if t.confirmation) or "-"
+        if snap.open_ticket is not None:
+            trade = f"#{snap.open_ticket} {snap.side or '?'} @{_fmt(snap.entry_price)} sl={_fmt(snap.current_sl)}"
+        else:
+            trade = "-"
+        age = f"{(now - snap.taken_at).total_seconds():.0f}s"
+        lines.append(
+            f"{snap.symbol:<10} {' '.join(cells)} {(snap.entered_direction or '-'):<5} "
+            f"{_fmt(e.ema10):>11} {_fmt(e.ema20):>11} {conf:<9} {trade:<34} {age:>6}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+class Dashboard:
+    def __init__(
+        self,
+        snapshots: Callable[[], Iterable[Optional[ControllerSnapshot]]],
+        refresh: float = DASHBOARD_REFRESH,
+        output: str = ""
+    ):
+        """snapshots liefert die aktuellen Snapshots (z.B. aus allen Strategien), None = noch keiner."""
+        self.snapshots = snapshots
+        self.refresh = refresh
+        self.output = output
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        threading.Thread(target=self._loop, name="dashboard", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        stream = open(self.output, "w", encoding="utf-8") if self.output else sys.__stdout__
+        try:
+            while not self._stop.is_set():
+                t0 = time.monotonic()
+                frame = render([s for s in self.snapshots() if s is not None])
+                stream.write(CLEAR + frame)
+                stream.flush()
+                self._stop.wait(max(0.0, self.refresh - (time.monotonic() - t0)))
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Dashboard beendet: {e}")
+        finally:
+            if stream is not sys.__stdout__:
+                stream.close()
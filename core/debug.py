@@ -0,0 +1,25 @@
+# core/debug.py
+"""
+Schalter für die Debug-Ausgaben der Phasen-Logik.
+Pro Thread abschaltbar, damit z.B. Batch-Replays beim Warm-up keine
+Ausgaben erzeugen (und die f-Strings gar nicht erst formatiert werden).
+"""
+import threading
+from contextlib import contextmanager
+
+_local = threading.local()
+
+
+def debug_enabled() -> bool:
+    return getattr(_local, "enabled", True)
+
+
+@contextmanager
+def quiet():
+    """Unterdrückt Debug-Ausgaben im aktuellen Thread für die Dauer des Blocks."""
+    prev = debug_enabled()
+    _local.enabled = False
+    try:
+        yield
+    finally:
+        _local.enabled = prev
@@ -0,0 +1,115 @@
+# core/dispatch.py
+"""
+Per-Symbol-Worker für die Candle-Verarbeitung.
+Der Polling-Thread legt neue Kerzen nur noch in die begrenzte Inbox des Symbols;
+ein eigener Thread pro Symbol arbeitet sie in Reihenfolge ab (History, EMA, Callbacks).
+Order-/Positions-Events (submit_event) laufen in derselben Reihenfolge durch die Inbox,
+zählen aber nicht gegen das Limit und werden nie verworfen – ein verlorenes
+PositionClosed/OrderFilled ließe den Controller-State veralten.
+"""
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Optional, Tuple
+
+# Überlauf-Policies für Kerzen/Ticks, wenn ein Worker nicht hinterherkommt
+OVERFLOW_BLOCK = "block"              # Polling-Thread wartet (Backpressure, nichts geht verloren)
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # älteste wartende Kerze/Tick verwerfen
+OVERFLOW_DROP_NEWEST = "drop_newest"  # neue Kerze/Tick verwerfen
+
+_STOP = object()
+
+
+class SymbolWorker:
+    def __init__(
+        self,
+        symbol: str,
+        handler: Callable[[Any], None],
+        maxsize: int = 64,
+        overflow: str = OVERFLOW_BLOCK
+    ):
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST):
+            raise ValueError(f"Unbekannte Overflow-Policy: {overflow}")
+        self.symbol = symbol
+        self.handler = handler
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self._cond = threading.Condition()
+        self._items: Deque[Tuple[bool, Any]] = deque()  # (begrenzt?, Item) in Ankunftsreihenfolge
+        self._bounded = 0     # wartende Kerzen/Ticks
+        self._unfinished = 0  # eingereiht, aber noch nicht verarbeitet
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name=f"worker-{self.symbol}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> bool:
+        """Legt eine Kerze/einen Tick in die Inbox. Liefert False, wenn es laut Policy verworfen wurde."""
+        with self._cond:
+            if self._bounded >= self.maxsize:
+                if self.overflow == OVERFLOW_BLOCK:
+                    self._cond.wait_for(lambda: self._bounded < self.maxsize)
+                elif self.overflow == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    print(f"[WARN] Inbox {self.symbol} voll – neue Kerze/Tick verworfen (dropped={self.dropped})")
+                    return False
+                else:
+                    self._drop_oldest()
+                    print(f"[WARN] Inbox {self.symbol} voll – älteste Kerze/Tick verworfen (dropped={self.dropped})")
+            self._put(True, item)
+            return True
+
+    def submit_event(self, event: Any) -> None:
+        """Order-/Positions-Event einreihen: nie verworfen, blockiert nicht."""
+        with self._cond:
+            self._put(False, event)
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def _put(self, bounded: bool, item: Any) -> None:
+        self._items.append((bounded, item))
+        self._bounded += bounded
+        self._unfinished += 1
+        self._cond.notify_all()
+
+    def _drop_oldest(self) -> None:
+        for i, (bounded, _) in enumerate(self._items):
+            if bounded:
+                del self._items[i]
+                self._bounded -= 1
+                self._unfinished -= 1
+                self.dropped += 1
+                return
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._items)
+                bounded, item = self._items.popleft()
+                self._bounded -= bounded
+                self._cond.notify_all()
+            try:
+                if item is _STOP:
+                    return
+                self.handler(item)
+            except Exception as e:
+                print(f"[ERROR] Worker {self.symbol}: {e}")
+            finally:
+                with self._cond:
+                    self._unfinished -= 1
+                    self._cond.notify_all()
+
+    def join(self) -> None:
+        """Wartet, bis alle bisher eingereihten Items verarbeitet sind."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._unfinished)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self.submit_event(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
@@ -7,17 +7,18 @@ from typing import List, Optional, Dict
 from config.entry_logic import ConfigEntryLogic
 from config.phase import Candle
 from core.phase_manager import PhaseStateMachine
+from core.spread import SpreadTracker
 
 
 
 class EntryLogicManager:
     """
     Wrapper um die Logik aus config.entry_logic.
-    - Spread ist Pflichtparameter.
+    - Spread ist Pflichtparameter (Startwert), spreads liefert den laufenden Spread.
     """
-    def __init__(self, phase_machine: PhaseStateMachine, spread: float):
+    def __init__(self, phase_machine: PhaseStateMachine, spread: float, spreads: Optional[SpreadTracker] = None):
         self.spread = spread
-        self.logic = ConfigEntryLogic(phase_machine, spread)
+        self.logic = ConfigEntryLogic(phase_machine, spread, spreads)
 
     def check_buy_stop(
         self,
@@ -0,0 +1,181 @@
+# core/events.py
+"""
+Typisierter Event-Bus zwischen DataHandler, Positions-Monitor und den Strategien.
+Subscriptions werden nach Topic (Event-Typ, Symbol, TF) indiziert; publish() holt die
+fertig sortierte Empfängerliste mit einem Dict-Zugriff (Wildcard-Subscriptions für alle
+Symbole/TFs werden beim Subscriben eingemischt, nicht beim Publish).
+Reihenfolge: höhere Priorität zuerst, bei Gleichstand in Registrierungsreihenfolge.
+Synchrone Empfänger laufen im publizierenden Thread (im Threaded-Dispatch also im
+Worker des Symbols, in Reihenfolge mit den Kerzen); asynchrone über einen kleinen
+Thread-Pool ohne Reihenfolgegarantie.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple, Type
+from core.types import Candle, Tick
+from config.runtime import EVENT_ASYNC_WORKERS
+
+
+@dataclass(frozen=True)
+class Event:
+    symbol: str
+
+    @property
+    def tf(self) -> Optional[int]:
+        return None
+
+
+@dataclass(frozen=True)
+class BarClosed(Event):
+    timeframe: int
+    candle: Candle
+
+    @property
+    def tf(self) -> Optional[int]:
+        return self.timeframe
+
+
+@dataclass(frozen=True)
+class TickUpdate(Event):
+    tick: Tick
+    bar: Optional[Candle]  # laufende M1-Kerze inkl. dieses Ticks
+
+
+@dataclass(frozen=True)
+class OrderFilled(Event):
+    ticket: int
+    side: str
+    volume: float
+    price: float
+    sl: float
+
+
+@dataclass(frozen=True)
+class PositionClosed(Event):
+    ticket: int
+    side: str
+    volume: float
+    price_open: float
+    price_last: float  # letzter bekannter Kurs der Position (price_current)
+
+
+@dataclass(frozen=True)
+class SLModified(Event):
+    ticket: int
+    side: str
+    volume: float
+    price_open: float
+    old_sl: float
+    new_sl: float
+
+
+Topic = Tuple[Type[Event], Optional[str], Optional[int]]
+
+
+class Subscription:
+    __slots__ = ("event_type", "callback", "symbol", "tf", "priority", "asynchronous", "seq")
+
+    def __init__(self, event_type, callback, symbol, tf, priority, asynchronous, seq):
+        self.event_type = event_type
+        self.callback = callback
+        self.symbol = symbol
+        self.tf = tf
+        self.priority = priority
+        self.asynchronous = asynchronous
+        self.seq = seq
+
+    def matches(self, topic: Topic) -> bool:
+        event_type, symbol, tf = topic
+        return (
+            self.event_type is event_type
+            and (self.symbol is None or self.symbol == symbol)
+            and (self.tf is None or self.tf == tf)
+        )
+
+    def __repr__(self):
+        return (
+            f"Subscription({self.event_type.__name__}, symbol={self.symbol}, tf={self.tf}, "
+            f"prio={self.priority}, async={self.asynchronous}, cb={self.callback})"
+        )
+
+
+class EventBus:
+    def __init__(self, async_workers: int = EVENT_ASYNC_WORKERS):
+        self.async_workers = async_workers
+        self._lock = threading.Lock()
+        self._subs: List[Subscription] = []
+        self._index: Dict[Topic, Tuple[Subscription, ...]] = {}
+        self._seq = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def subscribe(
+        self,
+        event_type: Type[Event],
+        callback: Callable[[Event], None],
+        symbol: Optional[str] = None,
+        tf: Optional[int] = None,
+        priority: int = 0,
+        asynchronous: bool = False
+    ) -> Subscription:
+        """symbol/tf = None abonniert alle Symbole bzw. TFs des Event-Typs."""
+        with self._lock:
+            for sub in self._subs:
+                if (sub.event_type, sub.callback, sub.symbol, sub.tf) == (event_type, callback, symbol, tf):
+                    return sub
+            self._seq += 1
+            sub = Subscription(event_type, callback, symbol, tf, priority, asynchronous, self._seq)
+            self._subs.append(sub)
+            # Betroffene Topics neu aufbauen, alle anderen bleiben gültig
+            for topic in [t for t in self._index if sub.matches(t)]:
+                self._index[topic] = self._resolve(topic)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub not in self._subs:
+                return
+            self._subs.remove(sub)
+            for topic in [t for t in self._index if sub.matches(t)]:
+                self._index[topic] = self._resolve(topic)
+
+    def _resolve(self, topic: Topic) -> Tuple[Subscription, ...]:
+        subs = [s for s in self._subs if s.matches(topic)]
+        subs.sort(key=lambda s: (-s.priority, s.seq))
+        return tuple(subs)
+
+    def subscribers(self, event_type: Type[Event], symbol: Optional[str] = None, tf: Optional[int] = None) -> Tuple[Subscription, ...]:
+        topic = (event_type, symbol, tf)
+        subs = self._index.get(topic)
+        if subs is None:
+            with self._lock:
+                subs = self._index[topic] = self._resolve(topic)
+        return subs
+
+    def has_subscribers(self, event_type: Type[Event], symbol: Optional[str] = None, tf: Optional[int] = None) -> bool:
+        return bool(self.subscribers(event_type, symbol, tf))
+
+    def publish(self, event: Event) -> None:
+        for sub in self.subscribers(type(event), event.symbol, event.tf):
+            if sub.asynchronous:
+                self._async_pool().submit(self._call, sub, event)
+            else:
+                self._call(sub, event)
+
+    @staticmethod
+    def _call(sub: Subscription, event: Event) -> None:
+        try:
+            sub.callback(event)
+        except Exception as e:
+            print(f"[ERROR] Event-Callback-Fehler ({type(event).__name__} {event.symbol}): {e} ({sub.callback})")
+
+    def _async_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.async_workers, thread_name_prefix="event-async")
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
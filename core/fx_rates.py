@@ -0,0 +1,225 @@
+# core/fx_rates.py
+"""
+Währungsumrechnung für die Positionsgröße.
+Beim Start werden pro Symbol die statischen Kontraktdaten (SymbolSpec) einmal erfasst
+und für jede benötigte Währung ein Umrechnungspfad in die Kontowährung bestimmt
+(direkt oder über ein Kreuz, z.B. JPY→USD über USDJPY, CHF→EUR über EURUSD+USDCHF).
+Der Wert jeder Währung in Kontowährung liegt in einem Vektor; Kreuzkurse ergeben sich
+als Quotient zweier Einträge (Matrix = äußeres Produkt, nur bei Bedarf gebaut).
+Aktualisierung inkrementell aus dem Kursstrom (on_price): nur die Währungen, deren
+Pfad das Symbol enthält, werden neu berechnet. Hilfssymbole, die der Bot nicht
+abonniert, werden höchstens alle FX_MAX_AGE Sekunden per symbol_info_tick nachgeladen.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from config.runtime import FX_MAX_AGE
+
+
+@dataclass(frozen=True)
+class SymbolSpec:
+    name: str
+    base: str
+    quote: str
+    digits: int
+    point: float
+    pip_size: float
+    contract_size: float
+    volume_min: float
+    volume_max: float
+    volume_step: float
+
+
+def _spec_from_info(info) -> SymbolSpec:
+    name = info.name
+    digits = int(info.digits)
+    return SymbolSpec(
+        name=name,
+        base=getattr(info, 'currency_base', None) or name[:3],
+        quote=getattr(info, 'currency_profit', None) or name[3:6],
+        digits=digits,
+        point=info.point,
+        # pip = 10 Points bei 5-/3-stelliger Notierung
+        pip_size=0.01 if 'JPY' in name or digits == 3 else 0.0001,
+        contract_size=getattr(info, 'trade_contract_size', None) or 100_000.0,
+        volume_min=info.volume_min,
+        volume_max=info.volume_max,
+        volume_step=info.volume_step,
+    )
+
+
+class CurrencyConverter:
+    def __init__(self, mt5_module, max_age: float = FX_MAX_AGE):
+        self.mt5 = mt5_module
+        self.max_age = max_age
+        self.account_currency: Optional[str] = None
+        self.specs: Dict[str, SymbolSpec] = {}
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}               # Währung → Index im Vektor
+        self._to_acc = np.ones(0)                      # Wert von 1 Einheit in Kontowährung
+        self._paths: Dict[str, List[Tuple[str, int]]] = {}   # Währung → [(Symbol, ±1)]
+        self._dependents: Dict[str, List[str]] = {}    # Symbol → Währungen mit diesem Symbol im Pfad
+        self._prices: Dict[str, float] = {}
+        self._updated: Dict[str, float] = {}
+        self._fed: set = set()                         # Symbole mit Kursen aus dem eigenen Datenstrom
+        self._matrix: Optional[np.ndarray] = None
+
+    # ---------------- Setup ----------------
+
+    def register(self, symbols: Iterable[str], infos: Optional[Dict[str, object]] = None) -> None:
+        """
+        Erfasst Specs und Umrechnungspfade für die abonnierten Symbole.
+        infos: Symbol-Infos aus einem symbols_get()-Aufruf (auch für Kreuz-Hilfssymbole).
+        """
+        if infos is None:
+            infos = {s.name: s for s in self.mt5.symbols_get() or []}
+        with self._lock:
+            if self.account_currency is None:
+                acc = self.mt5.account_info()
+                self.account_currency = getattr(acc, 'currency', None) or "USD"
+            for sym in symbols:
+                info = infos.get(sym) or self.mt5.symbol_info(sym)
+                if info is None:
+                    print(f"[WARN] FX: keine Symbol-Info für {sym}")
+                    continue
+                self.specs[sym] = _spec_from_info(info)
+                self._fed.add(sym)
+            self._build_paths(infos)
+        for sym in self._dependents:
+            if sym not in self._prices:
+                self._refresh(sym)
+
+    def _build_paths(self, infos: Dict[str, object]) -> None:
+        """Kürzeste Pfade (BFS) zur Kontowährung; abonnierte Symbole werden bevorzugt."""
+        edges: Dict[str, List[Tuple[str, str, int]]] = {}
+
+        def add(name, base, quote):
+            # Wert(base) = Preis * Wert(quote); Wert(quote) = Wert(base) / Preis
+            edges.setdefault(quote, []).append((base, name, +1))
+            edges.setdefault(base, []).append((quote, name, -1))
+
+        for spec in self.specs.values():
+            add(spec.name, spec.base, spec.quote)
+        for name, info in infos.items():
+            if name in self.specs:
+                continue
+            base = getattr(info, 'currency_base', None)
+            quote = getattr(info, 'currency_profit', None)
+            if base and quote and base != quote and len(name) >= 6:
+                add(name, base, quote)
+
+        needed = {s.quote for s in self.specs.values()} | {s.base for s in self.specs.values()}
+        acc = self.account_currency
+        paths: Dict[str, List[Tuple[str, int]]] = {acc: []}
+        queue = deque([acc])
+        while queue and not needed.issubset(paths):
+            cur = queue.popleft()
+            for nxt, sym, direction in edges.get(cur, []):
+                if nxt in paths:
+                    continue
+                # nxt → cur über sym, danach weiter wie cur
+                paths[nxt] = [(sym, direction)] + paths[cur]
+                queue.append(nxt)
+
+        self._paths = {c: p for c, p in paths.items() if c in needed or c == acc}
+        for c in needed - set(paths):
+            print(f"[WARN] FX: kein Umrechnungspfad {c}→{acc}")
+        self._index = {c: i for i, c in enumerate(sorted(self._paths))}
+        self._to_acc = np.full(len(self._index), np.nan)
+        self._to_acc[self._index[acc]] = 1.0
+        self._dependents = {}
+        for c, path in self._paths.items():
+            for sym, _ in path:
+                self._dependents.setdefault(sym, []).append(c)
+        for c in self._paths:
+            self._recompute(c)
+
+    # ---------------- Updates ----------------
+
+    def on_price(self, symbol: str, price: float) -> None:
+        """Neuer Kurs (Close/Mid) eines Symbols; O(Anzahl abhängiger Währungen)."""
+        deps = self._dependents.get(symbol)
+        if deps is None or not price:
+            return
+        self._prices[symbol] = price
+        self._updated[symbol] = time.monotonic()
+        for c in deps:
+            self._recompute(c)
+
+    def _recompute(self, currency: str) -> None:
+        value = 1.0
+        for sym, direction in self._paths[currency]:
+            price = self._prices.get(sym)
+            if not price:
+                value = float('nan')
+                break
+            value = value * price if direction > 0 else value / price
+        self._to_acc[self._index[currency]] = value
+        self._matrix = None
+
+    def _refresh(self, symbol: str) -> None:
+        tick = self.mt5.symbol_info_tick(symbol)
+        if tick is None:
+            return
+        bid, ask = getattr(tick, 'bid', 0.0), getattr(tick, 'ask', 0.0)
+        price = (bid + ask) / 2 if bid and ask else (bid or ask)
+        self.on_price(symbol, price)
+
+    def _ensure_fresh(self, currency: str) -> None:
+        now = time.monotonic()
+        for sym, _ in self._paths.get(currency, ()):
+            if sym not in self._fed and now - self._updated.get(sym, 0.0) > self.max_age:
+                self._refresh(sym)
+
+    # ---------------- Abfragen ----------------
+
+    def spec(self, symbol: str) -> SymbolSpec:
+        spec = self.specs.get(symbol)
+        if spec is None:
+            self.register([symbol])
+            spec = self.specs.get(symbol)
+            if spec is None:
+                raise RuntimeError(f"Symbol {symbol} nicht gefunden")
+        return spec
+
+    def value_in_account(self, currency: str) -> Optional[float]:
+        """Wert einer Einheit `currency` in Kontowährung (None, wenn nicht umrechenbar)."""
+        idx = self._index.get(currency)
+        if idx is None:
+            return None
+        self._ensure_fresh(currency)
+        value = self._to_acc[idx]
+        return None if np.isnan(value) else float(value)
+
+    def values(self, currencies: List[str]) -> np.ndarray:
+        """Werte mehrerer Währungen in Kontowährung als Vektor (NaN = nicht umrechenbar)."""
+        out = np.full(len(currencies), np.nan)
+        for i, c in enumerate(currencies):
+            idx = self._index.get(c)
+            if idx is not None:
+                self._ensure_fresh(c)
+                out[i] = self._to_acc[idx]
+        return out
+
+    def rate(self, from_ccy: str, to_ccy: str) -> Optional[float]:
+        a, b = self.value_in_account(from_ccy), self.value_in_account(to_ccy)
+        return a / b if a is not None and b else None
+
+    def matrix(self) -> Tuple[List[str], np.ndarray]:
+        """Kreuzkurs-Matrix M[i, j] = Einheiten Währung j pro Einheit Währung i."""
+        m = self._matrix
+        if m is None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                m = self._matrix = np.outer(self._to_acc, 1.0 / self._to_acc)
+        return sorted(self._index, key=self._index.get), m
+
+    def pip_value(self, symbol: str) -> Optional[float]:
+        """Wert eines Pips pro Lot in Kontowährung."""
+        spec = self.spec(symbol)
+        quote_value = self.value_in_account(spec.quote)
+        if quote_value is None:
+            return None
+        return spec.contract_size * spec.pip_size * quote_value
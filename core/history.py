@@ -0,0 +1,95 @@
+# core/history.py
+"""
+Koordiniert das Laden der Kerzen-Historie pro (Symbol, TF).
+Jede Serie wird höchstens einmal vom Broker geladen; gleichzeitige Anfragen (Subscribe,
+initialize(), Checkpoint-Restore, parallele Startup-Threads) warten auf denselben
+laufenden Abruf. Geladen werden nur abgeschlossene Kerzen (copy_rates_from_pos ab
+Position 1), danach hält der DataHandler die Serie über deliver() aktuell.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Tuple
+from core.types import Candle
+
+EMPTY, LOADING, READY = "empty", "loading", "ready"
+
+Key = Tuple[str, int]
+
+
+class HistoryCoordinator:
+    def __init__(
+        self,
+        loader: Callable[[str, int, int], List[Candle]],
+        store: Dict[str, Dict[int, List[Candle]]]
+    ):
+        """
+        loader(symbol, tf, limit) lädt abgeschlossene Kerzen vom Broker,
+        store ist das History-Dict des DataHandlers (wird hier befüllt).
+        """
+        self.loader = loader
+        self.store = store
+        self._lock = threading.Lock()
+        self._inflight: Dict[Key, Future] = {}
+        self._loaded: Dict[Key, int] = {}  # geladenes Limit pro Serie
+        self.fetches = 0
+
+    def state(self, symbol: str, tf: int) -> str:
+        key = (symbol, tf)
+        with self._lock:
+            if key in self._inflight:
+                return LOADING
+            return READY if key in self._loaded else EMPTY
+
+    def ensure(self, symbol: str, tf: int, limit: int) -> List[Candle]:
+        """Liefert die Serie; lädt sie nur, wenn sie fehlt oder kürzer als limit angefordert war."""
+        key = (symbol, tf)
+        with self._lock:
+            if self._loaded.get(key, 0) >= limit:
+                return self.store[symbol][tf]
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+        if not owner:
+            fut.result()
+            # Ein laufender Abruf mit kleinerem Limit reicht evtl. nicht – dann erneut
+            return self.ensure(symbol, tf, limit)
+        return self._load(key, limit, fut)
+
+    def seed(self, symbol: str, tf: int, candles: List[Candle], limit: int = 0) -> None:
+        """Setzt eine bereits vorhandene Serie als geladen (Benchmarks, Tests); limit=0 → len(candles)."""
+        key = (symbol, tf)
+        with self._lock:
+            if key in self._inflight:
+                raise RuntimeError(f"Historie {key} wird gerade geladen")
+            self.store.setdefault(symbol, {})[tf] = candles
+            self._loaded[key] = limit or len(candles)
+
+    def reload(self, symbol: str, tf: int, limit: int) -> List[Candle]:
+        """Erzwingt einen neuen Abruf (z.B. nach Verbindungsverlust)."""
+        key = (symbol, tf)
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is None:
+                self._loaded.pop(key, None)
+        if fut is not None:
+            fut.result()
+            return self.store[symbol][tf]
+        return self.ensure(symbol, tf, limit)
+
+    def _load(self, key: Key, limit: int, fut: Future) -> List[Candle]:
+        symbol, tf = key
+        try:
+            candles = self.loader(symbol, tf, limit)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self.fetches += 1
+            self.store.setdefault(symbol, {})[tf] = candles
+            self._loaded[key] = limit
+            self._inflight.pop(key, None)
+        fut.set_result(candles)
+        return candles
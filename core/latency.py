@@ -0,0 +1,131 @@
+# core/latency.py
+"""
+Latenz-Messung des Pfads Bar-Close → Order-Submission.
+Pro (Symbol, TF, Stage) ein Histogramm mit logarithmischen Buckets (HDR-artig:
+16 Sub-Buckets pro Zweierpotenz, ~6 % relative Auflösung, feste Größe, O(1) pro Wert).
+Zeiten in Nanosekunden über time.monotonic_ns(). Ist die Messung deaktiviert,
+kostet jede Messstelle nur die Abfrage von recorder.enabled.
+
+Stages:
+    close_to_detect   Broker-Bar-Close (Wall-Clock) → Erkennung im Polling
+    detect_to_deliver Erkennung → Start der Verarbeitung (Inbox-Wartezeit bei threaded Dispatch)
+    history_ema       History-Append + EMA-Update
+    fsm               PhaseStateMachine.update_with_candle
+    entry_check       ConfigEntryLogic.check_buy_stop / check_sell_stop
+    position_size     RiskManager.calculate_position_size
+    detect_to_submit  Erkennung der E-Kerze → place_order an den Executor übergeben
+    order_roundtrip   Executor-Übergabe → order_send-Resultat
+"""
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+from config.runtime import LATENCY_ENABLED
+
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS
+_N_BUCKETS = 64 * _SUB
+
+
+def _bucket(value: int) -> int:
+    if value < 2 * _SUB:
+        return max(value, 0)
+    shift = value.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * _SUB + ((value >> shift) - _SUB)
+
+
+def _bucket_upper(idx: int) -> int:
+    if idx < 2 * _SUB:
+        return idx
+    shift = idx // _SUB - 1
+    mantissa = idx % _SUB + _SUB
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts: List[int] = [0] * _N_BUCKETS
+        self.count = 0
+        self.max = 0
+
+    def record(self, ns: int) -> None:
+        self.counts[_bucket(ns)] += 1
+        self.count += 1
+        if ns > self.max:
+            self.max = ns
+
+    def percentile(self, q: float) -> int:
+        """Obergrenze des Buckets, in dem das q-Quantil (0..100) liegt."""
+        if self.count == 0:
+            return 0
+        target = max(1, int(round(self.count * q / 100.0)))
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(_bucket_upper(idx), self.max)
+        return self.max
+
+
+class LatencyRecorder:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._hists: Dict[Tuple[str, int, str], LatencyHistogram] = {}
+        self._detected: Dict[Hashable, int] = {}
+
+    def record(self, symbol: str, tf: int, stage: str, ns: int) -> None:
+        key = (symbol, tf, stage)
+        hist = self._hists.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._hists.setdefault(key, LatencyHistogram())
+        hist.record(ns)
+
+    def since(self, symbol: str, tf: int, stage: str, start_ns: int) -> None:
+        self.record(symbol, tf, stage, time.monotonic_ns() - start_ns)
+
+    def mark_detected(self, symbol: str, tf: int, ts, close_epoch: Optional[float] = None) -> None:
+        """Merkt den Erkennungszeitpunkt einer Kerze (und optional die Verzögerung seit Bar-Close)."""
+        self._detected[(symbol, tf, ts)] = time.monotonic_ns()
+        if close_epoch is not None:
+            self.record(symbol, tf, "close_to_detect", max(0, int((time.time() - close_epoch) * 1e9)))
+        if len(self._detected) > 10_000:
+            with self._lock:
+                for key in list(self._detected)[:5_000]:
+                    self._detected.pop(key, None)
+
+    def since_detected(self, symbol: str, tf: int, ts, stage: str) -> None:
+        start = self._detected.get((symbol, tf, ts))
+        if start is not None:
+            self.since(symbol, tf, stage, start)
+
+    def snapshot(self) -> Dict[Tuple[str, int, str], Dict[str, float]]:
+        """p50/p99/max in Millisekunden pro (Symbol, TF, Stage)."""
+        with self._lock:
+            items = list(self._hists.items())
+        return {
+            key: {
+                "count": h.count,
+                "p50": h.percentile(50) / 1e6,
+                "p99": h.percentile(99) / 1e6,
+                "max": h.max / 1e6,
+            }
+            for key, h in sorted(items)
+        }
+
+    def report(self) -> str:
+        lines = [f"{'Symbol':<12}{'TF':>7}  {'Stage':<18}{'n':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for (symbol, tf, stage), s in self.snapshot().items():
+            lines.append(
+                f"{symbol:<12}{tf:>7}  {stage:<18}{s['count']:>8}{s['p50']:>10.3f}{s['p99']:>10.3f}{s['max']:>10.3f}"
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hists.clear()
+            self._detected.clear()
+
+
+# Prozessweiter Recorder (Messstellen prüfen recorder.enabled)
+recorder = LatencyRecorder(LATENCY_ENABLED)
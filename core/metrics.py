@@ -0,0 +1,231 @@
+# core/metrics.py
+"""
+In-Memory-Metriken im Prometheus-Textformat.
+Counter/Gauges/Summaries werden an den Messstellen fortgeschrieben; ein HTTP-Server
+auf localhost liefert sie unter /metrics aus. Der Server-Thread liest nur diese
+Werte und registrierte Collector (Queue-Tiefen, Speicher) – nie die MT5-API.
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config.runtime import METRICS_ENABLED
+
+PREFIX = "fxbot_"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Optional[Dict[str, object]]) -> Labels:
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    body = ",".join(
+        f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels
+    )
+    return "{" + body + "}"
+
+
+def _fmt_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        # Collector: liefern beim Scrape (name, typ, help, [(labels, wert)])
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Tuple[Dict, float]]]]]] = []
+
+    def _declare(self, name: str, kind: str, help_text: str) -> Dict[Labels, float]:
+        series = self._values.get(name)
+        if series is None:
+            self._types[name] = kind
+            self._help[name] = help_text
+            series = self._values[name] = {}
+        return series
+
+    def inc(self, name: str, labels: Optional[Dict] = None, value: float = 1.0, help_text: str = "") -> None:
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._declare(name, "counter", help_text)
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, labels: Optional[Dict] = None, help_text: str = "") -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._declare(name, "gauge", help_text)[_labels(labels)] = value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict] = None, help_text: str = "") -> None:
+        """Dauer-/Größenmessung: _sum und _count als Counter, zusätzlich _last als Gauge."""
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            s = self._declare(name + "_sum", "counter", help_text)
+            s[key] = s.get(key, 0.0) + value
+            c = self._declare(name + "_count", "counter", help_text)
+            c[key] = c.get(key, 0.0) + 1
+            self._declare(name + "_last", "gauge", help_text)[key] = value
+
+    def register_collector(self, fn: Callable) -> None:
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        with self._lock:
+            snapshot = {name: dict(series) for name, series in self._values.items()}
+            types = dict(self._types)
+            helps = dict(self._help)
+        lines: List[str] = []
+        for name in sorted(snapshot):
+            full = PREFIX + name
+            if helps.get(name):
+                lines.append(f"# HELP {full} {helps[name]}")
+            lines.append(f"# TYPE {full} {types[name]}")
+            for labels, value in sorted(snapshot[name].items()):
+                lines.append(f"{full}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for fn in self._collectors:
+            try:
+                for name, kind, help_text, samples in fn():
+                    full = PREFIX + name
+                    lines.append(f"# HELP {full} {help_text}")
+                    lines.append(f"# TYPE {full} {kind}")
+                    for labels, value in samples:
+                        lines.append(f"{full}{_fmt_labels(_labels(labels))} {_fmt_value(value)}")
+            except Exception as e:
+                lines.append(f"# collector error: {e}")
+        return "\n".join(lines) + "\n"
+
+
+# Prozessweite Registry (Messstellen rufen inc/set/observe, die bei enabled=False sofort zurückkehren)
+metrics = MetricsRegistry(METRICS_ENABLED)
+
+
+# ---------------- Standard-Collector ----------------
+
+def _rss_bytes() -> Optional[float]:
+    try:
+        import psutil
+        return float(psutil.Process(os.getpid()).memory_info().rss)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return float(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def process_collector():
+    rss = _rss_bytes()
+    if rss is not None:
+        yield "process_resident_memory_bytes", "gauge", "Resident Set Size des Bot-Prozesses", [({}, rss)]
+    yield "process_threads", "gauge", "Anzahl Python-Threads", [({}, threading.active_count())]
+    yield "uptime_seconds", "gauge", "Laufzeit des Bot-Prozesses in Sekunden", [({}, time.monotonic() - _started)]
+
+
+def handler_collector(handler):
+    """Queue-Tiefen des DataHandlers (Symbol-Inboxen, Order-Executor) – ohne MT5-Aufrufe."""
+    def collect():
+        workers = list(getattr(handler, "workers", {}).items())
+        yield "inbox_depth", "gauge", "Wartende Kerzen pro Symbol-Inbox", [
+            ({"symbol": sym}, w.depth()) for sym, w in workers
+        ]
+        yield "inbox_dropped_total", "counter", "Wegen voller Inbox verworfene Kerzen", [
+            ({"symbol": sym}, w.dropped) for sym, w in workers
+        ]
+        executor = getattr(handler, "executor", None)
+        if executor is not None:
+            yield "order_intents_pending", "gauge", "Order-Intents beim Executor", [({}, executor.pending())]
+    return collect
+
+
+def latency_collector(recorder):
+    """Exportiert die Latenz-Histogramme (core/latency.py) als p50/p99/max-Gauges."""
+    def collect():
+        if not recorder.enabled:
+            return
+        samples = []
+        for (symbol, tf, stage), s in recorder.snapshot().items():
+            for q in ("p50", "p99", "max"):
+                samples.append(({"symbol": symbol, "tf": tf, "stage": stage, "q": q}, s[q] / 1e3))
+        yield "stage_latency_seconds", "gauge", "Latenz pro Stage (Bar-Close → Order)", samples
+    return collect
+
+
+# ---------------- MT5-Instrumentierung ----------------
+
+# order_send wird vom Order-Executor gezählt (mit Aktion/Ergebnis)
+_INSTRUMENTED = (
+    "copy_rates_from_pos", "copy_rates_range", "copy_ticks_from", "symbol_info", "symbol_info_tick",
+    "symbol_select", "symbols_get", "positions_get", "orders_get", "account_info", "order_check",
+    "order_calc_margin",
+)
+
+
+def instrument_mt5(mt5_module) -> None:
+    """
+    Ersetzt die MT5-Funktionen am Modul durch zählende Wrapper (broker_calls_total,
+    broker_errors_total). Fehler = Exception oder None-Resultat.
+    """
+    for fn_name in _INSTRUMENTED:
+        fn = getattr(mt5_module, fn_name, None)
+        if fn is None or getattr(fn, "_metrics_wrapped", False):
+            continue
+
+        def wrapper(*args, _fn=fn, _name=fn_name, **kwargs):
+            metrics.inc("broker_calls_total", {"call": _name}, help_text="MT5-API-Aufrufe")
+            try:
+                res = _fn(*args, **kwargs)
+            except Exception:
+                metrics.inc("broker_errors_total", {"call": _name}, help_text="Fehlgeschlagene MT5-API-Aufrufe")
+                raise
+            if res is None:
+                metrics.inc("broker_errors_total", {"call": _name}, help_text="Fehlgeschlagene MT5-API-Aufrufe")
+            return res
+
+        wrapper._metrics_wrapped = True
+        setattr(mt5_module, fn_name, wrapper)
+
+
+# ---------------- HTTP-Server ----------------
+
+_started = time.monotonic()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass  # kein Request-Log auf stdout
+
+
+def start_metrics_server(host: str = "127.0.0.1", port: int = 9108) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    print(f"[METRICS] Endpoint: http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,303 @@
+# core/order_executor.py
+"""
+Zentrale Order-Ausführung: alle order_check/order_send-Aufrufe laufen über eine
+Intent-Queue und einen eigenen Executor-Thread.
+- Idempotenz: pro Schlüssel (z.B. (symbol, 'be', ticket)) ist höchstens ein Intent
+  unterwegs; erfolgreiche Intents bleiben für IDEMPOTENCY_TTL Sekunden gemerkt.
+- Retry: Requotes/Preisänderungen/Rate-Limits (Order sicher abgelehnt) werden mit
+  exponentiellem Backoff wiederholt, der Request wird dabei jedes Mal neu gebaut
+  (frische Preise).
+- Unbekannter Ausgang (Timeout, Verbindungsfehler, Exception/None nach order_send):
+  idempotente Intents (SL-Änderung, Cancel, Close per Ticket) werden wiederholt;
+  nicht-idempotente (Platzierungen) nur, wenn recover() beim Broker keine bereits
+  angelegte Order findet – ohne recover() wird gar nicht wiederholt.
+- Ergebnis: concurrent.futures.Future mit dem order_send-Resultat (oder None);
+  Strategie-Threads hängen Callbacks an statt zu warten.
+"""
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from core.metrics import metrics
+
+BASE_DELAY = 0.2
+MAX_DELAY = 5.0
+MAX_ATTEMPTS = 4
+IDEMPOTENCY_TTL = 60.0
+
+# MT5-Retcodes (Fallback-Werte, falls das Modul sie nicht exportiert)
+_RETCODE_DEFAULTS = {
+    'TRADE_RETCODE_PLACED': 10008,
+    'TRADE_RETCODE_DONE': 10009,
+    'TRADE_RETCODE_DONE_PARTIAL': 10010,
+    'TRADE_RETCODE_REQUOTE': 10004,
+    'TRADE_RETCODE_TIMEOUT': 10012,
+    'TRADE_RETCODE_PRICE_CHANGED': 10020,
+    'TRADE_RETCODE_PRICE_OFF': 10021,
+    'TRADE_RETCODE_TOO_MANY_REQUESTS': 10024,
+    'TRADE_RETCODE_CONNECTION': 10031,
+}
+
+
+class OrderIntent:
+    def __init__(
+        self,
+        key: Hashable,
+        build: Callable[[], Optional[Dict]],
+        check: bool,
+        max_attempts: int,
+        idempotent: bool = True,
+        recover: Optional[Callable[[], object]] = None
+    ):
+        self.key = key
+        self.build = build
+        self.check = check
+        self.max_attempts = max_attempts
+        self.idempotent = idempotent
+        self.recover = recover
+        self.attempts = 0
+        self.future: Future = Future()
+
+    def __repr__(self):
+        return f"OrderIntent(key={self.key}, attempts={self.attempts})"
+
+
+class OrderExecutor:
+    def __init__(self, mt5_module, base_delay: float = BASE_DELAY, max_delay: float = MAX_DELAY):
+        self.mt5 = mt5_module
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        rc = {name: getattr(mt5_module, name, default) for name, default in _RETCODE_DEFAULTS.items()}
+        self.ok_retcodes = {0, rc['TRADE_RETCODE_PLACED'], rc['TRADE_RETCODE_DONE'], rc['TRADE_RETCODE_DONE_PARTIAL']}
+        # Order sicher nicht angenommen → gefahrlos neu senden
+        self.rejected_retcodes = {
+            rc['TRADE_RETCODE_REQUOTE'], rc['TRADE_RETCODE_PRICE_CHANGED'],
+            rc['TRADE_RETCODE_PRICE_OFF'], rc['TRADE_RETCODE_TOO_MANY_REQUESTS'],
+        }
+        # Ausgang unbekannt → Order kann beim Broker liegen
+        self.unknown_retcodes = {rc['TRADE_RETCODE_TIMEOUT'], rc['TRADE_RETCODE_CONNECTION']}
+        self.transient_retcodes = self.rejected_retcodes | self.unknown_retcodes
+
+        self.action_names = {
+            getattr(mt5_module, name): label
+            for name, label in (('TRADE_ACTION_DEAL', 'deal'), ('TRADE_ACTION_PENDING', 'pending'),
+                                ('TRADE_ACTION_SLTP', 'sltp'), ('TRADE_ACTION_MODIFY', 'modify'),
+                                ('TRADE_ACTION_REMOVE', 'remove'))
+            if hasattr(mt5_module, name)
+        }
+
+        self._cond = threading.Condition()
+        self._heap: list = []  # (due, seq, intent)
+        self._seq = itertools.count()
+        self._inflight: Dict[Hashable, OrderIntent] = {}
+        self._completed: Dict[Hashable, Tuple[float, Future]] = {}
+        self._finishing = 0  # abgeschlossene Intents, deren Callbacks noch laufen
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    # ---------------- Öffentliche API ----------------
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, name="order-executor", daemon=True)
+            self._thread.start()
+
+    def submit(
+        self,
+        key: Hashable,
+        build: Callable[[], Optional[Dict]],
+        check: bool = True,
+        on_done: Optional[Callable] = None,
+        delay: float = 0.0,
+        max_attempts: int = MAX_ATTEMPTS,
+        idempotent: bool = True,
+        recover: Optional[Callable[[], object]] = None
+    ) -> Future:
+        """
+        Reiht einen Order-Intent ein. build() liefert den MT5-Request (oder None = abbrechen)
+        und wird im Executor-Thread aufgerufen. on_done(result) wird nach Abschluss aufgerufen.
+        idempotent=False: nach unbekanntem Ausgang nur erneut senden, wenn recover() nichts
+        findet; recover() liefert ein Ergebnis-Objekt für eine bereits angelegte Order oder None.
+        """
+        self.start()
+        with self._cond:
+            self._expire_completed()
+            existing = self._inflight.get(key)
+            if existing is None and key in self._completed:
+                fut = self._completed[key][1]
+            elif existing is not None:
+                print(f"[ORDER-EXEC] Intent {key} bereits unterwegs – wird nicht doppelt gesendet.")
+                fut = existing.future
+            else:
+                intent = OrderIntent(key, build, check, max_attempts, idempotent, recover)
+                self._inflight[key] = intent
+                heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), intent))
+                self._cond.notify()
+                fut = intent.future
+        if on_done is not None:
+            fut.add_done_callback(lambda f: self._run_callback(on_done, f))
+        return fut
+
+    def execute(self, key: Hashable, build: Callable[[], Optional[Dict]], check: bool = True, timeout: Optional[float] = 60.0):
+        """Synchron: Intent einreihen und auf das Ergebnis warten (nur für Startup/Cleanup)."""
+        return self.submit(key, build, check=check).result(timeout=timeout)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._inflight)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wartet, bis kein Intent mehr unterwegs ist und alle on_done-Callbacks gelaufen sind."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._inflight and not self._finishing, timeout=timeout)
+
+    def forget(self, key: Optional[Hashable] = None) -> None:
+        """Verwirft gemerkte erfolgreiche Intents (key=None → alle), damit derselbe Schlüssel erneut gesendet wird."""
+        with self._cond:
+            if key is None:
+                self._completed.clear()
+            else:
+                self._completed.pop(key, None)
+
+    def is_ok(self, res) -> bool:
+        return res is not None and getattr(res, 'retcode', None) in self.ok_retcodes
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    # ---------------- Executor-Thread ----------------
+
+    @staticmethod
+    def _run_callback(cb: Callable, fut: Future) -> None:
+        try:
+            cb(fut.result())
+        except Exception as e:
+            print(f"[ERROR] Order-Callback-Fehler: {e} ({cb})")
+
+    def _expire_completed(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (t, _) in self._completed.items() if now - t > IDEMPOTENCY_TTL]:
+            self._completed.pop(key, None)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout=timeout)
+                if not self._running:
+                    return
+                _, _, intent = heapq.heappop(self._heap)
+            self._attempt(intent)
+
+    def _attempt(self, intent: OrderIntent) -> None:
+        intent.attempts += 1
+        sent = False
+        try:
+            req = intent.build()
+            if req is None:
+                self._finish(intent, None)
+                return
+            if intent.check:
+                chk = self.mt5.order_check(req)
+                if not chk or chk.retcode not in self.ok_retcodes:
+                    if chk is not None and chk.retcode in self.transient_retcodes and self._retry(intent):
+                        return
+                    print(f"[ERROR] order_check {intent.key} fehlgeschlagen: retcode={getattr(chk,'retcode',None)}, comment={getattr(chk,'comment',None)}")
+                    self._finish(intent, None)
+                    return
+            sent = True
+            res = self.mt5.order_send(req)
+            self._count_send(req, res)
+        except Exception as e:
+            print(f"[ERROR] Order-Intent {intent.key} Exception: {e}")
+            if sent:
+                self._unknown_outcome(intent, None)
+            elif not self._retry(intent):
+                self._finish(intent, None)
+            return
+
+        retcode = getattr(res, 'retcode', None)
+        if res is None or retcode in self.unknown_retcodes:
+            self._unknown_outcome(intent, res)
+            return
+        if retcode in self.rejected_retcodes and self._retry(intent):
+            return
+        print(f"[ORDER-EXEC] {intent.key} → retcode={retcode}, order={getattr(res,'order',None)}, attempt={intent.attempts}")
+        self._finish(intent, res)
+
+    def _unknown_outcome(self, intent: OrderIntent, res) -> None:
+        """order_send ohne eindeutige Antwort: nur erneut senden, wenn kein Duplikat entstehen kann."""
+        retcode = getattr(res, 'retcode', None)
+        if not intent.idempotent:
+            found = None
+            if intent.recover is not None:
+                try:
+                    found = intent.recover()
+                except Exception as e:
+                    print(f"[ERROR] Order-Recovery {intent.key} Exception: {e}")
+                    self._finish(intent, res)
+                    return
+            if found is not None:
+                metrics.inc("order_recovered_total", help_text="Nach unbekanntem Ausgang beim Broker gefundene Orders")
+                print(f"[ORDER-EXEC] {intent.key} → Order beim Broker gefunden (order={getattr(found,'order',None)}), kein erneutes Senden.")
+                self._finish(intent, found)
+                return
+            if intent.recover is None:
+                print(f"[WARN] {intent.key} → Ausgang unbekannt (retcode={retcode}), keine Wiederholung ohne Recovery.")
+                self._finish(intent, res)
+                return
+        if self._retry(intent):
+            return
+        print(f"[ORDER-EXEC] {intent.key} → retcode={retcode}, order={getattr(res,'order',None)}, attempt={intent.attempts}")
+        self._finish(intent, res)
+
+    def _count_send(self, req: Dict, res) -> None:
+        retcode = getattr(res, 'retcode', None)
+        if retcode in self.ok_retcodes and res is not None:
+            result = 'ok'
+        elif retcode in self.rejected_retcodes:
+            result = 'transient'
+        elif res is None or retcode in self.unknown_retcodes:
+            result = 'unknown'
+        else:
+            result = 'error'
+        metrics.inc(
+            "order_sends_total",
+            {"action": self.action_names.get(req.get('action'), 'other'), "result": result},
+            help_text="order_send-Aufrufe nach Aktion und Ergebnis"
+        )
+
+    def _retry(self, intent: OrderIntent) -> bool:
+        if intent.attempts >= intent.max_attempts:
+            return False
+        delay = min(self.base_delay * (2 ** (intent.attempts - 1)), self.max_delay)
+        metrics.inc("order_retries_total", help_text="Wiederholte Order-Intents")
+        print(f"[ORDER-EXEC] Retry {intent.key} in {delay:.2f}s (Versuch {intent.attempts + 1}/{intent.max_attempts})")
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), intent))
+            self._cond.notify()
+        return True
+
+    def _finish(self, intent: OrderIntent, res) -> None:
+        with self._cond:
+            self._inflight.pop(intent.key, None)
+            if self.is_ok(res):
+                self._completed[intent.key] = (time.monotonic(), intent.future)
+            self._finishing += 1
+        try:
+            intent.future.set_result(res)
+        finally:
+            with self._cond:
+                self._finishing -= 1
+                self._cond.notify_all()
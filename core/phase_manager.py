@@ -2,11 +2,16 @@
 """
 State Machine für Phasen-Übergänge. Nutzt das zentrale PhaseState-Objekt.
 """
-from typing import List
-from config.phase import PHASE_RULES
+from datetime import datetime
+from typing import List, Tuple
+from config.phase import PHASE_RULES, _debug
 from core.types import PhaseRule, Phase, Candle
 from core.phase_state import PhaseState
 from core.phase_state import Confirmation
+from core.debug import quiet
+
+# Limitierung der Kerzenanzahl im FSM-Puffer
+MAX_CANDLES = 100
 
 class PhaseStateMachine:
     def __init__(self):
@@ -21,6 +26,27 @@ class PhaseStateMachine:
             self.update_with_candle(candle)
         return self.state.current_phase
 
+    def replay_batch(
+        self,
+        candles: List[Candle],
+        record_transitions: bool = False
+    ) -> Tuple[Phase, List[Tuple[datetime, Phase, Phase]]]:
+        """
+        Schneller Warm-up-Replay: gleiche Regeln und gleiches Puffer-Fenster wie
+        replay_from_scratch, aber ohne Debug-Ausgaben.
+        Liefert die finale Phase und optional ein kompaktes Log (ts, von, nach).
+        """
+        transitions: List[Tuple[datetime, Phase, Phase]] = []
+        self.state.reset()
+        self.state.current_phase = Phase.NEUTRAL
+        with quiet():
+            for candle in candles:
+                prev_phase = self.state.current_phase
+                new_phase = self.update_with_candle(candle)
+                if record_transitions and new_phase != prev_phase:
+                    transitions.append((candle.timestamp, prev_phase, new_phase))
+        return self.state.current_phase, transitions
+
 
 
 
@@ -30,14 +56,14 @@ class PhaseStateMachine:
         self.state.reset()
 
     def update(self, candles: List[Candle]) -> Phase:
-        print(f"[DEBUG] FSM state ID: {id(self.state)}")
+        _debug("FSM state ID: %s", id(self.state))
         prev_phase = self.state.current_phase
         self.state.last_candles = candles
 
         for rule in self.rules:
             if rule.from_phase == prev_phase:
                 condition_result = rule.condition(prev_phase, candles, self.state)
-                print(f"[DEBUG] Prüfe Regel: {rule.from_phase.name} -> {rule.to_phase.name}, Bedingung: {condition_result}")
+                _debug("Prüfe Regel: %s -> %s, Bedingung: %s", rule.from_phase.name, rule.to_phase.name, condition_result)
                 if condition_result:
                     # Phase wechseln
                     new_phase = rule.to_phase
@@ -45,8 +71,8 @@ class PhaseStateMachine:
                         # Kein Wechsel, Kontext bleibt erhalten
                         return prev_phase
 
-                    print(f"[FSM] Phase Wechsel von {prev_phase.name} zu {new_phase.name}")
-                    print(f"[DEBUG] Kontext vor Wechsel: {self.state}")
+                    _debug("Phase Wechsel von %s zu %s", prev_phase.name, new_phase.name, tag="FSM")
+                    _debug("Kontext vor Wechsel: %s", self.state)
 
                     # Kontext-Löschungen je nach Phasenwechsel
                     
@@ -154,15 +180,15 @@ class PhaseStateMachine:
                     # Phase im State setzen
                     self.state.current_phase = new_phase
 
-                    print(f"[DEBUG] Kontext nach Wechsel: {self.state}")
+                    _debug("Kontext nach Wechsel: %s", self.state)
                     return new_phase
 
-        print(f"[DEBUG] Keine Regel zum Phasenwechsel gefunden, bleibe bei {prev_phase.name}")
+        _debug("Keine Regel zum Phasenwechsel gefunden, bleibe bei %s", prev_phase.name)
         return prev_phase
     
     
     def update_with_candle(self, candle: Candle) -> Phase:
-        print(f"[DEBUG] FSM state ID: {id(self.state)}")
+        _debug("FSM state ID: %s", id(self.state))
         prev_phase = self.state.current_phase
 
         # Anhängen der neuen Kerze an den Puffer
@@ -170,8 +196,7 @@ class PhaseStateMachine:
             self.state.last_candles = []
         self.state.last_candles.append(candle)
 
-        # Optional: Limitierung der Kerzenanzahl im Puffer (z.B. 100)
-        MAX_CANDLES = 100
+        # Limitierung der Kerzenanzahl im Puffer
         if len(self.state.last_candles) > MAX_CANDLES:
             self.state.last_candles.pop(0)
 
@@ -179,14 +204,14 @@ class PhaseStateMachine:
         for rule in self.rules:
             if rule.from_phase == prev_phase:
                 condition_result = rule.condition(prev_phase, self.state.last_candles, self.state)
-                print(f"[DEBUG] Prüfe Regel: {rule.from_phase.name} -> {rule.to_phase.name}, Bedingung: {condition_result}")
+                _debug("Prüfe Regel: %s -> %s, Bedingung: %s", rule.from_phase.name, rule.to_phase.name, condition_result)
                 if condition_result:
                     new_phase = rule.to_phase
                     if new_phase == prev_phase:
                         return prev_phase
 
-                    print(f"[FSM] Phase Wechsel von {prev_phase.name} zu {new_phase.name}")
-                    print(f"[DEBUG] Kontext vor Wechsel: {self.state}")
+                    _debug("Phase Wechsel von %s zu %s", prev_phase.name, new_phase.name, tag="FSM")
+                    _debug("Kontext vor Wechsel: %s", self.state)
 
                     # Kontext-Löschungen je nach Phasenwechsel
                     if prev_phase == Phase.SWITCH_BULL and new_phase not in (Phase.SWITCH_BULL, Phase.BASE_SWITCH_BULL):
@@ -268,10 +293,10 @@ class PhaseStateMachine:
                         self.state.last_confirmation_bearish.candle = None
 
                     self.state.current_phase = new_phase
-                    print(f"[DEBUG] Kontext nach Wechsel: {self.state}")
+                    _debug("Kontext nach Wechsel: %s", self.state)
                     return new_phase
 
-        print(f"[DEBUG] Keine Regel zum Phasenwechsel gefunden, bleibe bei {prev_phase.name}")
+        _debug("Keine Regel zum Phasenwechsel gefunden, bleibe bei %s", prev_phase.name)
         return prev_phase
 
 
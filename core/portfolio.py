@@ -0,0 +1,201 @@
+# core/portfolio.py
+"""
+Portfolio-Risiko über alle Symbole (eine Instanz pro DataHandler, von allen Controllern geteilt).
+Jede offene Position bzw. Pending-Order ist eine Zeile in einer NumPy-Matrix mit ihren
+Netto-Währungseinheiten (long EURUSD 1 Lot = +100 000 EUR, −100 000·Kurs USD) und ihrem
+Risiko bis zum SL in Kontowährung. Die Summenvektoren (Netto-Exposure je Währung,
+offenes Risiko) werden bei Fill/Close/SL-Änderung inkrementell fortgeschrieben.
+Pre-Trade-Checks bewerten beliebig viele Kandidaten in einem Schritt als Array-Operation:
+    |Exposure_nachher · Kurs| ≤ max_currency_exposure · Balance   (nur wo der Kandidat erhöht)
+    offenes Risiko + Kandidatenrisiko ≤ max_open_risk · Balance
+Kandidaten werden jeweils einzeln gegen den aktuellen Bestand geprüft (nicht kumulativ).
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from config.runtime import PORTFOLIO_MAX_CURRENCY_EXPOSURE, PORTFOLIO_MAX_OPEN_RISK
+
+MAGIC = 234000
+
+Candidate = Tuple[str, str, float, float, float]  # (symbol, side, volume, entry, stop_loss)
+
+
+class PortfolioRisk:
+    def __init__(
+        self,
+        fx,
+        balance: Optional[float] = None,
+        max_currency_exposure: float = PORTFOLIO_MAX_CURRENCY_EXPOSURE,
+        max_open_risk: float = PORTFOLIO_MAX_OPEN_RISK,
+        capacity: int = 64
+    ):
+        self.fx = fx
+        self.balance = balance
+        self.max_currency_exposure = max_currency_exposure
+        self.max_open_risk = max_open_risk
+        self._lock = threading.Lock()
+        self.currencies: List[str] = []
+        self._ccy: Dict[str, int] = {}
+        self._units = np.zeros((capacity, 0))    # Zeile = Position/Order, Spalte = Währung
+        self._risk = np.zeros(capacity)           # Risiko bis SL in Kontowährung
+        self._net = np.zeros(0)                   # Summe der Zeilen
+        self._open_risk = 0.0
+        self._rows: Dict[int, int] = {}           # Ticket → Zeile
+        self._meta: Dict[int, Tuple[str, bool]] = {}  # Ticket → (Symbol, pending)
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    # ---------------- Struktur ----------------
+
+    def _col(self, currency: str) -> int:
+        idx = self._ccy.get(currency)
+        if idx is None:
+            idx = self._ccy[currency] = len(self.currencies)
+            self.currencies.append(currency)
+            self._units = np.pad(self._units, ((0, 0), (0, 1)))
+            self._net = np.append(self._net, 0.0)
+        return idx
+
+    def _row(self) -> int:
+        if not self._free:
+            cap = len(self._risk)
+            self._units = np.pad(self._units, ((0, cap), (0, 0)))
+            self._risk = np.pad(self._risk, (0, cap))
+            self._free = list(range(2 * cap - 1, cap - 1, -1))
+        return self._free.pop()
+
+    def _trade_vector(self, symbol: str, side: str, volume: float, price: float, sl: Optional[float]):
+        spec = self.fx.spec(symbol)
+        b, q = self._col(spec.base), self._col(spec.quote)
+        units = volume * spec.contract_size * (1.0 if side == 'buy' else -1.0)
+        risk = 0.0
+        if sl:
+            pip_value = self.fx.pip_value(symbol) or 0.0
+            loss = (price - sl) if side == 'buy' else (sl - price)
+            risk = max(0.0, loss) / spec.pip_size * pip_value * volume
+        return b, q, units, units * price, risk
+
+    # ---------------- Fills / Closes ----------------
+
+    def open(self, ticket: int, symbol: str, side: str, volume: float, price: float,
+             sl: Optional[float], pending: bool = False) -> None:
+        """Nimmt eine Position oder (pending=True) eine reservierte Pending-Order auf."""
+        with self._lock:
+            if ticket in self._rows:
+                self._remove(ticket)
+            b, q, base_units, quote_units, risk = self._trade_vector(symbol, side, volume, price, sl)
+            row = self._row()
+            self._units[row, :] = 0.0
+            self._units[row, b] += base_units
+            self._units[row, q] -= quote_units
+            self._risk[row] = risk
+            self._net += self._units[row]
+            self._open_risk += risk
+            self._rows[ticket] = row
+            self._meta[ticket] = (symbol, pending)
+
+    def close(self, ticket: int) -> None:
+        with self._lock:
+            self._remove(ticket)
+
+    def _remove(self, ticket: int) -> None:
+        row = self._rows.pop(ticket, None)
+        if row is None:
+            return
+        self._meta.pop(ticket, None)
+        self._net -= self._units[row]
+        self._open_risk -= self._risk[row]
+        self._units[row, :] = 0.0
+        self._risk[row] = 0.0
+        self._free.append(row)
+
+    def update_sl(self, ticket: int, symbol: str, side: str, volume: float, price: float, sl: Optional[float]) -> None:
+        """Risiko einer Position nach SL-Änderung (Break-Even/Trailing) neu bewerten."""
+        with self._lock:
+            row = self._rows.get(ticket)
+            if row is None:
+                return
+            risk = self._trade_vector(symbol, side, volume, price, sl)[4]
+            self._open_risk += risk - self._risk[row]
+            self._risk[row] = risk
+
+    def sync(self, symbol: str, positions: Iterable, orders: Optional[Iterable] = None) -> None:
+        """
+        Abgleich mit einem Broker-Snapshot eines Symbols (nur Bot-Tickets): neue Tickets
+        aufnehmen, geschlossene entfernen, geänderte SLs neu bewerten. Pending-Reservierungen
+        werden nur entfernt, wenn auch die Orders des Symbols übergeben wurden.
+        """
+        seen = set()
+        for p in positions:
+            if getattr(p, 'magic', MAGIC) != MAGIC:
+                continue
+            seen.add(p.ticket)
+            side = 'buy' if p.type == 0 else 'sell'
+            meta = self._meta.get(p.ticket)
+            if meta is None or meta[1]:
+                self.open(p.ticket, symbol, side, p.volume, p.price_open, p.sl)
+            else:
+                self.update_sl(p.ticket, symbol, side, p.volume, p.price_open, p.sl)
+        if orders is not None:
+            for o in orders:
+                if getattr(o, 'magic', MAGIC) != MAGIC:
+                    continue
+                seen.add(o.ticket)
+                if o.ticket not in self._meta:
+                    side = 'buy' if o.type in (2, 4) else 'sell'  # BUY_LIMIT/BUY_STOP
+                    volume = getattr(o, 'volume_current', None) or getattr(o, 'volume_initial', 0.0)
+                    self.open(o.ticket, symbol, side, volume, o.price_open, o.sl, pending=True)
+        for ticket, (sym, pending) in list(self._meta.items()):
+            if sym == symbol and ticket not in seen and (not pending or orders is not None):
+                self.close(ticket)
+
+    # ---------------- Abfragen ----------------
+
+    def exposure(self) -> Dict[str, float]:
+        """Netto-Exposure je Währung in Kontowährung."""
+        values = self.fx.values(self.currencies)
+        return {c: float(v) for c, v in zip(self.currencies, np.nan_to_num(self._net * values))}
+
+    def open_risk(self) -> float:
+        return self._open_risk
+
+    def check(self, candidates: Sequence[Candidate]) -> Tuple[np.ndarray, List[str]]:
+        """Prüft alle Kandidaten vektorisiert; liefert (erlaubt[], Grund[])."""
+        k = len(candidates)
+        if k == 0 or not self.balance:
+            return np.ones(k, dtype=bool), [""] * k
+        with self._lock:
+            vectors = [self._trade_vector(*c) for c in candidates]
+            n = len(self.currencies)
+            net = self._net.copy()
+            open_risk = self._open_risk
+        rows = np.arange(k)
+        b = np.fromiter((v[0] for v in vectors), dtype=np.intp, count=k)
+        q = np.fromiter((v[1] for v in vectors), dtype=np.intp, count=k)
+        delta = np.zeros((k, n))
+        np.add.at(delta, (rows, b), [v[2] for v in vectors])
+        np.add.at(delta, (rows, q), [-v[3] for v in vectors])
+        risk = np.fromiter((v[4] for v in vectors), dtype=float, count=k)
+
+        values = np.nan_to_num(self.fx.values(self.currencies), nan=0.0)
+        after = net[None, :] + delta
+        valued = np.abs(after * values[None, :])
+        increases = np.abs(after) > np.abs(net)[None, :] + 1e-9
+        breach = (valued > self.max_currency_exposure * self.balance) & increases
+        exposure_ok = ~breach.any(axis=1)
+        risk_ok = open_risk + risk <= self.max_open_risk * self.balance
+
+        reasons = []
+        for i in range(k):
+            if not exposure_ok[i]:
+                worst = int(np.argmax(np.where(breach[i], valued[i], -1.0)))
+                reasons.append(f"Exposure {self.currencies[worst]} {valued[i, worst]:.0f} > Limit "
+                               f"{self.max_currency_exposure * self.balance:.0f}")
+            elif not risk_ok[i]:
+                reasons.append(f"offenes Risiko {open_risk + risk[i]:.2f} > Limit {self.max_open_risk * self.balance:.2f}")
+            else:
+                reasons.append("")
+        return exposure_ok & risk_ok, reasons
+
+    def allows(self, symbol: str, side: str, volume: float, entry: float, stop_loss: float) -> Tuple[bool, str]:
+        ok, reasons = self.check([(symbol, side, volume, entry, stop_loss)])
+        return bool(ok[0]), reasons[0]
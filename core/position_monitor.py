@@ -0,0 +1,90 @@
+# core/position_monitor.py
+"""
+Positions-Monitor: ein positions_get()/orders_get() für alle Symbole pro Intervall,
+Diff gegen den letzten Snapshot, Änderungen als Events auf den Bus:
+    OrderFilled     neues Positions-Ticket (Fill einer Pending-Order oder Marktorder)
+    SLModified      SL einer offenen Position geändert (BE/Trailing bestätigt, manuell)
+    PositionClosed  Positions-Ticket verschwunden (SL/TP/manuell)
+Die Controller reagieren darauf, statt selbst pro Kerze den Broker abzufragen; für
+Entry-/Stop-Entscheidungen lesen sie den letzten Snapshot (snapshot(symbol)).
+Nur Bot-Tickets (Magic 234000), optional nur die Symbole eines Shard-Workers.
+"""
+import threading
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from core.events import OrderFilled, PositionClosed, SLModified
+
+MAGIC = 234000
+
+
+class PositionMonitor:
+    def __init__(self, mt5_module, publish: Callable, magic: int = MAGIC, symbols: Optional[Iterable[str]] = None):
+        """
+        publish(event) übergibt ein Event an den DataHandler (Dispatch in den Symbol-Worker).
+        symbols: nur diese Symbole beobachten (None = alle).
+        """
+        self.mt5 = mt5_module
+        self.publish = publish
+        self.magic = magic
+        self.symbols = None if symbols is None else set(symbols)
+        self._lock = threading.Lock()
+        self.positions: Dict[int, SimpleNamespace] = {}
+        self.orders: Dict[int, SimpleNamespace] = {}
+        self.polls = 0
+
+    @property
+    def started(self) -> bool:
+        return self.polls > 0
+
+    def poll(self) -> None:
+        positions = self.mt5.positions_get()
+        orders = self.mt5.orders_get()
+        if positions is None or orders is None:
+            return  # Verbindungsfehler: keinen Leer-Snapshot diffen
+        new_pos = {p.ticket: p for p in positions if self._watched(p)}
+        new_ord = {o.ticket: o for o in orders if self._watched(o)}
+        with self._lock:
+            old_pos = self.positions
+            self.positions, self.orders = new_pos, new_ord
+            first = self.polls == 0
+            self.polls += 1
+        if first:
+            return  # Ausgangszustand, Bestand beim Start übernimmt initialize()
+        for ticket, p in new_pos.items():
+            prev = old_pos.get(ticket)
+            if prev is None:
+                self.publish(OrderFilled(p.symbol, ticket, _side(p), p.volume, p.price_open, p.sl))
+            elif prev.sl != p.sl:
+                self.publish(SLModified(p.symbol, ticket, _side(p), p.volume, p.price_open, prev.sl, p.sl))
+        for ticket, p in old_pos.items():
+            if ticket not in new_pos:
+                self.publish(PositionClosed(
+                    p.symbol, ticket, _side(p), p.volume, p.price_open, getattr(p, 'price_current', p.price_open)
+                ))
+
+    def snapshot(self, symbol: str) -> Optional[Tuple[List, List]]:
+        """(positions, orders) eines Symbols aus dem letzten Snapshot (None = noch keiner)."""
+        if not self.started:
+            return None
+        with self._lock:
+            return (
+                [p for p in self.positions.values() if p.symbol == symbol],
+                [o for o in self.orders.values() if o.symbol == symbol],
+            )
+
+    def tickets(self, symbol: str) -> Optional[Set[int]]:
+        """Offene Positions- und Order-Tickets eines Symbols aus dem letzten Snapshot (None = noch keiner)."""
+        if not self.started:
+            return None
+        with self._lock:
+            return (
+                {t for t, p in self.positions.items() if p.symbol == symbol}
+                | {t for t, o in self.orders.items() if o.symbol == symbol}
+            )
+
+    def _watched(self, item) -> bool:
+        return item.magic == self.magic and (self.symbols is None or item.symbol in self.symbols)
+
+
+def _side(position) -> str:
+    return 'buy' if position.type == 0 else 'sell'
@@ -0,0 +1,68 @@
+# core/prices.py
+"""
+Ganzzahlige Preis- und Zeitrechnung für die Order- und Stopp-Pfade.
+Order-Preise, SL-Kandidaten und Lots werden in Punkten (Vielfache von symbol_info.point,
+int) gerundet, verglichen und verschoben; der Float für den Request entsteht über
+to_price(), exakt auf die Stellenzahl des Punkts gerundet. Das ersetzt
+round(x / tick) * tick und math.floor/ceil(x / tick), die driften, sobald x / tick
+knapp neben einer ganzen Zahl landet (math.floor(0.7 / 0.1) = 6).
+Kerzen halten OHLC ebenfalls in Punkten und die Zeit in Epoch-Sekunden (MT5-Feld
+'time'); umgerechnet wird nur an der Broker-Grenze (Polling, Ticks, Order-Requests)
+und für Anzeige/Logs (from_epoch()).
+"""
+import math
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+# Toleranz in Punkten gegen den Float-Rest aus price / point
+_EPS = 1e-6
+_EPOCH = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=None)
+def point_digits(point: float) -> int:
+    """Nachkommastellen eines Punkts (0.00001 → 5, 0.25 → 2)."""
+    return max(0, -Decimal(repr(point)).normalize().as_tuple().exponent)
+
+
+def to_points(price: float, point: float) -> int:
+    """Nächstgelegene ganze Punktzahl."""
+    return int(round(price / point))
+
+
+def floor_points(price: float, point: float) -> int:
+    return math.floor(price / point + _EPS)
+
+
+def ceil_points(price: float, point: float) -> int:
+    return math.ceil(price / point - _EPS)
+
+
+def to_price(points: int, point: float) -> float:
+    """Punkte → Broker-Preis (exakt gerundet, keine ...0000002-Reste)."""
+    return round(points * point, point_digits(point))
+
+
+def round_price(price: float, point: float) -> float:
+    return to_price(to_points(price, point), point)
+
+
+def floor_price(price: float, point: float) -> float:
+    return to_price(floor_points(price, point), point)
+
+
+def ceil_price(price: float, point: float) -> float:
+    return to_price(ceil_points(price, point), point)
+
+
+def from_epoch(seconds: int) -> datetime:
+    """Epoch-Sekunden → naive UTC-datetime (wie bisher die Kerzen-Zeitstempel)."""
+    return _EPOCH + timedelta(seconds=int(seconds))
+
+
+def to_epoch(ts: datetime) -> int:
+    """Naive UTC- bzw. zeitzonenbehaftete datetime → Epoch-Sekunden."""
+    if ts.tzinfo is not None:
+        return int(ts.timestamp())
+    return int((ts - _EPOCH).total_seconds())
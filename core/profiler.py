@@ -0,0 +1,156 @@
+# core/profiler.py
+"""
+Profiling im laufenden Betrieb, ohne Neustart.
+Auslöser: Signal (SIGUSR1, nur Unix) oder Kontrolldatei (PROFILE_CONTROL_FILE; Inhalt
+optional = Dauer in Sekunden). Für die Dauer einer Session
+- sampelt ein Hintergrund-Thread per sys._current_frames() die Stacks des Run-Loops
+  (MainThread), der Symbol-Worker und des Order-Executors → <name>.collapsed
+  (eine Zeile pro Stack "thread;frame;frame count", direkt für flamegraph.pl/speedscope),
+- läuft MultiTimeframeController.on_new_candle unter cProfile → <name>.prof + <name>.txt.
+Danach schaltet sich das Profiling selbst wieder ab.
+"""
+import cProfile
+import io
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+from config.runtime import (
+    PROFILE_DIR, PROFILE_DURATION, PROFILE_SAMPLE_INTERVAL, PROFILE_CONTROL_FILE, PROFILE_THREADS
+)
+
+
+class RuntimeProfiler:
+    def __init__(
+        self,
+        out_dir: str = PROFILE_DIR,
+        interval: float = PROFILE_SAMPLE_INTERVAL,
+        threads: Tuple[str, ...] = PROFILE_THREADS
+    ):
+        self.out_dir = out_dir
+        self.interval = interval
+        self.threads = threads
+        self.active = False
+        self._lock = threading.Lock()
+        self._cprof_lock = threading.Lock()
+        self._cprof: Optional[cProfile.Profile] = None
+        self._stacks: Counter = Counter()
+        self._samples = 0
+
+    # ---------------- Session ----------------
+
+    def start(self, duration: float = PROFILE_DURATION) -> bool:
+        """Startet eine Session; liefert False, wenn bereits eine läuft."""
+        with self._lock:
+            if self.active:
+                print("[PROFILE] Session läuft bereits – Anfrage ignoriert.")
+                return False
+            self._cprof = cProfile.Profile()
+            self._stacks = Counter()
+            self._samples = 0
+            self.active = True
+        print(f"[PROFILE] Session gestartet für {duration:.0f}s (Intervall {self.interval * 1000:.1f}ms)")
+        threading.Thread(
+            target=self._sample_loop, args=(time.monotonic() + duration,), name="profiler", daemon=True
+        ).start()
+        return True
+
+    def profile_call(self, fn: Callable, *args, **kwargs):
+        """
+        Führt fn unter cProfile aus. cProfile kann nur einen Aufruf gleichzeitig messen;
+        läuft bereits ein Aufruf in einem anderen Worker, wird fn ungemessen ausgeführt.
+        """
+        if not self.active or not self._cprof_lock.acquire(blocking=False):
+            return fn(*args, **kwargs)
+        try:
+            prof = self._cprof
+            if prof is None:
+                return fn(*args, **kwargs)
+            return prof.runcall(fn, *args, **kwargs)
+        finally:
+            self._cprof_lock.release()
+
+    def _wanted(self, name: str) -> bool:
+        return any(name == t or name.startswith(t) for t in self.threads)
+
+    def _sample_loop(self, deadline: float) -> None:
+        own = threading.get_ident()
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident)
+                if ident == own or name is None or not self._wanted(name):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack.append(name)
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+            time.sleep(self.interval)
+        self._finish()
+
+    def _finish(self) -> None:
+        with self._cprof_lock:
+            prof, self._cprof = self._cprof, None
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"profile-{datetime.now():%Y%m%d-%H%M%S}")
+        try:
+            with open(base + ".collapsed", "w", encoding="utf-8") as f:
+                for stack, count in self._stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            if prof is not None:
+                prof.dump_stats(base + ".prof")
+                buf = io.StringIO()
+                try:
+                    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+                except TypeError:
+                    buf.write("Keine on_new_candle-Aufrufe während der Session.\n")
+                with open(base + ".txt", "w", encoding="utf-8") as f:
+                    f.write(buf.getvalue())
+            print(f"[PROFILE] Session beendet: {self._samples} Samples → {base}.collapsed/.prof/.txt")
+        except OSError as e:
+            print(f"[ERROR] Profil konnte nicht geschrieben werden: {e}")
+        finally:
+            self.active = False
+
+    # ---------------- Auslöser ----------------
+
+    def install_signal(self, duration: float = PROFILE_DURATION) -> bool:
+        """SIGUSR1 startet eine Session (nicht auf Windows verfügbar)."""
+        sig = getattr(signal, "SIGUSR1", None)
+        if sig is None:
+            return False
+        signal.signal(sig, lambda signum, frame: self.start(duration))
+        return True
+
+    def watch_control_file(self, path: str = PROFILE_CONTROL_FILE, poll: float = 1.0) -> None:
+        """Startet einen Thread, der auf die Kontrolldatei wartet, sie löscht und eine Session startet."""
+        def loop():
+            while True:
+                time.sleep(poll)
+                if not os.path.exists(path):
+                    continue
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        content = f.read().strip()
+                    os.remove(path)
+                except OSError:
+                    continue
+                try:
+                    duration = float(content) if content else PROFILE_DURATION
+                except ValueError:
+                    duration = PROFILE_DURATION
+                self.start(duration)
+        threading.Thread(target=loop, name="profile-control", daemon=True).start()
+
+
+# Prozessweiter Profiler (Controller prüfen profiler.active)
+profiler = RuntimeProfiler()
@@ -1,9 +1,27 @@
 import MetaTrader5 as mt5
-import math
-from typing import List, Optional, Dict
+import threading
+from datetime import datetime
+from concurrent.futures import Future
+from typing import List, Optional, Dict, Tuple
 from core.types import Candle
-import time
-from core.phase_manager import PhaseState
+from core.stop_manager import StopManager
+from core.fx_rates import CurrencyConverter
+from core.spread import SpreadTracker
+from core.prices import to_points, to_price, floor_points, ceil_points, floor_price
+
+# Verzögerung für den einmaligen Trailing-Retry nach fehlgeschlagener Verifikation
+SL_RETRY_DELAY = 0.1
+
+
+class SLExpectation:
+    """Gesendeter SL, der noch gegen einen Positions-Snapshot geprüft werden muss."""
+    def __init__(self, symbol: str, ticket: int, sl: Optional[float], level: int, future: Future, retry=None):
+        self.symbol = symbol
+        self.ticket = ticket
+        self.sl = sl  # None = Retry unterwegs, noch nichts zu prüfen
+        self.level = level
+        self.future = future
+        self.retry = retry  # Callable für den einmaligen Retry, None = bereits Retry
 
 
 class RiskManager:
@@ -18,9 +36,19 @@ class RiskManager:
         self.account_balance = account_balance
         self.max_risk = max_risk_per_trade
         self.trailing_levels: Dict[int, int] = {}
+        self.stop_managers: Dict[int, StopManager] = {}
+        self.pending_sl: Dict[int, SLExpectation] = {}
+        # pending_sl wird vom Controller-Thread (try_trailing, verify_pending, drop_ticket) und
+        # vom Executor-Thread (sent-Callbacks) geändert. Futures werden erst nach dem Lock
+        # aufgelöst, ihre Callbacks nehmen den Controller-Lock.
+        self._pending_lock = threading.RLock()
+        # OrderExecutor und CurrencyConverter des DataHandlers (werden vom Controller gesetzt)
+        self.executor = None
+        self.fx: Optional[CurrencyConverter] = None
         # optionale Attribute für externe Daten
         self.symbol: Optional[str] = None
         self.spread: Optional[float] = None
+        self.spreads: Optional[SpreadTracker] = None  # laufende Spread-Statistik des Symbols
         self.tick_size: Optional[float] = None
         
 
@@ -67,42 +95,18 @@ class RiskManager:
         Universelle Positionsgrößenberechnung – riskiere exakt risk_amount der Kontowährung pro Trade,
         oder, wenn nicht gesetzt, (self.account_balance * self.max_risk).
         """
-        symbol_info = mt5.symbol_info(symbol)
-        if not symbol_info:
-            raise RuntimeError(f"Symbol {symbol} nicht gefunden")
-
-        min_lot = symbol_info.volume_min
-        max_lot = symbol_info.volume_max
-        lot_step = symbol_info.volume_step
-        digits = symbol_info.digits
-
-        pip_size = 0.01 if 'JPY' in symbol or digits == 3 else 0.0001
-        stop_loss_pips = abs(entry_price - stop_loss) / pip_size
-
-        tick_value = symbol_info.trade_tick_value
-        tick_size  = symbol_info.trade_tick_size
-
-        if not tick_value or not tick_size:
-            pip_value_per_lot = 10.0
-        else:
-            pip_value_per_lot = (tick_value / tick_size) * pip_size
-
-        acc_info = mt5.account_info()
-        account_currency = acc_info.currency if acc_info and hasattr(acc_info, "currency") else "USD"
-        base = symbol[:3]
-        quote = symbol[3:]
-        if quote == "JPY" and account_currency == "USD":
-            usd_jpy = None
-            try:
-                usd_jpy_info = mt5.symbol_info("USDJPY")
-                usd_jpy_tick = mt5.symbol_info_tick("USDJPY")
-                if usd_jpy_info and usd_jpy_tick:
-                    usd_jpy = usd_jpy_tick.bid
-            except Exception:
-                pass
-            if not usd_jpy:
-                usd_jpy = 150.0
-            pip_value_per_lot = 1000.0 / usd_jpy
+        if self.fx is None:
+            self.fx = CurrencyConverter(mt5)
+        spec = self.fx.spec(symbol)
+        min_lot = spec.volume_min
+        max_lot = spec.volume_max
+        lot_step = spec.volume_step
+
+        stop_loss_pips = abs(entry_price - stop_loss) / spec.pip_size
+        pip_value_per_lot = self.fx.pip_value(symbol)
+        if pip_value_per_lot is None:
+            print(f"[WARN] Kein Umrechnungskurs für {symbol} – verwende Mindestlot")
+            return float(min_lot)
 
         # ---- Korrektur: Dynamisches Risiko berechnen ----
         if risk_amount is None:
@@ -113,9 +117,7 @@ class RiskManager:
 
         lot = risk_amount / (stop_loss_pips * pip_value_per_lot)
         lot = max(min_lot, min(lot, max_lot))
-        lot = math.floor(lot / lot_step) * lot_step
-        lot = round(lot, 2)
-        return float(lot)
+        return floor_price(lot, lot_step)
 
 
 
@@ -135,322 +137,177 @@ class RiskManager:
         return candle.high >= entry_price and candle.close > entry_price
 
 
-    def calculate_breakeven_price_buy(
+    def get_stop_manager(
         self,
-        candles: List[Candle],
+        ticket: int,
+        side: str,
         entry_price: float,
+        initial_stop: float,
         spread: float,
-        entry_candle_timestamp: Optional[int] = None  # Timestamp aus FSM (last_confirmation_bullish["candle"].timestamp)
-    ) -> Optional[float]:
+        point: Optional[float] = None,
+        entry_ts: Optional[int] = None,
+        history: Optional[List[Candle]] = None
+    ) -> StopManager:
         """
-        Break-Even nach Buy-Stop-Entry mit klassischer Go-/Confirmation-Logik.
+        Liefert den StopManager für ein Ticket. Beim ersten Zugriff (z.B. nach Neustart)
+        werden die Kerzen seit Entry einmalig aus der Historie nachgeholt.
+        point: Punktgröße der Kerzen (Default: tick_size des Symbols), entry_ts in Epoch-Sekunden.
         """
-        if entry_candle_timestamp is None:
-            print("[WARN] calculate_breakeven_price_buy: Kein Entry-Timestamp übergeben!")
-            return None
-
-        # Suche Index der Entry-Kerze (= Go-Candle)
-        try:
-            entry_idx = next(i for i, c in enumerate(candles) if c.timestamp == entry_candle_timestamp)
-        except StopIteration:
-            print("[WARN] calculate_breakeven_price_buy: Entry-Candle nicht gefunden!")
-            return None
-
-        # Step 1: Suche Bestätigungskerze nach Go-Candle
-        confirmation_idx = None
-        for i in range(entry_idx + 1, len(candles)):
-            c = candles[i]
-            if c.close > candles[entry_idx].high and c.low > entry_price:
-                confirmation_idx = i
-                break
-            # Wenn der Kurs zwischendurch das Entry erneut verletzt, Reset!
-            if c.low <= entry_price:
-                return None
-
-        if confirmation_idx is None:
-            return None  # Noch keine Bestätigung gefunden
-
-        # Step 2: Break-Even erst nach Abschluss der nächsten Candle!
-        be_idx = confirmation_idx + 1
-        if be_idx >= len(candles):
-            return None  # Es gibt noch keine fertige Candle nach der Confirmation
-
-        # Die Candle nach Confirmation (BE setzen)
-        c = candles[be_idx]
-        # Optional: Invalidierung prüfen – wenn c.low <= entry_price, kein BE!
-        if c.low <= entry_price:
-            return None
-
-        candidate_sl = entry_price - spread
-
-        price_ref = mt5.symbol_info_tick(self.symbol).bid
-        min_dist = self._get_min_stop_distance(self.symbol, fallback_pips=0.5)
-        if candidate_sl >= price_ref - min_dist:
-            candidate_sl = price_ref - min_dist
-
-        tick = mt5.symbol_info(self.symbol).point
-        decimals = int(-math.log10(tick))
-        candidate_sl = math.floor(candidate_sl / tick) * tick
-        candidate_sl = round(candidate_sl, decimals)
-
-        return candidate_sl
-
-
-
-
-
-
-
-    def calculate_breakeven_price_sell(
-        self,
-        candles: List[Candle],
-        entry_price: float,
-        spread: float,
-        entry_candle_timestamp: Optional[int] = None  # Timestamp aus FSM (last_confirmation_bearish["candle"].timestamp)
-    ) -> Optional[float]:
+        stops = self.stop_managers.get(ticket)
+        if stops is None:
+            point = self.tick_size if point is None else point
+            stops = StopManager(ticket, side, entry_price, initial_stop, spread, point, entry_ts)
+            if history:
+                stops.seed(history)
+            self.stop_managers[ticket] = stops
+        return stops
+
+    def drop_ticket(self, ticket: int) -> None:
+        """Entfernt sämtlichen Stop-Zustand eines geschlossenen Tickets."""
+        self.trailing_levels.pop(ticket, None)
+        self.stop_managers.pop(ticket, None)
+        with self._pending_lock:
+            exp = self.pending_sl.pop(ticket, None)
+        if exp is not None and not exp.future.done():
+            exp.future.set_result(None)
+
+    def _point(self, symbol: str) -> float:
+        """Punktgröße des Symbols (tick_size vom Controller, sonst einmalig vom Broker)."""
+        if self.tick_size:
+            return self.tick_size
+        return mt5.symbol_info(symbol).point
+
+    def verify_pending(self, positions) -> None:
         """
-        Break-Even nach Sell-Stop-Entry mit klassischer Go-/Confirmation-Logik.
+        Prüft offene SL-Erwartungen gegen einen Positions-Snapshot (kein Sleep, kein
+        zusätzlicher Broker-Call). Verglichen wird auf ganze Punkte, der vom Broker
+        gemeldete SL darf also Float-Rauschen tragen. Abweichung → einmaliger asynchroner Retry.
         """
-        if entry_candle_timestamp is None:
-            print("[WARN] calculate_breakeven_price_sell: Kein Entry-Timestamp übergeben!")
-            return None
-
-        # Suche Index der Entry-Kerze (= Go-Candle)
-        try:
-            entry_idx = next(i for i, c in enumerate(candles) if c.timestamp == entry_candle_timestamp)
-        except StopIteration:
-            print("[WARN] calculate_breakeven_price_sell: Entry-Candle nicht gefunden!")
-            return None
-
-        # Step 1: Suche Bestätigungskerze nach Go-Candle (Confirmation)
-        confirmation_idx = None
-        for i in range(entry_idx + 1, len(candles)):
-            c = candles[i]
-            # Confirmation: close < go.low UND high < entry_price
-            if c.close < candles[entry_idx].low and c.high < entry_price:
-                confirmation_idx = i
-                break
-            # Invalidierung: Entry von oben verletzt
-            if c.high >= entry_price:
-                return None
-
-        if confirmation_idx is None:
-            return None  # Noch keine Confirmation gefunden
-
-        # Step 2: Break-Even erst nach Abschluss der nächsten Candle!
-        be_idx = confirmation_idx + 1
-        if be_idx >= len(candles):
-            return None  # Es gibt noch keine fertige Candle nach der Confirmation
-
-        # Die Candle nach Confirmation (BE setzen)
-        c = candles[be_idx]
-        # Optional: Invalidierung prüfen – wenn c.high >= entry_price, kein BE!
-        if c.high >= entry_price:
-            return None
-
-        candidate_sl = entry_price + spread
-
-        price_ref = mt5.symbol_info_tick(self.symbol).ask
-        min_dist = self._get_min_stop_distance(self.symbol, fallback_pips=0.5)
-        if candidate_sl <= price_ref + min_dist:
-            candidate_sl = price_ref + min_dist
-
-        tick = mt5.symbol_info(self.symbol).point
-        decimals = int(-math.log10(tick))
-        candidate_sl = math.ceil(candidate_sl / tick) * tick
-        candidate_sl = round(candidate_sl, decimals)
-
-        return candidate_sl
-
-
-
-
-
-
-
-    #Trailing ab 2RR schon auf 1RR - Test
-    def trailing_step_buy(self, candles, entry_price, rr, current_sl, last_level, fsm_context=None):
-        """
-        Trailing für Buy: Ab bestätigtem Entry aus fsm_context (PhaseState). Nutzt Property-Access.
-        """
-        if fsm_context is not None and hasattr(fsm_context, "last_confirmation_bullish"):
-            entry_conf = getattr(fsm_context, "last_confirmation_bullish", None)
-            if not entry_conf or not entry_conf.valid:
-                return None, last_level
-            entry_candle = entry_conf.candle
-            try:
-                entry_idx = next(i for i, c in enumerate(candles) if c.timestamp == entry_candle.timestamp)
-                candles = candles[entry_idx:]  # Nur ab Entry!
-            except StopIteration:
-                return None, last_level
-        # --- Standard-Trailing-Logik ---
-        max_high = max((c.high for c in candles), default=entry_price)
-        level = int((max_high - entry_price) / rr)
-        if level >= 2 and level > last_level:   # ab 2RR trailed man
-            candidate = entry_price + (level - 1) * rr
-            if candidate > current_sl:
-                return candidate, level
-        return None, last_level
-
-
-
-    def trailing_step_sell(
-        self,
-        candles,
-        entry_price,
-        rr,
-        current_sl,
-        last_level,
-        fsm_context  # -> PhaseState
-    ):
-        # Hole bestätigte Entry-Candle aus FSM (muss Property sein)
-        entry_conf = getattr(fsm_context, "last_confirmation_bearish", None)
-        if not entry_conf or not entry_conf.valid:
-            return None, last_level
-
-        entry_candle = entry_conf.candle
-
-
-        try:
-            entry_idx = next(i for i, c in enumerate(candles) if c.timestamp == entry_candle.timestamp)
-        except StopIteration:
-            return None, last_level
-
-        # Alle Candles ab Entry (inklusive) für Trailing analysieren
-        min_low = min((c.low for c in candles[entry_idx:]), default=entry_price)
-        level = int((entry_price - min_low) / rr)
-        if level >= 2 and level > last_level:
-            candidate = entry_price - (level - 1) * rr
-            if candidate < current_sl:
-                return candidate, level
-        return None, last_level
-
-
-
-    def try_break_even(
-        self,
-        symbol: str,
-        candles: List[Candle],
-        side: str,
-        entry_price: float,
-        spread: float,
-        current_sl: float,
-        ticket: int,
-        fsm_context: PhaseState
-    ) -> Optional[float]:
-        # 1) Context prüfen
-        entry_conf = (
-            getattr(fsm_context, "last_confirmation_bullish", None)
-            if side == "buy"
-            else getattr(fsm_context, "last_confirmation_bearish", None)
-        )
-        if not entry_conf or not entry_conf.valid:
-            print("[DEBUG] Keine bestätigte Entry-Candle im Kontext. BE übersprungen.")
-            return None
-        entry_candle = entry_conf.candle
+        if not self.pending_sl:
+            return
+        by_ticket = {p.ticket: p for p in positions}
+        resolved: List[Tuple[Future, Optional[float]]] = []
+        retries = []
+        with self._pending_lock:
+            for ticket, exp in list(self.pending_sl.items()):
+                if exp.sl is None:
+                    continue  # Retry noch beim Executor
+                pos = by_ticket.get(ticket)
+                self.pending_sl.pop(ticket, None)
+                if pos is None:
+                    print("[WARN] Position nicht mehr vorhanden – kein Trailing möglich.")
+                    resolved.append((exp.future, None))
+                    continue
+                point = self._point(exp.symbol)
+                if to_points(pos.sl, point) == to_points(exp.sl, point):
+                    print(f"[INFO] Trailing erfolgreich in MT5: neuer SL={pos.sl}")
+                    self.trailing_levels[ticket] = exp.level
+                    resolved.append((exp.future, exp.sl))
+                elif exp.retry is not None:
+                    print(f"[WARN] Trailing-Update in MT5 nicht umgesetzt (SL bleibt {pos.sl})")
+                    exp.sl = None
+                    self.pending_sl[ticket] = exp
+                    retries.append(exp.retry)
+                else:
+                    print(f"[ERROR] Auch Retry hat in MT5 versagt – SL bleibt {pos.sl}")
+                    resolved.append((exp.future, None))
+        for retry in retries:
+            retry()
+        for fut, sl in resolved:
+            fut.set_result(sl)
 
-        try:
-            entry_idx = next(i for i, c in enumerate(candles) if c.timestamp == entry_candle.timestamp)
-        except StopIteration:
-            print("[DEBUG] Entry-Candle nicht im aktuellen Buffer.")
-            return None
-        relevant_candles = candles[entry_idx:]
 
-        # 2) Break-Even-Level bestimmen (angepasste Methoden ohne fsm_context)
-        if side == 'buy':
-            new_sl = self.calculate_breakeven_price_buy(relevant_candles, entry_price, spread)
-        else:
-            new_sl = self.calculate_breakeven_price_sell(relevant_candles, entry_price, spread)
-        if new_sl is None or new_sl == current_sl:
-            print(f"[DEBUG] Kein neues SL-Level berechnet oder unverändert: new_sl={new_sl}")
-            return None
 
-        # 3) Fallback auf Mindestabstand prüfen und runden (wie bisher)
-        tick = mt5.symbol_info(symbol).point
-        tick_data = mt5.symbol_info_tick(symbol)
-        price_ref = tick_data.bid if side == 'buy' else tick_data.ask
-        min_dist = self._get_min_stop_distance(symbol, fallback_pips=0.5)
-        if abs(new_sl - price_ref) < min_dist:
-            print(f"[WARN] SL {new_sl} zu nah am Markt! Fallback-Abstand {min_dist} verwenden.")
-            new_sl = (price_ref - min_dist) if side == 'buy' else (price_ref + min_dist)
-        decimals = int(-math.log10(tick))
-        if side == 'buy':
-            new_sl = math.ceil(new_sl / tick) * tick
-        else:
-            new_sl = math.floor(new_sl / tick) * tick
-        new_sl = round(new_sl, decimals)
-    
-        # 4) Modify-Request bauen
-        req: Dict = {
+    def _build_sltp_request(self, symbol: str, ticket: int, sl: float) -> Dict:
+        return {
             "action":       mt5.TRADE_ACTION_SLTP,
             "symbol":       symbol,
             "position":     ticket,
-            "sl":           new_sl,
+            "sl":           sl,
             "tp":           0.0,
             "deviation":    20,
             "type_time":    mt5.ORDER_TIME_GTC,
             "type_filling": mt5.ORDER_FILLING_IOC,
         }
-        print(f"[DEBUG] BE-Modify-Request: {req}")
-    
-        positions = mt5.positions_get()
-        print(f"[DEBUG] Aktuelle offene Positionen: {[ (p.ticket, p.symbol, p.sl, p.type) for p in positions ]}")
-        print(f"[DEBUG] Versuche SL zu ändern für Ticket={ticket} (sollte Position-Ticket sein!)")
-
-        # 5) order_check
-        print(f"[INFO] BE→order_check: ticket={ticket}, candidate_sl={new_sl}")
-        chk = mt5.order_check(req)
-        print(f"[DEBUG] order_check Objekt: {chk}")
-        try:
-            print(f"[DEBUG] order_check Felder: {vars(chk)}")
-        except Exception:
-            try:
-                print(f"[DEBUG] order_check Felder: {chk.__dict__}")
-            except Exception:
-                print(f"[DEBUG] order_check Felder: nicht verfügbar")
-
-        if not chk or chk.retcode not in (0, mt5.TRADE_RETCODE_DONE):
-            print(
-                f"[ERROR] BE order_check failed: retcode={getattr(chk,'retcode',None)}, "
-                f"comment={getattr(chk,'comment',None)}"
-            )
-            return None
 
-        # 6) order_send
-        res = mt5.order_send(req)
-        print(f"[INFO] BE→order_send retcode={getattr(res,'retcode',None)}, "
-            f"order_ticket={getattr(res,'order',None)}, new_sl={new_sl}")
-        if not (res and res.retcode in (0, mt5.TRADE_RETCODE_DONE)):
-            print(f"[ERROR] BE order_send failed: retcode={getattr(res,'retcode',None)}, "
-                f"comment={getattr(res,'comment',None)}")
+    def try_break_even(
+        self,
+        symbol: str,
+        side: str,
+        current_sl: float,
+        ticket: int,
+        stops: StopManager
+    ) -> Optional[Future]:
+        """
+        Reicht das Break-Even-Update beim Order-Executor ein.
+        Liefert ein Future mit dem gesetzten SL (oder None) bzw. None, wenn nichts zu tun ist.
+        """
+        # 1) Break-Even-Level aus dem inkrementellen Zustand
+        new_sl = stops.break_even_price(self.spreads.typical() if self.spreads else None)
+        if new_sl is None:
+            print(f"[DEBUG] BE nicht fällig (state={stops.be_state.name}) für Ticket={ticket}")
+            return None
+        if current_sl is not None and (
+            (side == 'buy' and new_sl <= current_sl) or (side == 'sell' and new_sl >= current_sl)
+        ):
+            # SL liegt bereits auf/über BE (z.B. durch Trailing) – nichts mehr zu tun
+            stops.mark_break_even_applied()
             return None
 
-        print(f"[INFO] Break-Even applied successfully, new_sl={new_sl}")
-        return new_sl
+        applied: Dict[str, float] = {}
+
+        def build() -> Optional[Dict]:
+            # 2) Runden und Mindestabstand zum Markt (im Executor-Thread, frische Preise).
+            # Das BE-Ziel wird zum Entry hin gerundet (Buy: ceil, Sell: floor), damit nie mehr
+            # als der Spread unter/über Entry abgesichert wird; erst der Mindestabstand darf
+            # den SL (auf ganze Punkte) weiter vom Markt weg schieben.
+            info = mt5.symbol_info(symbol)
+            tick = info.point
+            tick_data = mt5.symbol_info_tick(symbol)
+            if self.spreads is not None:
+                self.spreads.on_tick(tick_data.bid, tick_data.ask)
+            dist = self._min_stop_points(symbol, info, fallback_pips=0.5)
+            if side == 'buy':
+                cand, limit = ceil_points(new_sl, tick), to_points(tick_data.bid, tick) - dist
+                if cand > limit:
+                    print(f"[WARN] SL {new_sl} zu nah am Markt! Mindestabstand {dist} Punkte verwenden.")
+                    cand = limit
+            else:
+                cand, limit = floor_points(new_sl, tick), to_points(tick_data.ask, tick) + dist
+                if cand < limit:
+                    print(f"[WARN] SL {new_sl} zu nah am Markt! Mindestabstand {dist} Punkte verwenden.")
+                    cand = limit
+            sl = to_price(cand, tick)
+            if current_sl is not None and to_points(sl, tick) == to_points(current_sl, tick):
+                print(f"[DEBUG] BE-SL unverändert: new_sl={sl}")
+                return None
 
+            # 3) Modify-Request bauen
+            applied['sl'] = sl
+            req = self._build_sltp_request(symbol, ticket, sl)
+            print(f"[DEBUG] BE-Modify-Request: {req}")
+            return req
 
+        out: Future = Future()
 
+        def done(res) -> None:
+            if not self.executor.is_ok(res) or 'sl' not in applied:
+                print(f"[ERROR] BE fehlgeschlagen: retcode={getattr(res,'retcode',None)}, "
+                    f"comment={getattr(res,'comment',None)}")
+                out.set_result(None)
+                return
+            stops.mark_break_even_applied()
+            print(f"[INFO] Break-Even applied successfully, new_sl={applied['sl']}")
+            out.set_result(applied['sl'])
+
+        print(f"[INFO] BE→Executor: ticket={ticket}, candidate_sl={new_sl}")
+        self.executor.submit((symbol, 'be', ticket), build, check=True, on_done=done)
+        return out
 
-    
-    def try_trailing(
-        self,
-        symbol: str,
-        candles: List[Candle],
-        side: str,
-        entry_price: float,
-        initial_stop: float,
-        current_sl: float,
-        ticket: int
-    ) -> Optional[float]:
-        import math, time
-        from datetime import datetime
-        import MetaTrader5 as mt5
 
-        print(f"[{datetime.now()}][DEBUG] try_trailing called for "
-            f"symbol={symbol}, ticket={ticket}, side={side}, "
-            f"entry={entry_price}, current_sl={current_sl}")
 
-        # Symbol- und Info-Objekt prüfen
+    def _clamp_trailing_sl(self, symbol: str, side: str, candidate: float, current_sl: Optional[float]) -> Optional[float]:
+        """Mindestabstand zum Markt einhalten und auf Tick runden. None = kein Fortschritt."""
         if not mt5.symbol_select(symbol, True):
             print(f"[ERROR] Symbol {symbol} konnte nicht selektiert werden!")
             return None
@@ -459,133 +316,144 @@ class RiskManager:
             print(f"[ERROR] Kann symbol_info für {symbol} nicht lesen.")
             return None
 
-        tick_size = info.point
-        level = getattr(info, "trade_stops_level", 0)
-        min_dist = level * tick_size if level and level > 0 else self._get_min_stop_distance(symbol, fallback_pips=0.5)
-        print(f"[DEBUG] min_dist für {symbol} = {min_dist}")
-
-        rr = abs(entry_price - initial_stop)
-        last_level = self.trailing_levels.get(ticket, 0)
-        if side == 'buy':
-            candidate, new_level = self.trailing_step_buy(candles, entry_price, rr, current_sl, last_level)
-        else:
-            candidate, new_level = self.trailing_step_sell(candles, entry_price, rr, current_sl, last_level)
-
-        if candidate is None or candidate == current_sl:
-            print(f"[DEBUG] Kein neues Trailing-SL berechnet (unchanged: {candidate})")
-            return None
+        # Gerechnet und verglichen wird in Punkten; nach dem Klemmen auf den Mindestabstand
+        # kann der Kandidat nicht mehr zu nah am Markt liegen
+        point = info.point
+        dist = self._min_stop_points(symbol, info, fallback_pips=0.5)
+        print(f"[DEBUG] min_dist für {symbol} = {dist} Punkte")
 
         tick_data = mt5.symbol_info_tick(symbol)
-        price_ref = tick_data.bid if side == 'buy' else tick_data.ask
+        ref = to_points(tick_data.bid if side == 'buy' else tick_data.ask, point)
+        current = to_points(current_sl, point) if current_sl is not None else None
 
+        # Ohne bisherigen SL ist jeder Kandidat ein Fortschritt
         if side == 'buy':
-            candidate = min(candidate, price_ref - min_dist)
-            if candidate <= current_sl:
-                print(f"[WARN] Neuer SL ({candidate}) <= alter SL ({current_sl}) – kein Fortschritt! (buy)")
+            cand = min(ceil_points(candidate, point), ref - dist)
+            if current is not None and cand <= current:
+                print(f"[WARN] Neuer SL ({to_price(cand, point)}) <= alter SL ({current_sl}) – kein Fortschritt! (buy)")
                 return None
         else:
-            candidate = max(candidate, price_ref + min_dist)
-            if candidate >= current_sl:
-                print(f"[WARN] Neuer SL ({candidate}) >= alter SL ({current_sl}) – kein Fortschritt! (sell)")
+            cand = max(floor_points(candidate, point), ref + dist)
+            if current is not None and cand >= current:
+                print(f"[WARN] Neuer SL ({to_price(cand, point)}) >= alter SL ({current_sl}) – kein Fortschritt! (sell)")
                 return None
+        return to_price(cand, point)
 
-        if abs(candidate - price_ref) < min_dist:
-            print(f"[WARN] Trailing-SL {candidate} zu nah am Markt! Setze hart auf price_ref ± min_dist.")
-            candidate = (price_ref - min_dist) if side == 'buy' else (price_ref + min_dist)
+    def _min_stop_points(self, symbol: str, info, fallback_pips: float) -> int:
+        """Mindestabstand zum Markt in Punkten (trade_stops_level, sonst Pip-Fallback aufgerundet)."""
+        level = getattr(info, "trade_stops_level", 0)
+        if level and level > 0:
+            return int(level)
+        return ceil_points(self._get_min_stop_distance(symbol, fallback_pips=fallback_pips), info.point)
 
-        decimals = int(-math.log10(tick_size))
+    def _retry_trailing_sl(self, symbol: str, side: str) -> float:
+        """SL für den einmaligen Retry: doppelter Fallback-Abstand zum aktuellen Preis."""
+        info = mt5.symbol_info(symbol)
+        point = info.point
+        # Ohne stops_level doppelter Fallback-Abstand
+        dist = self._min_stop_points(symbol, info, fallback_pips=1.0)
+        tick_data = mt5.symbol_info_tick(symbol)
         if side == 'buy':
-            candidate = math.ceil(candidate / tick_size) * tick_size
-        else:
-            candidate = math.floor(candidate / tick_size) * tick_size
-        candidate = round(candidate, decimals)
+            return to_price(to_points(tick_data.bid, point) - dist, point)
+        return to_price(to_points(tick_data.ask, point) + dist, point)
 
-        # Existiert die Position noch?
-        positions = mt5.positions_get(symbol=symbol) or []
-        if not any(p.ticket == ticket for p in positions):
-            print("[WARN] Keine Position mit Ticket gefunden!")
-            return None
+    def on_intrabar(self, symbol: str, current_sl: Optional[float], bar: Candle) -> List[Tuple[int, Future]]:
+        """
+        Intra-Bar-Hook (Tick-Modus): High/Low der laufenden Kerze (Punkte) in die StopManager
+        übernehmen und Trailing sofort einreichen, wenn ein neues RR-Level erreicht ist.
+        Liefert (Ticket, Future) der eingereichten Updates.
+        """
+        out: List[Tuple[int, Future]] = []
+        for ticket, stops in list(self.stop_managers.items()):
+            price = bar.high if stops.side == 'buy' else bar.low
+            if not stops.on_price(price):
+                continue
+            fut = self.try_trailing(symbol, stops.side, current_sl, ticket, stops)
+            if fut is not None:
+                out.append((ticket, fut))
+        return out
 
-        # --- MODIFY-REQUEST ---
-        req = {
-            "action":       mt5.TRADE_ACTION_SLTP,
-            "symbol":       symbol,
-            "position":     ticket,
-            "sl":           candidate,
-            "tp":           0.0,
-            "deviation":    20,
-            "type_time":    mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
-        }
-        print(f"[DEBUG] TR-Modify-Request: {req}")
+    def try_trailing(
+        self,
+        symbol: str,
+        side: str,
+        current_sl: float,
+        ticket: int,
+        stops: StopManager
+    ) -> Optional[Future]:
+        """
+        Reicht das Trailing-Update beim Order-Executor ein.
+        Liefert ein Future mit dem verifizierten SL (oder None) bzw. None, wenn nichts zu tun ist.
+        Die Verifikation erfolgt über verify_pending() beim nächsten Positions-Snapshot.
+        """
+        print(f"[{datetime.now()}][DEBUG] try_trailing called for "
+            f"symbol={symbol}, ticket={ticket}, side={side}, "
+            f"entry={stops.entry_price}, current_sl={current_sl}, level={stops.level}")
 
-        chk = mt5.order_check(req)
-        print(f"[DEBUG] order_check retcode={getattr(chk, 'retcode', None)}, comment={getattr(chk, 'comment', None)}")
-        if not chk or chk.retcode not in (0, mt5.TRADE_RETCODE_DONE):
-            print(f"[ERROR] Trailing order_check failed: retcode={getattr(chk, 'retcode', None)}, comment={getattr(chk, 'comment', None)}")
+        # Vorheriges Update noch unbestätigt → erst Verifikation abwarten
+        with self._pending_lock:
+            waiting = ticket in self.pending_sl
+        if waiting:
+            print(f"[DEBUG] Trailing für Ticket {ticket} wartet noch auf Verifikation")
             return None
 
-        res = mt5.order_send(req)
-        print(f"[DEBUG] order_send retcode={getattr(res, 'retcode', None)}, comment={getattr(res, 'comment', None)}")
-        if not res or res.retcode not in (0, mt5.TRADE_RETCODE_DONE):
-            print(f"[ERROR] Trailing order_send failed: retcode={getattr(res, 'retcode', None)}, comment={getattr(res, 'comment', None)}")
+        # Ohne neues RR-Level gibt es nichts zu tun – keine Broker-Abfragen
+        last_level = self.trailing_levels.get(ticket, 0)
+        candidate, new_level = stops.trailing_candidate(current_sl, last_level)
+        if candidate is None or candidate == current_sl:
+            print(f"[DEBUG] Kein neues Trailing-SL berechnet (unchanged: {candidate})")
             return None
 
+        applied: Dict[str, float] = {}
 
-        # Nach Modify: Verifizieren, ob MT5 den SL angepasst hat
-        time.sleep(0.1)
-        positions_after = mt5.positions_get(symbol=symbol) or []
-        for p2 in positions_after:
-            if p2.ticket == ticket:
-                if abs(p2.sl - candidate) < 1e-9:
-                    print(f"[INFO] Trailing erfolgreich in MT5: neuer SL={p2.sl}")
-                    self.trailing_levels[ticket] = new_level
-                    return candidate
-                else:
-                    print(f"[WARN] Trailing-Update in MT5 nicht umgesetzt (SL bleibt {p2.sl})")
-                    # Retry genau einmal, kein Endlos-Loop
-                    # --- Retry-Logik wie gehabt, aber maximal 1 Versuch ---
-                    level2 = getattr(info, "trade_stops_level", 0)
-                    if level2 and level2 > 0:
-                        min_dist = level2 * info.point
-                    else:
-                        min_dist *= 2
-                    price_ref = mt5.symbol_info_tick(symbol).bid if side == 'buy' else mt5.symbol_info_tick(symbol).ask
-
-                    if side == 'buy':
-                        candidate_retry = price_ref - min_dist
-                        candidate_retry = math.ceil(candidate_retry / tick_size) * tick_size
-                    else:
-                        candidate_retry = price_ref + min_dist
-                        candidate_retry = math.floor(candidate_retry / tick_size) * tick_size
-                    candidate_retry = round(candidate_retry, decimals)
-
-                    req_retry = {
-                        "action":       mt5.TRADE_ACTION_SLTP,
-                        "symbol":       symbol,
-                        "position":     ticket,
-                        "sl":           candidate_retry,
-                        "tp":           0.0,
-                        "deviation":    20,
-                        "type_time":    mt5.ORDER_TIME_GTC,
-                        "type_filling": mt5.ORDER_FILLING_IOC,
-                    }
-                    print(f"[DEBUG] RETRY-Modify-Request: {req_retry}")
-                    chk2 = mt5.order_check(req_retry)
-                    if chk2 and chk2.retcode == mt5.TRADE_RETCODE_DONE:
-                        res2 = mt5.order_send(req_retry)
-                        time.sleep(0.1)
-                        positions2 = mt5.positions_get(symbol=symbol) or []
-                        for p3 in positions2:
-                            if p3.ticket == ticket and abs(p3.sl - candidate_retry) < 1e-9:
-                                print(f"[INFO] Trailing-Retry erfolgreich: neuer SL={p3.sl}")
-                                self.trailing_levels[ticket] = new_level
-                                return candidate_retry
-                    print(f"[ERROR] Auch Retry hat in MT5 versagt – SL bleibt {p2.sl}")
-                    return None
-
-        print("[WARN] Position nicht mehr vorhanden – kein Trailing möglich.")
-        return None
+        def build() -> Optional[Dict]:
+            sl = self._clamp_trailing_sl(symbol, side, candidate, current_sl)
+            if sl is None:
+                return None
+            # Existiert die Position noch?
+            positions = mt5.positions_get(symbol=symbol) or []
+            if not any(p.ticket == ticket for p in positions):
+                print("[WARN] Keine Position mit Ticket gefunden!")
+                return None
+            applied['sl'] = sl
+            req = self._build_sltp_request(symbol, ticket, sl)
+            print(f"[DEBUG] TR-Modify-Request: {req}")
+            return req
+
+        def build_retry() -> Optional[Dict]:
+            sl = self._retry_trailing_sl(symbol, side)
+            applied['sl'] = sl
+            req = self._build_sltp_request(symbol, ticket, sl)
+            print(f"[DEBUG] RETRY-Modify-Request: {req}")
+            return req
+
+        out: Future = Future()
+
+        def sent(res, is_retry: bool) -> None:
+            # Läuft im Executor-Thread: nur Erwartung notieren, geprüft wird beim nächsten Snapshot
+            if not self.executor.is_ok(res) or 'sl' not in applied:
+                print(f"[ERROR] Trailing order_send failed: retcode={getattr(res, 'retcode', None)}, comment={getattr(res, 'comment', None)}")
+                with self._pending_lock:
+                    self.pending_sl.pop(ticket, None)
+                out.set_result(None)
+                return
+            with self._pending_lock:
+                self.pending_sl[ticket] = SLExpectation(
+                    symbol, ticket, applied['sl'], new_level, out, retry=None if is_retry else retry
+                )
+
+        def retry() -> None:
+            # Retry genau einmal, kein Endlos-Loop
+            self.executor.submit(
+                (symbol, 'trail_retry', ticket, new_level), build_retry, check=True,
+                on_done=lambda r: sent(r, True), delay=SL_RETRY_DELAY
+            )
+
+        self.executor.submit(
+            (symbol, 'trail', ticket, new_level), build, check=True,
+            on_done=lambda r: sent(r, False)
+        )
+        return out
 
 
 
@@ -601,5 +469,5 @@ class RiskManager:
         max_vol = info.volume_max
         step_vol = info.volume_step
         # Clamp auf min/max und immer ABrunden
-        lots = max(min_vol, math.floor(desired_lots / step_vol) * step_vol)
+        lots = max(min_vol, floor_price(desired_lots, step_vol))
         return min(lots, max_vol)
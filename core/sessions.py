@@ -0,0 +1,159 @@
+# core/sessions.py
+"""
+Session-Kalender: Entry-Fenster, Marktzeiten des Brokers, Wochenenden und Feiertage,
+vorberechnet als Minuten-Bitmaps über SESSION_HORIZON_DAYS ab dem Vortag.
+is_open()/is_trading() sind ein Array-Zugriff auf (epoch - base) // 60, seconds_to_open()
+liest den vorberechneten Index der nächsten offenen Minute. Verlässt die abgefragte
+Zeit den Horizont, wird der Kalender einmal neu aufgebaut (Sommerzeit-Wechsel sind
+über die Zeitzonen beim Aufbau berücksichtigt).
+Alle Zeiten als Epoch-Sekunden (UTC); ohne Angabe gilt die Uhr des Kalenders (clock).
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Optional, Tuple
+import numpy as np
+import pytz
+from config.runtime import (
+    SESSION_TIMEZONE,
+    SESSION_WINDOWS,
+    SESSION_DAYS,
+    MARKET_TIMEZONE,
+    MARKET_WEEK_OPEN,
+    MARKET_WEEK_CLOSE,
+    SESSION_HOLIDAYS,
+    SESSION_HORIZON_DAYS,
+)
+
+_NEVER = np.iinfo(np.int32).max
+
+
+def _parse_window(spec: str) -> Tuple[int, int]:
+    """'08:00-12:00' → (480, 720) Minuten ab Mitternacht."""
+    start, end = spec.split("-")
+    h0, m0 = map(int, start.split(":"))
+    h1, m1 = map(int, end.split(":"))
+    return h0 * 60 + m0, h1 * 60 + m1
+
+
+class SessionCalendar:
+    def __init__(
+        self,
+        windows: Iterable[str] = SESSION_WINDOWS,
+        tz: str = SESSION_TIMEZONE,
+        days: Iterable[int] = SESSION_DAYS,
+        market_tz: str = MARKET_TIMEZONE,
+        week_open: Tuple[int, int, int] = MARKET_WEEK_OPEN,
+        week_close: Tuple[int, int, int] = MARKET_WEEK_CLOSE,
+        holidays: Iterable[str] = SESSION_HOLIDAYS,
+        horizon_days: int = SESSION_HORIZON_DAYS,
+        clock: Callable[[], float] = time.time
+    ):
+        self.windows = [_parse_window(w) for w in windows]
+        self.tz = pytz.timezone(tz)
+        self.days = set(days)
+        self.market_tz = pytz.timezone(market_tz)
+        self.week_open = week_open
+        self.week_close = week_close
+        self.holidays = set(holidays)
+        self.horizon_days = horizon_days
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (base_epoch, market, trading, next_trading) – wird als Ganzes ersetzt
+        self._maps = None
+
+    # ---------------- Abfragen (O(1)) ----------------
+
+    def is_open(self, epoch: Optional[float] = None) -> bool:
+        """Markt beim Broker geöffnet (Wochenöffnung, kein Feiertag)."""
+        maps, i = self._slot(epoch)
+        return bool(maps[1][i])
+
+    def is_trading(self, epoch: Optional[float] = None) -> bool:
+        """Markt offen und innerhalb eines Entry-Fensters."""
+        maps, i = self._slot(epoch)
+        return bool(maps[2][i])
+
+    def seconds_to_open(self, epoch: Optional[float] = None) -> Optional[float]:
+        """Sekunden bis zum Beginn des nächsten Entry-Fensters (0 = offen, None = nicht im Horizont)."""
+        epoch = self.clock() if epoch is None else epoch
+        maps, i = self._slot(epoch)
+        nxt = int(maps[3][i])
+        if nxt == _NEVER:
+            return None
+        if nxt == i:
+            return 0.0
+        return max(0.0, maps[0] + nxt * 60 - epoch)
+
+    def _slot(self, epoch: Optional[float]):
+        epoch = self.clock() if epoch is None else epoch
+        maps = self._maps
+        if maps is None or not 0 <= epoch - maps[0] < len(maps[1]) * 60:
+            maps = self._rebuild(epoch)
+        return maps, int(epoch - maps[0]) // 60
+
+    # ---------------- Aufbau ----------------
+
+    def _rebuild(self, epoch: float):
+        with self._lock:
+            maps = self._maps
+            if maps is not None and 0 <= epoch - maps[0] < len(maps[1]) * 60:
+                return maps
+            day = datetime.fromtimestamp(epoch, tz=pytz.UTC).date() - timedelta(days=1)
+            base = int(datetime(day.year, day.month, day.day, tzinfo=pytz.UTC).timestamp())
+            n = self.horizon_days * 1440
+            market = self._market_map(base, day, n)
+            trading = self._window_map(base, day, n) & market
+            # Index der nächsten offenen Minute (rückwärts laufendes Minimum)
+            idx = np.where(trading, np.arange(n, dtype=np.int32), np.int32(_NEVER))
+            next_trading = np.minimum.accumulate(idx[::-1])[::-1]
+            self._maps = maps = (base, market, trading, next_trading)
+            return maps
+
+    def _local_slice(self, tz, d: date, start_min: int, end_min: int, base: int, n: int) -> slice:
+        """Minuten-Slice [start, end) eines lokalen Tages (Minuten ab Mitternacht) im Bitmap."""
+        midnight = datetime(d.year, d.month, d.day)
+        t0 = int(tz.localize(midnight + timedelta(minutes=start_min)).timestamp())
+        t1 = int(tz.localize(midnight + timedelta(minutes=end_min)).timestamp())
+        return slice(max(0, (t0 - base) // 60), max(0, min(n, (t1 - base) // 60)))
+
+    def _is_holiday(self, d: date) -> bool:
+        return d.strftime("%m-%d") in self.holidays or d.isoformat() in self.holidays
+
+    def _days(self, first: date):
+        # Einen Tag Rand auf beiden Seiten, damit lokale Zeitzonen den Horizont voll abdecken
+        for k in range(-1, self.horizon_days + 1):
+            yield first + timedelta(days=k)
+
+    def _window_map(self, base: int, first: date, n: int) -> np.ndarray:
+        bits = np.zeros(n, dtype=bool)
+        for d in self._days(first):
+            if d.weekday() not in self.days or self._is_holiday(d):
+                continue
+            for start, end in self.windows:
+                bits[self._local_slice(self.tz, d, start, end, base, n)] = True
+        return bits
+
+    def _market_map(self, base: int, first: date, n: int) -> np.ndarray:
+        bits = np.zeros(n, dtype=bool)
+        o_day, o_h, o_m = self.week_open
+        c_day, c_h, c_m = self.week_close
+        open_min, close_min = o_h * 60 + o_m, c_h * 60 + c_m
+        for d in self._days(first):
+            wd = d.weekday()
+            # Tagesweise: Öffnungstag ab open_min, Schlusstag bis close_min, dazwischen ganztägig
+            offset = (wd - o_day) % 7
+            span = (c_day - o_day) % 7
+            if offset > span:
+                continue
+            start = open_min if offset == 0 else 0
+            end = close_min if offset == span else 1440
+            bits[self._local_slice(self.market_tz, d, start, end, base, n)] = True
+        for d in self._days(first):
+            if self._is_holiday(d):
+                bits[self._local_slice(self.market_tz, d, 0, 1440, base, n)] = False
+        return bits
+
+
+# Prozessweiter Kalender (Entry-Logik, Run-Loop)
+calendar = SessionCalendar()
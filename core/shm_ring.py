@@ -0,0 +1,103 @@
+# core/shm_ring.py
+"""
+Ring-Puffer für abgeschlossene Kerzen in Shared Memory.
+Genau ein Schreiber (Broker-I/O-Prozess), beliebig viele Leser (Worker-Prozesse).
+Layout: [int64 seq][capacity × BAR_DTYPE]. seq zählt alle je geschriebenen Kerzen;
+Slot = seq % capacity. Der Schreiber erhöht seq erst, nachdem der Slot vollständig
+geschrieben ist, Leser merken sich ihr letztes gelesenes seq.
+"""
+import re
+from multiprocessing import shared_memory
+from typing import List, Tuple
+import numpy as np
+from core.types import Candle
+
+BAR_DTYPE = np.dtype([
+    ('time',   '<i8'),   # Epoch-Sekunden (UTC), Öffnungszeit der Kerze
+    ('open',   '<i8'),   # OHLC in Punkten wie core/types.Candle
+    ('high',   '<i8'),
+    ('low',    '<i8'),
+    ('close',  '<i8'),
+    ('volume', '<f8'),
+])
+_HEADER_BYTES = 8
+DEFAULT_CAPACITY = 256
+
+
+def ring_name(prefix: str, symbol: str, timeframe: int) -> str:
+    """Shared-Memory-Name pro Serie (nur [A-Za-z0-9_], da Broker-Symbole Punkte enthalten)."""
+    return re.sub(r'[^A-Za-z0-9_]', '_', f"{prefix}_{symbol}_{timeframe}")
+
+
+class BarRing:
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool):
+        self.shm = shm
+        self.capacity = capacity
+        self.owner = owner
+        self._seq = np.ndarray((1,), dtype=np.int64, buffer=shm.buf, offset=0)
+        self._bars = np.ndarray((capacity,), dtype=BAR_DTYPE, buffer=shm.buf, offset=_HEADER_BYTES)
+
+    @classmethod
+    def create(cls, name: str, capacity: int = DEFAULT_CAPACITY) -> "BarRing":
+        size = _HEADER_BYTES + capacity * BAR_DTYPE.itemsize
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(shm, capacity, owner=True)
+        ring._seq[0] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, capacity: int = DEFAULT_CAPACITY) -> "BarRing":
+        # capacity explizit übergeben: shm.size kann auf Seitengröße aufgerundet sein
+        shm = shared_memory.SharedMemory(name=name, create=False)
+        return cls(shm, capacity, owner=False)
+
+    @property
+    def seq(self) -> int:
+        return int(self._seq[0])
+
+    def publish(self, candle: Candle) -> int:
+        """Schreibt eine Kerze in den nächsten Slot und gibt die neue Sequenznummer zurück."""
+        seq = int(self._seq[0])
+        slot = self._bars[seq % self.capacity]
+        slot['time'] = candle.timestamp
+        slot['open'] = candle.open
+        slot['high'] = candle.high
+        slot['low'] = candle.low
+        slot['close'] = candle.close
+        slot['volume'] = candle.volume
+        self._seq[0] = seq + 1
+        return seq + 1
+
+    def read_since(self, last_seq: int) -> Tuple[int, List[Candle]]:
+        """
+        Liefert alle Kerzen mit Sequenz > last_seq in Reihenfolge und das neue last_seq.
+        Ist der Leser mehr als capacity Kerzen zurück, gehen die ältesten verloren.
+        """
+        seq = int(self._seq[0])
+        if seq <= last_seq:
+            return last_seq, []
+        start = max(last_seq, seq - self.capacity)
+        if start > last_seq:
+            print(f"[WARN] BarRing {self.shm.name}: Leser überholt, {start - last_seq} Kerzen verloren")
+        idx = np.arange(start, seq) % self.capacity
+        rows = self._bars[idx].copy()
+        candles = [
+            Candle(
+                timestamp=int(r['time']),
+                open=int(r['open']),
+                high=int(r['high']),
+                low=int(r['low']),
+                close=int(r['close']),
+                volume=float(r['volume'])
+            )
+            for r in rows
+        ]
+        return seq, candles
+
+    def close(self) -> None:
+        # numpy-Views vor dem Schließen freigeben, sonst BufferError
+        del self._seq
+        del self._bars
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,158 @@
+# core/spread.py
+"""
+Laufende Spread-Statistik pro Symbol, gespeist aus dem Kursstrom (Spread-Feld der
+M1-Kerzen, Bid/Ask der Ticks, die Entry- und Stop-Logik ohnehin abfragen).
+Alle Updates sind O(1): aktueller Wert, EWMA und zwei P²-Quantil-Schätzer
+(Jain/Chlamtac) für den typischen Spread (Median) und das obere Quantil.
+Entry- und Risk-Code fragen current()/typical() ab statt eines Startwerts,
+is_spike() markiert Phasen mit aufgeweitetem Spread (Entries werden dann übersprungen).
+"""
+import threading
+from typing import Dict, List, Optional
+from config.runtime import (
+    SPREAD_EWMA_ALPHA,
+    SPREAD_SPIKE_FACTOR,
+    SPREAD_SPIKE_QUANTILE,
+    SPREAD_WARMUP,
+)
+
+
+class P2Quantile:
+    """P²-Schätzer eines Quantils p mit fünf Markern, konstanter Speicher."""
+
+    def __init__(self, p: float):
+        self.p = p
+        self.n = 0
+        self.q: List[float] = []                       # Markerhöhen
+        self.pos = [1.0, 2.0, 3.0, 4.0, 5.0]            # tatsächliche Positionen
+        self.want = [1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0]  # Sollpositionen
+        self.step = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x: float) -> None:
+        self.n += 1
+        q = self.q
+        if self.n <= 5:
+            q.append(x)
+            q.sort()
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            self.pos[i] += 1
+        for i in range(5):
+            self.want[i] += self.step[i]
+        for i in (1, 2, 3):
+            d = self.want[i] - self.pos[i]
+            if (d >= 1 and self.pos[i + 1] - self.pos[i] > 1) or (d <= -1 and self.pos[i - 1] - self.pos[i] < -1):
+                d = 1 if d > 0 else -1
+                h = self._parabolic(i, d)
+                if not q[i - 1] < h < q[i + 1]:
+                    h = q[i] + d * (q[i + d] - q[i]) / (self.pos[i + d] - self.pos[i])
+                q[i] = h
+                self.pos[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self.q, self.pos
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> Optional[float]:
+        if not self.q:
+            return None
+        if self.n <= 5:
+            # exaktes Quantil der wenigen Werte
+            return self.q[min(len(self.q) - 1, int(round(self.p * (len(self.q) - 1))))]
+        return self.q[2]
+
+
+class SpreadTracker:
+    def __init__(
+        self,
+        initial: Optional[float] = None,
+        alpha: float = SPREAD_EWMA_ALPHA,
+        spike_factor: float = SPREAD_SPIKE_FACTOR,
+        spike_quantile: float = SPREAD_SPIKE_QUANTILE,
+        warmup: int = SPREAD_WARMUP
+    ):
+        """initial: Spread beim Start (symbol_info), gilt bis die ersten Kurse eintreffen."""
+        self.initial = initial
+        self.alpha = alpha
+        self.spike_factor = spike_factor
+        self.warmup = warmup
+        self.samples = 0
+        self.last: Optional[float] = None
+        self.ewma: Optional[float] = None
+        self._median = P2Quantile(0.5)
+        self._upper = P2Quantile(spike_quantile)
+        self._lock = threading.Lock()
+
+    def update(self, spread: float) -> None:
+        if spread is None or spread < 0:
+            return
+        with self._lock:
+            self.samples += 1
+            self.last = spread
+            self.ewma = spread if self.ewma is None else self.ewma + self.alpha * (spread - self.ewma)
+            self._median.add(spread)
+            self._upper.add(spread)
+
+    def on_tick(self, bid: float, ask: float) -> None:
+        if bid and ask:
+            self.update(ask - bid)
+
+    def current(self) -> Optional[float]:
+        """Zuletzt beobachteter Spread (Startwert, solange noch keine Kurse kamen)."""
+        return self.last if self.last is not None else self.initial
+
+    def typical(self) -> Optional[float]:
+        """Median-Schätzung; bis zum Warm-up EWMA bzw. Startwert."""
+        if self.samples >= self.warmup:
+            return self._median.value()
+        return self.ewma if self.ewma is not None else self.initial
+
+    def upper(self) -> Optional[float]:
+        return self._upper.value()
+
+    def is_spike(self) -> bool:
+        """Aktueller Spread über dem oberen Quantil und über spike_factor × typischem Spread."""
+        if self.samples < self.warmup or self.last is None:
+            return False
+        typical, upper = self.typical(), self.upper()
+        return bool(typical) and self.last > self.spike_factor * typical and self.last > upper
+
+    def __repr__(self):
+        return (
+            f"SpreadTracker(current={self.current()}, ewma={self.ewma}, typical={self.typical()}, "
+            f"upper={self.upper()}, samples={self.samples})"
+        )
+
+
+class SpreadBook:
+    """Tracker aller Symbole (eine Instanz im DataHandler)."""
+
+    def __init__(self):
+        self.trackers: Dict[str, SpreadTracker] = {}
+
+    def register(self, symbol: str, initial: Optional[float] = None) -> SpreadTracker:
+        tracker = self.trackers.get(symbol)
+        if tracker is None:
+            tracker = self.trackers[symbol] = SpreadTracker(initial)
+        elif tracker.initial is None:
+            tracker.initial = initial
+        return tracker
+
+    def get(self, symbol: str) -> Optional[SpreadTracker]:
+        return self.trackers.get(symbol)
+
+    def update(self, symbol: str, spread: float) -> None:
+        tracker = self.trackers.get(symbol)
+        if tracker is not None:
+            tracker.update(spread)
@@ -0,0 +1,166 @@
+# core/stop_manager.py
+"""
+Inkrementelles Stop-Management pro Ticket.
+Jede neue E-Kerze wird genau einmal verarbeitet: laufendes Extrem, RR-Level und
+Break-Even-Zustand werden fortgeschrieben, statt bei jedem Bar die komplette
+Historie seit Entry neu zu scannen.
+Gerechnet wird wie in den Kerzen in Punkten (int): Entry, 1RR und Extrem liegen als
+Punkte vor, Preise (Entry/SL des Brokers, BE-/Trailing-Kandidaten) werden nur an der
+Schnittstelle umgerechnet.
+"""
+from enum import Enum
+from typing import Iterable, Optional, Tuple
+from core.prices import to_points, to_price
+from core.types import Candle
+
+
+class BEState(Enum):
+    AWAITING_CONFIRMATION = "awaiting_confirmation"  # Go-Candle gesehen, warte auf Bestätigung
+    AWAITING_NEXT_BAR     = "awaiting_next_bar"      # Bestätigung da, BE erst nach nächster Kerze
+    DUE                   = "due"                    # BE fällig, SL aber noch nicht beim Broker gesetzt
+    APPLIED               = "applied"
+    INVALIDATED           = "invalidated"
+
+
+class StopManager:
+    """
+    Zustand für Break-Even und Trailing einer einzelnen Position.
+    - Die erste verarbeitete Kerze ist die Go-Candle (Entry-Kerze).
+    - Break-Even: Bestätigung (Buy: close > go.high und low > entry), danach
+      muss die nächste Kerze das Entry ebenfalls halten.
+    - Trailing: ab 2RR wird der SL auf (level - 1) * RR nachgezogen.
+    entry_price/initial_stop/spread sind Broker-Preise, point die Punktgröße des Symbols.
+    """
+    def __init__(
+        self,
+        ticket: int,
+        side: str,
+        entry_price: float,
+        initial_stop: Optional[float],
+        spread: float,
+        point: float,
+        entry_ts: Optional[int] = None
+    ):
+        self.ticket = ticket
+        self.side = side
+        self.entry_price = entry_price
+        self.initial_stop = initial_stop
+        self.spread = spread
+        self.point = point
+        self.entry_ts = entry_ts  # Epoch-Sekunden
+        self.entry = to_points(entry_price, point)
+        self.rr = abs(self.entry - to_points(initial_stop, point)) if initial_stop is not None else 0
+
+        self.go_candle: Optional[Candle] = None
+        self.extreme: Optional[int] = None  # Punkte
+        self.level = 0
+        self.be_state = BEState.AWAITING_CONFIRMATION
+        self.last_ts: Optional[int] = None
+
+    def on_candle(self, candle: Candle) -> None:
+        """Verarbeitet eine abgeschlossene Kerze. Bereits gesehene Kerzen werden ignoriert."""
+        if self.entry_ts is not None and candle.timestamp < self.entry_ts:
+            return
+        if self.last_ts is not None and candle.timestamp <= self.last_ts:
+            return
+        self.last_ts = candle.timestamp
+
+        # Laufendes günstiges Extrem + RR-Level
+        if self.side == 'buy':
+            self.extreme = candle.high if self.extreme is None else max(self.extreme, candle.high)
+            move = self.extreme - self.entry
+        else:
+            self.extreme = candle.low if self.extreme is None else min(self.extreme, candle.low)
+            move = self.entry - self.extreme
+        if self.rr > 0:
+            self.level = max(0, move // self.rr)
+
+        # Break-Even-Zustand
+        if self.go_candle is None:
+            self.go_candle = candle
+            return
+        if self.be_state == BEState.AWAITING_CONFIRMATION:
+            if self._is_confirmation(candle):
+                self.be_state = BEState.AWAITING_NEXT_BAR
+            elif self._violates_entry(candle):
+                self.be_state = BEState.INVALIDATED
+        elif self.be_state == BEState.AWAITING_NEXT_BAR:
+            if self._violates_entry(candle):
+                self.be_state = BEState.INVALIDATED
+            else:
+                self.be_state = BEState.DUE
+
+    def on_price(self, price: int) -> bool:
+        """
+        Intra-Bar-Kurs in Punkten (Tick-Modus, High/Low der laufenden Kerze): günstiges
+        Extrem und RR-Level fortschreiben. Der Break-Even-Zustand bleibt an abgeschlossene
+        Kerzen gebunden. Liefert True, wenn ein neues RR-Level erreicht wurde.
+        """
+        if self.side == 'buy':
+            if self.extreme is not None and price <= self.extreme:
+                return False
+            self.extreme = price
+            move = price - self.entry
+        else:
+            if self.extreme is not None and price >= self.extreme:
+                return False
+            self.extreme = price
+            move = self.entry - price
+        if self.rr <= 0:
+            return False
+        level = move // self.rr
+        if level > self.level:
+            self.level = level
+            return True
+        return False
+
+    def seed(self, candles: Iterable[Candle]) -> None:
+        """Einmaliges Nachholen aller Kerzen seit Entry (z.B. nach Neustart)."""
+        for c in candles:
+            self.on_candle(c)
+
+    def _is_confirmation(self, candle: Candle) -> bool:
+        if self.side == 'buy':
+            return candle.close > self.go_candle.high and candle.low > self.entry
+        return candle.close < self.go_candle.low and candle.high < self.entry
+
+    def _violates_entry(self, candle: Candle) -> bool:
+        if self.side == 'buy':
+            return candle.low <= self.entry
+        return candle.high >= self.entry
+
+    def break_even_price(self, spread: Optional[float] = None) -> Optional[float]:
+        """Roher BE-Preis (Entry ∓ Spread), nur wenn BE fällig ist; spread = aktueller typischer Spread."""
+        if self.be_state != BEState.DUE:
+            return None
+        spread = self.spread if spread is None else spread
+        if self.side == 'buy':
+            return self.entry_price - spread
+        return self.entry_price + spread
+
+    def mark_break_even_applied(self) -> None:
+        self.be_state = BEState.APPLIED
+
+    def trailing_candidate(self, current_sl: float, last_level: int) -> Tuple[Optional[float], int]:
+        """
+        Trailing ab 2RR: SL auf (level - 1) * RR, nur wenn Level gestiegen und SL verbessert wird.
+        Liefert den Kandidaten als Broker-Preis (exakt auf Punkte) und das neue Level.
+        """
+        if self.rr <= 0 or self.level < 2 or self.level <= last_level:
+            return None, last_level
+        current = to_points(current_sl, self.point) if current_sl is not None else None
+        if self.side == 'buy':
+            candidate = self.entry + (self.level - 1) * self.rr
+            if current is None or candidate > current:
+                return to_price(candidate, self.point), self.level
+        else:
+            candidate = self.entry - (self.level - 1) * self.rr
+            if current is None or candidate < current:
+                return to_price(candidate, self.point), self.level
+        return None, last_level
+
+    def __repr__(self):
+        return (
+            f"StopManager(ticket={self.ticket}, side={self.side}, extreme={self.extreme}, "
+            f"level={self.level}, be_state={self.be_state.name})"
+        )
@@ -1,15 +1,27 @@
 import MetaTrader5 as mt5
 import pandas as pd
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 from core.phase_manager import PhaseStateMachine
-from core.types import Candle, Phase
+from core.types import Candle, Phase, Tick, TFSnapshot, ControllerSnapshot
+from core.events import OrderFilled, PositionClosed, SLModified
 from core.entry_manager import EntryLogicManager
 from core.risk_manager import RiskManager
+from core.checkpoint import (
+    load_checkpoint, writer as checkpoints, plain, ts_in, ts_out, phase_in, phase_out,
+    phase_state_in, phase_state_out, stop_manager_in, stop_manager_out, keyed_in, keyed_out
+)
+from core.debug import quiet
+from core.latency import recorder as latency
+from core.metrics import metrics
+from core.profiler import profiler
+from core.prices import floor_price, from_epoch, to_price
+from config.runtime import CHECKPOINT_ENABLED, TF_BUFFER_ONLY
 import logging
 import csv
 import os
-import math
+import threading
+import time
 import pytz
 from config.phase import is_confirmation_bearish, is_confirmation_bullish
 from config.timeframes import (
@@ -20,6 +32,7 @@ from config.timeframes import (
     BASE_PHASES,
     K, B, E,
     get_direction,
+    get_history_limit,
 )
 
 
@@ -90,10 +103,21 @@ class MultiTimeframeController:
         self.risk_mgr.symbol = symbol
         self.risk_mgr.spread = spread
         self.risk_mgr.tick_size = tick_size
+        self.risk_mgr.executor = data_handler.executor
+        self.risk_mgr.fx = data_handler.fx
+        self.spreads = data_handler.spreads.register(symbol, spread)
+        self.risk_mgr.spreads = self.spreads
+        self.portfolio = data_handler.portfolio
+        if self.portfolio.balance is None:
+            self.portfolio.balance = account_balance
+
+        # Serialisiert Kerzen-Verarbeitung und Order-Callbacks (Executor-Thread)
+        self._lock = threading.RLock()
+        self._order_in_flight = False
 
         self.break_even_applied: Dict[int, bool] = {}
         self.machines = {tf: PhaseStateMachine() for tf in TIMEFRAMES}
-        self.entry_mgr = EntryLogicManager(self.machines[E], spread)
+        self.entry_mgr = EntryLogicManager(self.machines[E], spread, self.spreads)
 
         self.phases = {tf: None for tf in TIMEFRAMES}
         self.open_ticket: Optional[int] = None
@@ -106,30 +130,39 @@ class MultiTimeframeController:
         self.entered_direction: Optional[str] = None
         self.last_update_ts = {tf: None for tf in TIMEFRAMES}
         self.processed_entry_candles = set()
-
-
-    def initialize(self) -> None:
+        self.replay_log: Dict[int, list] = {tf: [] for tf in TIMEFRAMES}
+        # TFs, deren Kerzen nur gepuffert werden (Kaskade erreicht sie gerade nicht);
+        # der Puffer hält alle Kerzen seit der Deaktivierung (die FSM ist pfadabhängig),
+        # höchstens so viele wie die History. Läuft er über, wird nicht weiter gepuffert
+        # und die FSM bei Reaktivierung aus der History neu aufgebaut.
+        self.buffer_only = {tf: False for tf in TIMEFRAMES}
+        self.buffered: Dict[int, List[Candle]] = {tf: [] for tf in TIMEFRAMES}
+        self.buffer_overflow = {tf: False for tf in TIMEFRAMES}
+        # Zuletzt veröffentlichter Zustand für Summary/Dashboard (nur lesen)
+        self.snapshot: Optional[ControllerSnapshot] = None
+
+
+    def initialize(self, stale_trades: Optional[Tuple[list, list]] = None) -> None:
+        """
+        Kalt- oder Warmstart des Controllers. stale_trades = (orders, positions) aus einem
+        gemeinsamen Broker-Snapshot (StartupOrchestrator); ohne Angabe werden nur die
+        Bot-Orders/-Positionen dieses Symbols abgefragt und geschlossen.
+        """
         print("[INIT] initialize() wurde gestartet")
 
-        # 1. Alte Orders & Positionen löschen (unverändert)
-        for o in self.data.mt5.orders_get(magic=234000) or []:
-            print(f"[INIT] Lösche alte Pending-Order: {o.ticket}")
-            self.data.cancel_order(o.ticket)
-        for p in self.data.mt5.positions_get() or []:
-            if p.magic == 234000:
-                print(f"[INIT] Schließe alte Position: {p.ticket}")
-                req = {
-                    "action": mt5.TRADE_ACTION_DEAL,
-                    "position": p.ticket,
-                    "symbol": p.symbol,
-                    "volume": p.volume,
-                    "type": mt5.ORDER_TYPE_BUY if p.type == mt5.ORDER_TYPE_SELL else mt5.ORDER_TYPE_SELL,
-                    "price": mt5.symbol_info_tick(p.symbol).bid if p.type == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(p.symbol).ask,
-                    "deviation": 20,
-                    "magic": 234000,
-                    "comment": "Bot-Startup Cleanup"
-                }
-                self.data.mt5.order_send(req)
+        # 0. Warm-Restart aus Checkpoint (kein Cleanup, kein Replay ab NEUTRAL)
+        if CHECKPOINT_ENABLED and self._restore_from_checkpoint():
+            self._update_tf_modes()
+            self._publish_snapshot()
+            return
+
+        # 1. Alte Orders & Positionen löschen
+        if stale_trades is None:
+            stale_trades = (
+                [o for o in self.data.mt5.orders_get(symbol=self.symbol) or [] if getattr(o, 'magic', 234000) == 234000],
+                [p for p in self.data.mt5.positions_get(symbol=self.symbol) or [] if p.magic == 234000],
+            )
+        self._cleanup_stale_trades(*stale_trades)
 
         # 2. Interner State resetten (unverändert)
         self.open_ticket = None
@@ -142,20 +175,23 @@ class MultiTimeframeController:
 
         # 3. FSMs initialisieren – Historie laden und FSM resetten (ohne Kontext-Manipulation)
         for tf in TIMEFRAMES:
-            self.data.refresh_history(self.symbol, tf)
-            hist = self.data.histories[self.symbol][tf]
+            hist = self.data.load_history(self.symbol, tf)
 
             fsm = self.machines[tf]
 
-            # Zustand mit Historie neu aufbauen
-            phase = fsm.replay_from_scratch(hist)
-    
-            print(f"[INIT] TF={tf}, Phase nach finalem Update: {phase.name}")
-            print(f"[INIT DEBUG] FSM Context für TF={tf}: {fsm.state}")
+            # Zustand mit Historie neu aufbauen (stiller Batch-Replay)
+            phase, transitions = fsm.replay_batch(hist, record_transitions=True)
+            self.replay_log[tf] = transitions
+
+            last = transitions[-1] if transitions else None
+            print(
+                f"[INIT] TF={tf}, Phase nach Replay: {phase.name} "
+                f"({len(hist)} Kerzen, {len(transitions)} Übergänge"
+                + (f", zuletzt {last[1].name}->{last[2].name} @ {last[0]})" if last else ")")
+            )
 
-            # Letzte Phase merken
+            # Letzte Phase merken (FSM-Puffer bleibt eine eigene Liste, nicht die History)
             fsm.state.prev_phase = phase
-            fsm.state.last_candles = hist
             fsm.current_phase = phase
             self.phases[tf] = phase
 
@@ -168,46 +204,10 @@ class MultiTimeframeController:
 
         # 4. Switch-Daten übernehmen (unverändert)
         for tf in TIMEFRAMES:
-            fsm = self.machines[tf]
-            phase = self.phases[tf]
-            if phase in (Phase.SWITCH_BULL, Phase.BASE_SWITCH_BULL):
-                self.switch_data[tf] = {
-                    'initial_extreme': fsm.state.switch_bull_initial_low,
-                    'previous_extreme': fsm.state.switch_bull_prev_higher_high,
-                }
-            elif phase in (Phase.SWITCH_BEAR, Phase.BASE_SWITCH_BEAR):
-                self.switch_data[tf] = {
-                    'initial_extreme': fsm.state.switch_bear_initial_high,
-                    'previous_extreme': fsm.state.switch_bear_prev_lower_low,
-                }
-            else:
-                self.switch_data[tf] = {}
+            self._update_switch_data(tf)
 
-        # 5. Übernehme offene Orders/Positionen (unverändert)
-        for order in self.data.mt5.orders_get(magic=234000) or []:
-            self.open_ticket = order.ticket
-            self.entry_price = order.price_open
-            self.initial_stop = order.sl
-            self.current_sl = order.sl
-            self.side = 'buy' if order.type == mt5.ORDER_TYPE_BUY_STOP else 'sell'
-            order_time = getattr(order, 'time_setup', None)
-            if order_time:
-                buf_e = self.data.histories[self.symbol][E]
-                ts = next((c.timestamp for c in buf_e if c.timestamp >= order_time), None)
-                if ts:
-                    self.entry_timestamps[order.ticket] = ts
-        for p in self.data.mt5.positions_get(symbol=self.symbol) or []:
-            if p.magic == 234000:
-                entry_ts = datetime.fromtimestamp(p.time, tz=pytz.UTC).replace(tzinfo=None)
-                self.entry_timestamps[p.ticket] = entry_ts
-                self.open_ticket = p.ticket
-                self.entry_price = p.price_open
-                self.initial_stop = p.sl
-                self.current_sl = p.sl
-                self.side = 'buy' if p.type == mt5.POSITION_TYPE_BUY else 'sell'
-                self.break_even_applied[p.ticket] = False
-                self.risk_mgr.trailing_levels[p.ticket] = 0
-                print(f"[INIT] Übernehme Position {p.ticket}: Entry-Time={entry_ts}, Price={self.entry_price}, SL={self.initial_stop}")
+        # 5. Übernehme offene Orders/Positionen
+        self._adopt_open_trades()
 
         print(f"[INIT DEBUG] entry_timestamps nach initialize: {self.entry_timestamps}")
         print(f"[INIT DEBUG] entry_price={self.entry_price}, initial_stop={self.initial_stop}")
@@ -249,6 +249,8 @@ class MultiTimeframeController:
 
         self._sync_ticket_state_with_mt5()
         self.sync_active_tf_with_phases()
+        self._update_tf_modes()
+        self._publish_snapshot()
 
 
 
@@ -260,6 +262,262 @@ class MultiTimeframeController:
 
 
 
+    def _cleanup_stale_trades(self, orders: list, positions: list) -> None:
+        """Löscht Pending-Orders und schließt Positionen des Bots aus einem früheren Lauf."""
+        for o in orders:
+            print(f"[INIT] Lösche alte Pending-Order: {o.ticket}")
+            self.data.cancel_order(o.ticket)
+        for p in positions:
+            if p.magic == 234000:
+                print(f"[INIT] Schließe alte Position: {p.ticket}")
+                build = lambda p=p: {
+                    "action": mt5.TRADE_ACTION_DEAL,
+                    "position": p.ticket,
+                    "symbol": p.symbol,
+                    "volume": p.volume,
+                    "type": mt5.ORDER_TYPE_BUY if p.type == mt5.ORDER_TYPE_SELL else mt5.ORDER_TYPE_SELL,
+                    "price": mt5.symbol_info_tick(p.symbol).bid if p.type == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(p.symbol).ask,
+                    "deviation": 20,
+                    "magic": 234000,
+                    "comment": "Bot-Startup Cleanup"
+                }
+                self.data.executor.execute(('close', p.ticket), build, check=False)
+
+    def _adopt_open_trades(self, warm: bool = False) -> None:
+        """
+        Übernimmt offene Bot-Orders/-Positionen aus MT5.
+        Bei warm=True bleiben bereits bekannte Tickets (aus dem Checkpoint) unverändert,
+        nur der aktuelle SL wird vom Broker übernommen.
+        """
+        for order in self.data.mt5.orders_get(magic=234000) or []:
+            if getattr(order, 'symbol', self.symbol) != self.symbol:
+                continue  # Order eines anderen Symbols (parallel gestartete Controller)
+            if warm and order.ticket == self.open_ticket:
+                continue
+            self.open_ticket = order.ticket
+            self.entry_price = order.price_open
+            self.initial_stop = order.sl
+            self.current_sl = order.sl
+            self.side = 'buy' if order.type == mt5.ORDER_TYPE_BUY_STOP else 'sell'
+            order_time = getattr(order, 'time_setup', None)
+            if order_time:
+                buf_e = self.data.histories[self.symbol][E]
+                ts = next((c.timestamp for c in buf_e if c.timestamp >= order_time), None)
+                if ts:
+                    self.entry_timestamps[order.ticket] = ts
+        for p in self.data.mt5.positions_get(symbol=self.symbol) or []:
+            if p.magic == 234000:
+                if warm and p.ticket in self.entry_timestamps:
+                    self.open_ticket = p.ticket
+                    self.current_sl = p.sl
+                    continue
+                entry_ts = int(p.time)
+                self.entry_timestamps[p.ticket] = entry_ts
+                self.open_ticket = p.ticket
+                self.entry_price = p.price_open
+                self.initial_stop = p.sl
+                self.current_sl = p.sl
+                self.side = 'buy' if p.type == mt5.POSITION_TYPE_BUY else 'sell'
+                self.break_even_applied[p.ticket] = False
+                self.risk_mgr.trailing_levels[p.ticket] = 0
+                print(f"[INIT] Übernehme Position {p.ticket}: Entry-Time={from_epoch(entry_ts)}, Price={self.entry_price}, SL={self.initial_stop}")
+
+
+    def checkpoint_state(self) -> Dict:
+        """Kompletter Controller-Zustand für den Warm-Restart als reine Daten (Schema: core/checkpoint.py)."""
+        with self._lock:
+            return {
+                'fsm_states': keyed_out({tf: self.machines[tf].state for tf in TIMEFRAMES}, phase_state_out),
+                'phases': keyed_out(self.phases, phase_out),
+                'active_tf': self.active_tf,
+                'entered_direction': self.entered_direction,
+                'switch_data': keyed_out(self.switch_data, lambda d: {k: plain(v) for k, v in d.items()}),
+                'last_update_ts': keyed_out(self.last_update_ts, ts_out),
+                'entry_timestamps': keyed_out(self.entry_timestamps, ts_out),
+                'trailing_levels': keyed_out(self.risk_mgr.trailing_levels),
+                'stop_managers': keyed_out(self.risk_mgr.stop_managers, stop_manager_out),
+                'break_even_applied': keyed_out(self.break_even_applied),
+                'processed_entry_candles': sorted(ts_out(ts) for _, ts in self.processed_entry_candles),
+                'buffer_only': keyed_out(self.buffer_only),
+                'trade': {
+                    'open_ticket': self.open_ticket,
+                    'entry_price': plain(self.entry_price),
+                    'initial_stop': plain(self.initial_stop),
+                    'current_sl': plain(self.current_sl),
+                    'side': self.side,
+                },
+            }
+
+    def save_checkpoint(self) -> None:
+        """Checkpoint vormerken; geschrieben wird gebündelt im Writer-Thread (core/checkpoint.py)."""
+        checkpoints.mark(self.symbol, self.checkpoint_state)
+
+    def _restore_from_checkpoint(self) -> bool:
+        """
+        Stellt den Controller aus dem letzten Checkpoint wieder her und spielt nur die
+        seitdem verpassten Kerzen nach. Liefert False (→ Kaltstart), wenn kein
+        Checkpoint existiert oder die Lücke größer als die geladene Historie ist.
+        """
+        raw = load_checkpoint(self.symbol)
+        if raw is None:
+            return False
+        try:
+            data = self._decode_checkpoint(raw)
+        except (KeyError, ValueError, TypeError) as e:
+            print(f"[WARN] Checkpoint für {self.symbol} passt nicht zum Schema ({e!r}) – Kaltstart.")
+            return False
+
+        # Erst alle TFs prüfen, dann erst den Zustand anfassen (gepufferte TFs dürfen
+        # beliebig alt sein, sie werden beim Nachholen notfalls komplett neu aufgebaut)
+        histories = {}
+        dormant = data['buffer_only']
+        for tf in TIMEFRAMES:
+            hist = self.data.load_history(self.symbol, tf)
+            last_ts = data['fsm_states'][tf].last_candle_ts
+            if not hist:
+                print(f"[INIT] Keine Historie für {self.symbol} TF={tf} – Kaltstart.")
+                return False
+            if not dormant.get(tf) and (last_ts is None or last_ts < hist[0].timestamp):
+                print(f"[INIT] Checkpoint für {self.symbol} TF={tf} zu alt (last_ts={last_ts}) – Kaltstart.")
+                return False
+            histories[tf] = hist
+
+        for tf in TIMEFRAMES:
+            self.machines[tf].state = data['fsm_states'][tf]
+        self.phases = data['phases']
+        self.active_tf = data['active_tf']
+        self.entered_direction = data['entered_direction']
+        self.switch_data = data['switch_data']
+        self.last_update_ts = data['last_update_ts']
+        self.entry_timestamps = data['entry_timestamps']
+        self.risk_mgr.trailing_levels = data['trailing_levels']
+        self.risk_mgr.stop_managers = data['stop_managers']
+        self.break_even_applied = data['break_even_applied']
+        self.processed_entry_candles = data['processed_entry_candles']
+        trade = data['trade']
+        self.open_ticket = trade['open_ticket']
+        self.entry_price = trade['entry_price']
+        self.initial_stop = trade['initial_stop']
+        self.current_sl = trade['current_sl']
+        self.side = trade['side']
+
+        # Nur die seit dem Checkpoint verpassten Kerzen nachspielen
+        for tf in TIMEFRAMES:
+            missed = self._catch_up(tf)
+            print(f"[INIT] TF={tf} aus Checkpoint: {missed} Kerzen nachgespielt, Phase={self.phases[tf].name}")
+
+        # Stop-Zustand offener Tickets auf verpasste E-Kerzen bringen
+        for stops in self.risk_mgr.stop_managers.values():
+            stops.seed(histories[E])
+
+        self._adopt_open_trades(warm=True)
+        self._sync_ticket_state_with_mt5()
+        self.sync_active_tf_with_phases()
+        print(f"[INIT] {self.symbol}: Warm-Restart aus Checkpoint (active_tf={self.active_tf}, dir={self.entered_direction})")
+        return True
+
+    def _decode_checkpoint(self, raw: Dict) -> Dict:
+        """Reine Checkpoint-Daten → Controller-Objekte (Gegenstück zu checkpoint_state)."""
+        data = {
+            'fsm_states': keyed_in(raw['fsm_states'], phase_state_in),
+            'phases': keyed_in(raw['phases'], phase_in),
+            'active_tf': raw['active_tf'],
+            'entered_direction': raw['entered_direction'],
+            'switch_data': keyed_in(raw['switch_data'], dict),
+            'last_update_ts': keyed_in(raw['last_update_ts'], ts_in),
+            'entry_timestamps': keyed_in(raw['entry_timestamps'], ts_in),
+            'trailing_levels': keyed_in(raw['trailing_levels'], int),
+            'stop_managers': keyed_in(raw['stop_managers'], stop_manager_in),
+            'break_even_applied': keyed_in(raw['break_even_applied'], bool),
+            'processed_entry_candles': {(self.symbol, ts_in(t)) for t in raw['processed_entry_candles']},
+            'buffer_only': keyed_in(raw['buffer_only'], bool),
+            'trade': dict(raw['trade']),
+        }
+        for key in ('fsm_states', 'phases', 'switch_data', 'last_update_ts', 'buffer_only'):
+            if set(data[key]) != set(TIMEFRAMES):
+                raise ValueError(f"{key}: TFs {sorted(data[key])} statt {list(TIMEFRAMES)}")
+        return data
+
+    def _update_switch_data(self, tf: int) -> None:
+        fsm = self.machines[tf]
+        phase = self.phases[tf]
+        if phase in (Phase.BASE_SWITCH_BULL, Phase.SWITCH_BULL):
+            self.switch_data[tf] = {
+                'initial_extreme': fsm.state.switch_bull_initial_low,
+                'previous_extreme': fsm.state.switch_bull_prev_higher_high
+            }
+        elif phase in (Phase.BASE_SWITCH_BEAR, Phase.SWITCH_BEAR):
+            self.switch_data[tf] = {
+                'initial_extreme': fsm.state.switch_bear_initial_high,
+                'previous_extreme': fsm.state.switch_bear_prev_lower_low
+            }
+        else:
+            self.switch_data[tf] = {}
+
+
+    def _catch_up(self, tf: int) -> int:
+        """
+        Spielt alle Kerzen nach, die die FSM noch nicht gesehen hat: nach Buffer-only aus dem
+        Puffer des Controllers, sonst (Warm-Restart) aus der History. Reicht die History nicht
+        bis zur letzten verarbeiteten Kerze zurück oder ist der Puffer übergelaufen, wird die
+        FSM aus der History neu aufgebaut.
+        Liefert die Anzahl nachgespielter Kerzen.
+        """
+        hist = self.data.histories[self.symbol].get(tf, [])
+        buffered, self.buffered[tf] = self.buffered[tf], []
+        overflow, self.buffer_overflow[tf] = self.buffer_overflow[tf], False
+        fsm = self.machines[tf]
+        last_ts = fsm.state.last_candle_ts
+        if not hist:
+            return 0
+        if overflow or (not buffered and (last_ts is None or last_ts < hist[0].timestamp)):
+            phase, self.replay_log[tf] = fsm.replay_batch(hist, record_transitions=True)
+            fsm.state.prev_phase = phase
+            fsm.state.last_candle_ts = hist[-1].timestamp
+            missed = len(hist)
+        else:
+            pending = [c for c in buffered if c.timestamp > last_ts]
+            if pending:
+                last_ts = pending[-1].timestamp
+            pending += [c for c in hist if c.timestamp > last_ts]
+            with quiet():
+                for c in pending:
+                    phase = fsm.update_with_candle(c)
+                    fsm.state.prev_phase = phase
+                    fsm.state.last_candle_ts = c.timestamp
+            missed = len(pending)
+        self.phases[tf] = fsm.state.current_phase
+        fsm.current_phase = fsm.state.current_phase
+        self._update_switch_data(tf)
+        self.last_update_ts[tf] = hist[-1].timestamp
+        return missed
+
+    def _update_tf_modes(self) -> None:
+        """
+        Schaltet B/E zwischen live und buffer-only: B bleibt live, solange die Kaskade B
+        erreichen kann oder B/E aktiv ist; E zusätzlich bei offenem Trade (BE/Trailing,
+        Pending-Schutz). Bei Reaktivierung wird die FSM aus den gepufferten Kerzen nachgezogen,
+        bevor die Wechsel-Checks die Phase lesen.
+        """
+        if not TF_BUFFER_ONLY:
+            return
+        trade = self.open_ticket is not None or bool(self.entry_timestamps) or self._order_in_flight
+        for tf in (B, E):
+            if tf == B:
+                live = self.active_tf in (B, E) or can_k_to_b(self.phases[K])
+            else:
+                live = self.active_tf == E or trade or can_b_to_e(self.phases[K], self.phases[B])
+            if live != self.buffer_only[tf]:
+                continue  # Modus unverändert
+            self.buffer_only[tf] = not live
+            if live:
+                missed = self._catch_up(tf)
+                print(f"[FSM] {self.symbol} TF={tf} wieder live: {missed} gepufferte Kerzen nachgeholt, Phase={self.phases[tf].name}")
+                metrics.inc("fsm_catchup_bars_total", {"symbol": self.symbol, "tf": tf}, value=missed,
+                            help_text="Beim Reaktivieren nachgeholte Kerzen")
+            else:
+                print(f"[FSM] {self.symbol} TF={tf} buffer-only (Kaskade erreicht TF nicht)")
+
     def get_active_position_ticket(self):
         pos = [p for p in self.data.mt5.positions_get(symbol=self.symbol) if p.magic == 234000]
         if pos:
@@ -288,9 +546,102 @@ class MultiTimeframeController:
 
 
     def on_new_candle(self, tf: int, candle: Candle) -> None:
-        if self.last_update_ts[tf] == candle.timestamp:
+        if profiler.active:
+            profiler.profile_call(self._on_new_candle, tf, candle)
+        else:
+            self._on_new_candle(tf, candle)
+
+    def on_tick(self, tick: Tick, bar: Candle) -> None:
+        """
+        Intra-Bar-Hook im Tick-Modus: Trailing zieht nach, sobald der Kurs ein neues
+        RR-Level erreicht, statt bis zum Schluss der M1-Kerze zu warten.
+        Die Phasen-FSMs laufen weiterhin nur auf abgeschlossenen Kerzen.
+        """
+        with self._lock:
+            if not self.risk_mgr.stop_managers:
+                return
+            for ticket, fut in self.risk_mgr.on_intrabar(self.symbol, self.current_sl, bar):
+                fut.add_done_callback(lambda f, t=ticket: self._on_trailing_done(t, f.result()))
+
+    # ---------------- Order-/Positions-Events (Positions-Monitor) ----------------
+
+    def on_order_filled(self, event: OrderFilled) -> None:
+        with self._lock:
+            # Pending-Reservierung durch die tatsächliche Position ersetzen
+            self.portfolio.open(event.ticket, self.symbol, event.side, event.volume, event.price, event.sl)
+            print(f"[INFO] Position eröffnet (Ticket={event.ticket}, {event.side} {event.volume} @ {event.price}, sl={event.sl})")
+            self._publish_snapshot()
+
+    def on_sl_modified(self, event: SLModified) -> None:
+        with self._lock:
+            if event.ticket == self.open_ticket:
+                self.current_sl = event.new_sl
+            self.portfolio.update_sl(event.ticket, self.symbol, event.side, event.volume, event.price_open, event.new_sl)
+            self._publish_snapshot()
+
+    def on_position_closed(self, event: PositionClosed) -> None:
+        with self._lock:
+            ticket = event.ticket
+            self.entry_timestamps.pop(ticket, None)
+            self.break_even_applied.pop(ticket, None)
+            self.risk_mgr.drop_ticket(ticket)
+            self.portfolio.close(ticket)
+            if self.open_ticket == ticket:
+                self.open_ticket = None
+            print(f"[INFO] Position geschlossen (Ticket={ticket}, {event.side} {event.volume}, zuletzt {event.price_last})")
+            self._publish_snapshot()
+
+    def _bot_trades(self) -> Tuple[list, list]:
+        """
+        Offene Bot-Positionen und -Orders des Symbols aus dem letzten Monitor-Snapshot
+        (per Events aktuell gehalten, kein Broker-Call pro Kerze). Nur ohne laufenden
+        Monitor wird der Broker direkt abgefragt.
+        """
+        monitor = getattr(self.data, "monitor", None)
+        snap = monitor.snapshot(self.symbol) if monitor is not None else None
+        if snap is not None:
+            return snap
+        return (
+            [p for p in self.data.mt5.positions_get(symbol=self.symbol) or [] if p.magic == 234000],
+            [o for o in self.data.mt5.orders_get(symbol=self.symbol) or [] if o.magic == 234000],
+        )
+
+    def _active_tickets(self) -> set:
+        """Offene Bot-Tickets (Positionen + Pending-Orders)."""
+        positions, orders = self._bot_trades()
+        return {p.ticket for p in positions} | {o.ticket for o in orders}
+
+    def _on_new_candle(self, tf: int, candle: Candle) -> None:
+        with self._lock:
+            if self.last_update_ts[tf] == candle.timestamp:
+                return
+            # buffer_only wird unter dem Lock umgeschaltet (_update_tf_modes) und beim
+            # Nachholen geleert (_catch_up) – Prüfung und Append daher ebenfalls darunter
+            if self.buffer_only[tf]:
+                self._buffer(tf, candle)
+                return
+            self.last_update_ts[tf] = candle.timestamp
+            self._process_candle(tf, candle)
+            self._update_tf_modes()
+            self._publish_snapshot()
+            if CHECKPOINT_ENABLED:
+                self.save_checkpoint()
+
+    def _buffer(self, tf: int, candle: Candle) -> None:
+        """Kerze eines buffer-only TFs merken; mehr als die History-Tiefe wird nicht gepuffert."""
+        if self.buffer_overflow[tf]:
             return
-        self.last_update_ts[tf] = candle.timestamp
+        buf = self.buffered[tf]
+        buf.append(candle)
+        if len(buf) > get_history_limit(tf):
+            # Nachspielen wäre teurer als der Neuaufbau aus der History (replay_batch)
+            buf.clear()
+            self.buffer_overflow[tf] = True
+            print(f"[FSM] {self.symbol} TF={tf} Puffer voll – Neuaufbau aus der History bei Reaktivierung")
+
+    def _process_candle(self, tf: int, candle: Candle) -> None:
+        # Offene Bot-Trades einmal pro Kerze aus dem Monitor-Snapshot (siehe _bot_trades)
+        trades = self._bot_trades() if tf == E else None
 
         for tf_upd in TIMEFRAMES:
             # NUR für den tatsächlich betroffenen TF (der bei on_new_candle übergeben wurde)
@@ -301,24 +652,28 @@ class MultiTimeframeController:
 
             if last_candle and ctx.last_candle_ts != last_candle.timestamp:
                 print(f"[DEBUG] FSM-Update für TF={tf}: last_candle_ts alt={ctx.last_candle_ts}, neu={last_candle.timestamp}")
+                if latency.enabled:
+                    t0 = time.monotonic_ns()
                 new_phase = fsm.update_with_candle(last_candle)
+                if latency.enabled:
+                    latency.since(self.symbol, tf, "fsm", t0)
+                if new_phase != self.phases[tf]:
+                    metrics.inc(
+                        "phase_transitions_total",
+                        {"symbol": self.symbol, "tf": tf, "from": getattr(self.phases[tf], "name", None), "to": new_phase.name},
+                        help_text="Phasenwechsel der FSM"
+                    )
                 fsm.state.prev_phase = new_phase
                 fsm.state.last_candle_ts = last_candle.timestamp
                 self.phases[tf] = new_phase
 
                 # Switch-Daten aktualisieren (property, nicht dict)
-                if new_phase in (Phase.BASE_SWITCH_BULL, Phase.SWITCH_BULL):
-                    self.switch_data[tf] = {
-                        'initial_extreme': fsm.state.switch_bull_initial_low,
-                        'previous_extreme': fsm.state.switch_bull_prev_higher_high
-                    }
-                elif new_phase in (Phase.BASE_SWITCH_BEAR, Phase.SWITCH_BEAR):
-                    self.switch_data[tf] = {
-                        'initial_extreme': fsm.state.switch_bear_initial_high,
-                        'previous_extreme': fsm.state.switch_bear_prev_lower_low
-                    }
-                else:
-                    self.switch_data[tf] = {}
+                self._update_switch_data(tf)
+
+                # Untere TFs ggf. reaktivieren (FSM aus dem Puffer nachziehen), bevor die
+                # Wechsel-Checks deren Phase lesen
+                if tf != E:
+                    self._update_tf_modes()
 
 
 
@@ -347,19 +702,19 @@ class MultiTimeframeController:
         if tf == E:
             phase = self.phases.get(E)
             if phase == Phase.SWITCH_BEAR:
-                for order in self.data.mt5.orders_get(symbol=self.symbol) or []:
-                    if order.magic != 234000:
-                        continue
+                for order in trades[1]:
                     if order.type == mt5.ORDER_TYPE_BUY_STOP:
-                        self.data.cancel_order(order.ticket)
+                        self.data.cancel_order_async(
+                            order.ticket, on_done=lambda res, t=order.ticket: self._on_order_cancelled(t, res)
+                        )
                         if self.open_ticket == order.ticket:
                             self.open_ticket = None
             elif phase == Phase.SWITCH_BULL:
-                for order in self.data.mt5.orders_get(symbol=self.symbol) or []:
-                    if order.magic != 234000:
-                        continue
+                for order in trades[1]:
                     if order.type == mt5.ORDER_TYPE_SELL_STOP:
-                        self.data.cancel_order(order.ticket)
+                        self.data.cancel_order_async(
+                            order.ticket, on_done=lambda res, t=order.ticket: self._on_order_cancelled(t, res)
+                        )
                         if self.open_ticket == order.ticket:
                             self.open_ticket = None
         
@@ -383,7 +738,7 @@ class MultiTimeframeController:
                     return
 
             elif tf == E:
-                if self._has_active_trade():
+                if trades[0] or trades[1]:
                     print("[INFO] Aktiver Trade vorhanden – bleibe im E-Timeframe!")
                 else:
                     if should_switch_back_to_b(b_phase, self.entered_direction, current_k_dir):
@@ -412,47 +767,54 @@ class MultiTimeframeController:
             buf = self.data.histories[self.symbol][E]
 
             # 1) Break-Even und Trailing für jede aktive Bot-Position
-            positions = [
-                p for p in self.data.mt5.positions_get(symbol=self.symbol) or []
-                if p.magic == 234000
-            ]
+            positions = trades[0]
+            # Ausstehende SL-Updates gegen diesen Snapshot verifizieren
+            self.risk_mgr.verify_pending(positions)
+            # Fills/Closes/SL-Änderungen ins Portfolio-Exposure übernehmen
+            self.portfolio.sync(self.symbol, positions)
             for p in positions:
                 ticket   = p.ticket
                 entry_ts = self.entry_timestamps.get(ticket)
                 if entry_ts is None:
                     print(f"[WARN] Kein Entry-Timestamp für Ticket {ticket}")
                     continue
-                buf_e = [c for c in buf if c.timestamp >= entry_ts]
-                print(f"[DEBUG] buf_e length für Ticket {ticket}: {len(buf_e)}")
 
-                # Break-Even
-                new_sl = self.risk_mgr.try_break_even(
-                    candles=buf_e,
+                # Stop-Zustand inkrementell fortschreiben (nur die neue Kerze)
+                stops = self.risk_mgr.get_stop_manager(
+                    ticket=ticket,
                     side=self.side,
                     entry_price=self.entry_price,
+                    initial_stop=self.initial_stop,
                     spread=self.spread,
-                    current_sl=self.current_sl,
+                    point=self.tick_size,
+                    entry_ts=entry_ts,
+                    history=buf
+                )
+                if buf:
+                    stops.on_candle(buf[-1])
+                print(f"[DEBUG] Stop-State für Ticket {ticket}: {stops}")
+
+                # Break-Even (asynchron, Ergebnis kommt per Callback)
+                fut = self.risk_mgr.try_break_even(
                     symbol=self.symbol,
-                    ticket=ticket
+                    side=self.side,
+                    current_sl=self.current_sl,
+                    ticket=ticket,
+                    stops=stops
                 )
-                if new_sl is not None:
-                    self.current_sl = new_sl
-                    self.break_even_applied[ticket] = True
-                    print(f"[BE] Break-Even aktiviert: new_sl={new_sl} for Ticket={ticket}")
+                if fut is not None:
+                    fut.add_done_callback(lambda f, t=ticket: self._on_break_even_done(t, f.result()))
 
                 # Trailing
-                new_sl = self.risk_mgr.try_trailing(
-                    candles=buf_e,
+                fut = self.risk_mgr.try_trailing(
                     symbol=self.symbol,
                     side=self.side,
-                    entry_price=self.entry_price,
-                    initial_stop=self.initial_stop,
                     current_sl=self.current_sl,
-                    ticket=ticket
+                    ticket=ticket,
+                    stops=stops
                 )
-                if new_sl is not None:
-                    self.current_sl = new_sl
-                    print(f"[TR] Trailing Stop applied: new_sl={new_sl} for Ticket={ticket}")
+                if fut is not None:
+                    fut.add_done_callback(lambda f, t=ticket: self._on_trailing_done(t, f.result()))
 
             # 2) Einstieg in E (Entry-Phase)
             entry_key = (self.symbol, candle.timestamp)
@@ -460,11 +822,14 @@ class MultiTimeframeController:
                 print(f"[ORDER-SKIP] Entry für {entry_key} bereits verarbeitet.")
                 return
 
+            if self._order_in_flight:
+                print(f"[ORDER-SKIP] Order für {self.symbol} ist noch beim Executor unterwegs.")
+                return
+
             # Keine offene Position, keine offene Order
-            open_pos = self.data.mt5.positions_get(symbol=self.symbol) or []
-            open_ord = self.data.mt5.orders_get(symbol=self.symbol) or []
-            active = any(p.magic == 234000 for p in open_pos) or any(o.magic == 234000 for o in open_ord)
-            if active:
+            open_pos, open_ord = trades
+            self.portfolio.sync(self.symbol, open_pos, open_ord)
+            if open_pos or open_ord:
                 print(f"[ORDER-SKIP] Bereits Order/Position für {self.symbol} offen.")
                 return
 
@@ -474,8 +839,14 @@ class MultiTimeframeController:
             stop_level  = getattr(symbol_info, 'trade_stops_level', 0)
             ask         = tick_data.ask
             bid         = tick_data.bid
+            self.spreads.on_tick(bid, ask)
+            if self.spreads.is_spike():
+                print(f"[ORDER-SKIP] Spread-Spike {self.symbol}: {self.spreads}")
+                return
 
             entry = None
+            if latency.enabled:
+                t0 = time.monotonic_ns()
             if self.entered_direction == 'bull' and phase == Phase.BASE_SWITCH_BULL:
                 if (
                     self.phases[K] in (Phase.BASE_BULL, Phase.BASE_SWITCH_BULL)
@@ -495,21 +866,20 @@ class MultiTimeframeController:
                 else:
                     print(f"[BLOCK] Sell-Stop NICHT erlaubt: K={self.phases[K]}, B={self.phases[B]}, dir={get_direction(self.phases[K])}")
 
+            if latency.enabled:
+                latency.since(self.symbol, E, "entry_check", t0)
             if entry:
-                self._open_new_trade(entry)
+                self._open_new_trade(entry, trades)
 
 
 
         # --- Cleanup nach Trade-Close für alle nicht mehr aktiven Tickets ---
-        aktive_tickets = set(
-            p.ticket for p in self.data.mt5.positions_get(symbol=self.symbol) or []
-            if p.magic == 234000
-        )
+        aktive_tickets = self._active_tickets()
         for ticket in list(self.entry_timestamps.keys()):
             if ticket not in aktive_tickets:
                 self.entry_timestamps.pop(ticket, None)
                 self.break_even_applied.pop(ticket, None)
-                self.risk_mgr.trailing_levels.pop(ticket, None)
+                self.risk_mgr.drop_ticket(ticket)
 
         # _pending_to_position konsistent säubern (nur falls vorhanden)
         if hasattr(self.data, "_pending_to_position") and self.symbol in self.data._pending_to_position:
@@ -525,10 +895,7 @@ class MultiTimeframeController:
                     
     def _sync_ticket_state_with_mt5(self):
         """Synchronisiere State-Flags mit echten offenen Tickets."""
-        aktive_tickets = set(
-            p.ticket for p in self.data.mt5.positions_get(symbol=self.symbol) or []
-            if p.magic == 234000
-        )
+        aktive_tickets = self._active_tickets()
         # BreakEven/Trailing: Fehlt → anlegen, nicht mehr offen → löschen
         for p in aktive_tickets:
             if p not in self.break_even_applied:
@@ -538,59 +905,109 @@ class MultiTimeframeController:
         for t in list(self.break_even_applied.keys()):
             if t not in aktive_tickets:
                 self.break_even_applied.pop(t, None)
-        for t in list(self.risk_mgr.trailing_levels.keys()):
+        for t in list(self.risk_mgr.trailing_levels.keys()) + list(self.risk_mgr.stop_managers.keys()):
             if t not in aktive_tickets:
-                self.risk_mgr.trailing_levels.pop(t, None)
+                self.risk_mgr.drop_ticket(t)
         for t in list(self.entry_timestamps.keys()):
             if t not in aktive_tickets:
                 self.entry_timestamps.pop(t, None)
 
 
-    def _open_new_trade(self, entry: Dict[str, float]) -> None:
+    def _open_new_trade(self, entry: Dict[str, float], trades: Optional[Tuple[list, list]] = None) -> None:
         # DEDUPLICATION: Keine Order/Position mehrfach
-        open_orders = self.data.mt5.orders_get(symbol=self.symbol) or []
-        if any(getattr(o, "magic", None) == 234000 for o in open_orders):
+        open_positions, open_orders = trades if trades is not None else self._bot_trades()
+        if open_orders:
             print("[ORDER-BLOCKED] Bereits Pending-Order vorhanden – keine neue Order platzieren.")
             return
-        open_positions = self.data.mt5.positions_get(symbol=self.symbol) or []
-        if any(getattr(p, "magic", None) == 234000 for p in open_positions):
+        if open_positions:
             print("[ORDER-BLOCKED] Bereits Position vorhanden – keine neue Order platzieren.")
             return
 
         symbol_info = self.data.mt5.symbol_info(self.symbol)
         tick = symbol_info.point
 
-        entry_price = math.floor(entry['entry_price'] / tick) * tick
-        stop_loss   = math.floor(entry['stop_loss']   / tick) * tick
+        # Entry-Logik liefert bereits Tick-Preise; floor_price ohne Float-Drift (kein Tick-Verlust)
+        entry_price = floor_price(entry['entry_price'], tick)
+        stop_loss   = floor_price(entry['stop_loss'], tick)
 
         self.side = entry['side']
         self.entry_price = entry_price
         entry_ts = self.data.histories[self.symbol][E][-1].timestamp
         self.initial_stop = stop_loss
 
+        if latency.enabled:
+            t0 = time.monotonic_ns()
         size = self.risk_mgr.calculate_position_size(
             self.symbol, entry_price, stop_loss, self.side
         )
+        if latency.enabled:
+            latency.since(self.symbol, E, "position_size", t0)
+
+        allowed, reason = self.portfolio.allows(self.symbol, self.side, size, entry_price, stop_loss)
+        if not allowed:
+            print(f"[ORDER-BLOCKED] Portfolio-Limit ({self.symbol} {self.side} {size}): {reason}")
+            return
 
         print(f"[DEBUG] _open_new_trade: side={self.side}, entry_price={entry_price}, stop_loss={stop_loss}, size={size}, tick={tick}")
 
-        res = self.data.place_order(
+        self._order_in_flight = True
+        if latency.enabled:
+            latency.since_detected(self.symbol, E, entry_ts, "detect_to_submit")
+            submitted_ns = time.monotonic_ns()
+        else:
+            submitted_ns = None
+        self.data.place_order_async(
             symbol=self.symbol,
             side=self.side,
             price=entry_price,
             size=size,
-            stop_loss=stop_loss
+            stop_loss=stop_loss,
+            key=(self.symbol, 'place', entry_ts),
+            tag=str(entry_ts),
+            on_done=lambda res: self._on_order_placed(res, entry_price, stop_loss, entry_ts, tick, size, submitted_ns)
         )
 
-        if res and getattr(res, "retcode", None) == mt5.TRADE_RETCODE_DONE:
+    def _on_order_placed(self, res, entry_price: float, stop_loss: float, entry_ts, tick: float, size: float, submitted_ns=None) -> None:
+        """Callback des Order-Executors nach place_order."""
+        if submitted_ns is not None:
+            latency.since(self.symbol, E, "order_roundtrip", submitted_ns)
+        with self._lock:
+            self._order_in_flight = False
+            if not (res and getattr(res, "retcode", None) == mt5.TRADE_RETCODE_DONE):
+                print(f"[ERROR] place_order fehlgeschlagen: retcode={getattr(res,'retcode',None)}")
+                return
             self.open_ticket = res.order
             self.current_sl = stop_loss
             self.entry_timestamps[self.open_ticket] = entry_ts
+            # Exposure bis zum Fill reservieren (Position behält das Order-Ticket)
+            self.portfolio.open(self.open_ticket, self.symbol, self.side, size, entry_price, stop_loss, pending=True)
             rr_pips = abs(entry_price - stop_loss) / tick
             print(f"[INFO] Trade eröffnet (Ticket={self.open_ticket}): 1RR = {rr_pips:.1f} Pips")
-            self.data.modify_order(
+            self.data.modify_order_async(
                 symbol=self.symbol, ticket=self.open_ticket, new_sl=stop_loss
             )
+            self._publish_snapshot()
+
+    def _on_order_cancelled(self, ticket: int, res) -> None:
+        if res and getattr(res, "retcode", None) == mt5.TRADE_RETCODE_DONE:
+            self.portfolio.close(ticket)
+
+    def _on_break_even_done(self, ticket: int, new_sl: Optional[float]) -> None:
+        if new_sl is None:
+            return
+        with self._lock:
+            self.current_sl = new_sl
+            self.break_even_applied[ticket] = True
+            print(f"[BE] Break-Even aktiviert: new_sl={new_sl} for Ticket={ticket}")
+            self._publish_snapshot()
+
+    def _on_trailing_done(self, ticket: int, new_sl: Optional[float]) -> None:
+        if new_sl is None:
+            return
+        with self._lock:
+            self.current_sl = new_sl
+            print(f"[TR] Trailing Stop applied: new_sl={new_sl} for Ticket={ticket}")
+            self._publish_snapshot()
 
 
 
@@ -648,114 +1065,99 @@ class MultiTimeframeController:
 
 
     def _has_active_trade(self) -> bool:
-        open_pos = [
-            p for p in self.data.mt5.positions_get(symbol=self.symbol) or []
-            if p.magic == 234000
-        ]
-        open_ord = [
-            o for o in self.data.mt5.orders_get(symbol=self.symbol) or []
-            if o.magic == 234000
-        ]
-        return bool(open_pos or open_ord)
+        positions, orders = self._bot_trades()
+        return bool(positions or orders)
 
 
     
     
 
-    def print_summary(self) -> None:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{now}] {self.symbol} summary:")
-        for tf in TIMEFRAMES:
-            lbl = {K: '1h', B: '15m', E: '1m'}[tf]
-            phase = self.phases.get(tf)
-            line = f"  {lbl}: {phase.name if phase else 'N/A'}"
-            history = self.data.histories[self.symbol].get(tf)
-            if history and len(history) >= 20:
-                last_candle = history[-1]
-                ema_10 = getattr(last_candle, "ema10", None)
-                ema_20 = getattr(last_candle, "ema20", None)
-                if ema_10 is not None and ema_20 is not None:
-                    line += f" | last_candle: {last_candle.timestamp} | EMA10={ema_10:.5f} EMA20={ema_20:.5f}"
-                else:
-                    line += " | EMA10/20: n/a"
-            else:
-                line += " | EMA10/20: n/a"
+    def _publish_snapshot(self) -> None:
+        """
+        Baut einen unveränderlichen Snapshot des Controllers (im Verarbeitungs-Thread,
+        unter self._lock). Leser (Summary, Dashboard) greifen nur auf self.snapshot zu –
+        die Zuweisung der Referenz ist atomar, es gibt keine Sperre auf der Leseseite.
+        Kerzenwerte (Punkte, Epoch-Sekunden) werden hier für die Anzeige in Preise/datetimes umgerechnet.
+        """
+        point = self.tick_size
 
-            # Hier nach der Schleife
-            print(f"  entered_direction: {self.entered_direction}")
+        def price(points):
+            return None if points is None else to_price(points, point)
 
-            ctx = self.machines[tf].state
+        def ema(points):
+            return None if points is None else points * point
 
-            # Bestätigung nur ausgeben, wenn valid == True
+        tfs = []
+        for tf in TIMEFRAMES:
+            phase = self.phases.get(tf)
+            history = self.data.histories.get(self.symbol, {}).get(tf)
+            last = history[-1] if history else None
+            ctx = self.machines[tf].state
+            confirmation = extremes = None
             if phase in (Phase.SWITCH_BULL, Phase.BASE_SWITCH_BULL, Phase.BASE_BULL):
                 conf = ctx.last_confirmation_bullish
                 if conf and conf.valid and conf.candle:
-                    c = conf.candle
-                    line += f" | conf_bullish: {c.timestamp}, o={c.open}, h={c.high}, l={c.low}, c={c.close}"
-                # Ausgabe der Kontextwerte für SWITCH_BULL
+                    confirmation = ('bull', from_epoch(conf.candle.timestamp), price(conf.candle.close))
                 if phase == Phase.SWITCH_BULL:
-                    line += f" | initial_low={ctx.switch_bull_initial_low}, prev_higher_high={ctx.switch_bull_prev_higher_high}"
-
-            if phase in (Phase.SWITCH_BEAR, Phase.BASE_SWITCH_BEAR, Phase.BASE_BEAR):
+                    extremes = (price(ctx.switch_bull_initial_low), price(ctx.switch_bull_prev_higher_high))
+            elif phase in (Phase.SWITCH_BEAR, Phase.BASE_SWITCH_BEAR, Phase.BASE_BEAR):
                 conf = ctx.last_confirmation_bearish
                 if conf and conf.valid and conf.candle:
-                    c = conf.candle
-                    line += f" | conf_bearish: {c.timestamp}, o={c.open}, h={c.high}, l={c.low}, c={c.close}"
-                # Ausgabe der Kontextwerte für SWITCH_BEAR
+                    confirmation = ('bear', from_epoch(conf.candle.timestamp), price(conf.candle.close))
                 if phase == Phase.SWITCH_BEAR:
-                    line += f" | initial_high={ctx.switch_bear_initial_high}, prev_lower_low={ctx.switch_bear_prev_lower_low}"
-
-
+                    extremes = (price(ctx.switch_bear_initial_high), price(ctx.switch_bear_prev_lower_low))
+            tfs.append(TFSnapshot(
+                tf=tf,
+                label={K: '1h', B: '15m', E: '1m'}[tf],
+                phase=phase.name if phase else None,
+                last_ts=from_epoch(last.timestamp) if last else None,
+                ema10=ema(getattr(last, 'ema10', None)),
+                ema20=ema(getattr(last, 'ema20', None)),
+                confirmation=confirmation,
+                extremes=extremes,
+            ))
+        self.snapshot = ControllerSnapshot(
+            symbol=self.symbol,
+            taken_at=datetime.now(),
+            active_tf=self.active_tf,
+            entered_direction=self.entered_direction,
+            tfs=tuple(tfs),
+            open_ticket=self.open_ticket,
+            side=self.side,
+            entry_price=self.entry_price,
+            initial_stop=self.initial_stop,
+            current_sl=self.current_sl,
+        )
 
+    def print_summary(self) -> None:
+        """Gibt den letzten Snapshot aus – ohne Broker-Aufrufe und ohne den Controller zu verändern."""
+        snap = self.snapshot
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if snap is None:
+            print(f"[{now}] {self.symbol} summary: noch nicht initialisiert")
+            return
+        print(f"[{now}] {snap.symbol} summary:")
+        print(f"  entered_direction: {snap.entered_direction}")
+        for t in snap.tfs:
+            line = f"  {t.label}: {t.phase or 'N/A'}"
+            if t.ema10 is not None and t.ema20 is not None:
+                line += f" | last_candle: {t.last_ts} | EMA10={t.ema10:.5f} EMA20={t.ema20:.5f}"
+            else:
+                line += " | EMA10/20: n/a"
+            if t.confirmation:
+                direction, ts, close = t.confirmation
+                line += f" | conf_{direction}ish: {ts}, c={close}"
+            if t.extremes:
+                line += f" | extremes={t.extremes[0]}/{t.extremes[1]}"
             # Order/Position Info auf E
-            if tf == E and self.open_ticket is not None:
-                has_order = any(
-                    o.ticket == self.open_ticket
-                    for o in self.data.mt5.orders_get(symbol=self.symbol) or []
-                    if o.magic == 234000
-                )
-                has_pos = any(
-                    p.ticket == self.open_ticket
-                    for p in self.data.mt5.positions_get(symbol=self.symbol) or []
-                    if p.magic == 234000
-                )
-                if has_order or has_pos:
-                    rr = (abs(self.entry_price - self.initial_stop) if self.entry_price and self.initial_stop else None)
-                    line += f" | entry={self.entry_price:.5f}, sl={self.initial_stop:.5f}"
-                    if rr is not None:
-                        line += f", 1RR={rr:.5f}"
-                else:
-                    self.open_ticket = None
-                    self.entry_price = None
-                    self.initial_stop = None
-                    self.current_sl = None
-                    self.side = None
-
+            if t.tf == E and snap.open_ticket is not None and snap.entry_price and snap.initial_stop:
+                rr = abs(snap.entry_price - snap.initial_stop)
+                line += f" | entry={snap.entry_price:.5f}, sl={snap.initial_stop:.5f}, 1RR={rr:.5f}"
             # Farb-/Fettlogik
-            if tf == self.active_tf:
-                if tf == B:
-                    color = "\033[1m\033[34m"
-                elif tf == K:
-                    color = "\033[1m\033[33m"
-                elif tf == E:
-                    color = "\033[1m\033[32m"
-                else:
-                    color = ""
+            if t.tf == snap.active_tf:
+                color = {B: "\033[1m\033[34m", K: "\033[1m\033[33m", E: "\033[1m\033[32m"}.get(t.tf, "")
                 line = f"{color}{line}\033[0m"
             print(line)
-        
-        # NEU: Ausgabe der letzten 10 Kerzen für E mit EMA10/20
-        #b_history = self.data.histories[self.symbol].get(B, [])
-        #print(f"\n[{now}] Letzte 10 Kerzen für TF=E (1m) mit EMA10 und EMA20:")
-        #for c in b_history[-10:]:
-            #ema10 = getattr(c, "ema10", None)
-            #ema20 = getattr(c, "ema20", None)
-            #print(f"  {c.timestamp} | O={c.open:.5f} H={c.high:.5f} L={c.low:.5f} C={c.close:.5f} | EMA10={ema10 if ema10 is not None else 'n/a'} EMA20={ema20 if ema20 is not None else 'n/a'}")
-
-
-
-
-
 
     def stop(self) -> None:
         self.data.stop()
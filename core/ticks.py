@@ -0,0 +1,118 @@
+# core/ticks.py
+"""
+Tickstrom für den Tick-Modus des DataHandlers.
+Pro Symbol ein Cursor auf die zuletzt gesehene Tick-Zeit (time_msc): copy_ticks_from
+liefert bei jedem Poll nur die neuen Ticks, fehlt die Tick-Historie beim Broker,
+dient symbol_info_tick als Fallback. Daraus wird die laufende M1-Kerze inkrementell
+fortgeschrieben (Bid-basiert wie die MT5-Kerzen, in Punkten wie core/types.Candle). Die abgeschlossenen Kerzen für die
+FSMs kommen weiterhin vom Broker (poll_closed_bar); die laufende Kerze dient nur
+den Intra-Bar-Hooks (Stopmanagement).
+"""
+from typing import List, Optional, Tuple
+from core.types import Candle, Tick
+from core.prices import to_points
+from config.runtime import TICK_BATCH
+
+
+class FormingBar:
+    """Laufende Kerze der Länge period (Sekunden) aus Ticks, OHLC in Punkten."""
+    __slots__ = ("period", "point", "start", "open", "high", "low", "close", "ticks")
+
+    def __init__(self, point: float, period: int = 60):
+        self.period = period
+        self.point = point
+        self.start: Optional[int] = None  # Öffnungszeit (Epoch-Sekunden)
+        self.open = self.high = self.low = self.close = None
+        self.ticks = 0
+
+    def on_tick(self, tick: Tick) -> bool:
+        """Schreibt die Kerze fort; True, wenn mit diesem Tick eine neue Kerze beginnt."""
+        start = tick.time_msc // 1000 // self.period * self.period
+        price = to_points(tick.bid, self.point)
+        if self.start is None or start > self.start:
+            rolled = self.start is not None
+            self.start = start
+            self.open = self.high = self.low = self.close = price
+            self.ticks = 1
+            return rolled
+        if start < self.start:
+            return False  # verspäteter Tick einer bereits abgeschlossenen Kerze
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.ticks += 1
+        return False
+
+    def candle(self) -> Optional[Candle]:
+        """Momentaufnahme der laufenden Kerze (eigenes Objekt, darf weitergereicht werden)."""
+        if self.start is None:
+            return None
+        return Candle(
+            timestamp=self.start,
+            open=self.open,
+            high=self.high,
+            low=self.low,
+            close=self.close,
+            volume=self.ticks
+        )
+
+
+class TickStream:
+    def __init__(self, mt5_module, symbol: str, point: float, batch: int = TICK_BATCH):
+        self.mt5 = mt5_module
+        self.symbol = symbol
+        self.batch = batch
+        self.bar = FormingBar(point)
+        self.last_tick: Optional[Tick] = None
+        self._last_msc: Optional[int] = None
+        self._seen_at_last = 0  # Ticks mit time_msc == _last_msc, die schon geliefert wurden
+
+    def poll(self) -> Tuple[List[Tick], bool]:
+        """Neue Ticks seit dem letzten Aufruf; zweiter Wert: laufende Kerze hat gewechselt."""
+        if self._last_msc is None:
+            # Erster Aufruf: ab dem aktuellen Kurs starten, keine Tick-Historie nachladen
+            ticks = self._from_quote()
+        else:
+            rates = self.mt5.copy_ticks_from(self.symbol, self._last_msc // 1000, self.batch, self.mt5.COPY_TICKS_INFO)
+            ticks = self._from_quote() if rates is None else self._new_ticks(rates)
+        rolled = False
+        for tick in ticks:
+            rolled = self.bar.on_tick(tick) or rolled
+        if ticks:
+            self.last_tick = ticks[-1]
+        return ticks, rolled
+
+    def _new_ticks(self, rates) -> List[Tick]:
+        out: List[Tick] = []
+        skip = self._seen_at_last
+        for r in rates:
+            msc = int(r['time_msc'])
+            if msc < self._last_msc:
+                continue
+            if msc == self._last_msc and skip > 0:
+                skip -= 1
+                continue
+            out.append(Tick(msc, float(r['bid']), float(r['ask']), float(r['volume'])))
+        self._advance(out)
+        return out
+
+    def _from_quote(self) -> List[Tick]:
+        q = self.mt5.symbol_info_tick(self.symbol)
+        if q is None:
+            return []
+        msc = int(getattr(q, 'time_msc', 0) or q.time * 1000)
+        if self._last_msc is not None and msc <= self._last_msc:
+            return []
+        out = [Tick(msc, q.bid, q.ask, float(getattr(q, 'volume', 0) or 0))]
+        self._advance(out)
+        return out
+
+    def _advance(self, ticks: List[Tick]) -> None:
+        if not ticks:
+            return
+        last = ticks[-1].time_msc
+        same = sum(1 for t in ticks if t.time_msc == last)
+        self._seen_at_last = self._seen_at_last + same if last == self._last_msc else same
+        self._last_msc = last
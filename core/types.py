@@ -7,19 +7,64 @@ from dataclasses import dataclass, field
 
 # --------------------------------------------
 # Candle‑Definition
+# Zeit in Epoch-Sekunden (Öffnungszeit, UTC), OHLC in Punkten (Vielfache von
+# symbol_info.point); Umrechnung nur an der Broker-Grenze (core/prices.py).
 # --------------------------------------------
 @dataclass
 class Candle:
-    timestamp: datetime
-    open: float
-    high: float
-    low: float
-    close: float
+    timestamp: int
+    open: int
+    high: int
+    low: int
+    close: int
     volume: float
-    ema10: Optional[float] = None
+    ema10: Optional[float] = None  # Punkte (nicht ganzzahlig)
     ema20: Optional[float] = None
 
 
+# --------------------------------------------
+# Tick (Tick-Modus, siehe core/ticks.py)
+# --------------------------------------------
+@dataclass(frozen=True)
+class Tick:
+    time_msc: int  # Epoch-Millisekunden (Serverzeit)
+    bid: float
+    ask: float
+    volume: float = 0.0
+
+
+
+# --------------------------------------------
+# Snapshots für Monitoring (unveränderlich, ohne Broker-Bezug)
+# --------------------------------------------
+@dataclass(frozen=True)
+class TFSnapshot:
+    tf: int
+    label: str
+    phase: Optional[str]
+    last_ts: Optional[datetime]
+    # EMAs und Bestätigungs-close als Preise (für Anzeige umgerechnet)
+    ema10: Optional[float]
+    ema20: Optional[float]
+    # (Richtung, Zeitstempel, close) der letzten gültigen Bestätigung passend zur Phase
+    confirmation: Optional[tuple] = None
+    # (initial_extreme, previous_extreme) in SWITCH-Phasen
+    extremes: Optional[tuple] = None
+
+
+@dataclass(frozen=True)
+class ControllerSnapshot:
+    symbol: str
+    taken_at: datetime
+    active_tf: Optional[int]
+    entered_direction: Optional[str]
+    tfs: tuple  # TFSnapshot je TF in der Reihenfolge K, B, E
+    open_ticket: Optional[int] = None
+    side: Optional[str] = None
+    entry_price: Optional[float] = None
+    initial_stop: Optional[float] = None
+    current_sl: Optional[float] = None
+
 
 # --------------------------------------------
 # Phase‑Enum
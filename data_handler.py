@@ -1,14 +1,48 @@
 import time
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 import MetaTrader5 as mt5
-import math
-from typing import Dict, List, Callable, Optional
+from concurrent.futures import Future
+from typing import Dict, List, Callable, Hashable, Optional
 from types import SimpleNamespace
-from core.types import Candle
-from config.timeframes import get_history_limit
+from core.types import Candle, Tick
+from config.timeframes import get_history_limit, get_tf_seconds
+from config.runtime import (
+    POLL_INTERVAL, DISPATCH_MODE, INBOX_MAXSIZE, INBOX_OVERFLOW, TICK_MODE, TICK_POLL_INTERVAL,
+    POSITION_MONITOR_INTERVAL, SESSION_POLLING, SESSION_HEARTBEAT_INTERVAL, SESSION_WARMUP
+)
+from core.dispatch import SymbolWorker
+from core.order_executor import OrderExecutor
+from core.history import HistoryCoordinator
+from core.fx_rates import CurrencyConverter
+from core.portfolio import PortfolioRisk
+from core.spread import SpreadBook
+from core.ticks import TickStream
+from core.events import Event, EventBus, BarClosed, TickUpdate
+from core.position_monitor import PositionMonitor
+from core.sessions import calendar as sessions
+from core.checkpoint import writer as checkpoints
+from core.prices import from_epoch, to_points, to_price, floor_price
+from core.latency import recorder as latency
+from core.metrics import metrics
 import pytz
 import numpy as np
 
+MAGIC = 234000
+ORDER_COMMENT = "EMA Edge Bot"
+
+def _candle(r, point: float) -> Candle:
+    """Kerze aus einer MT5-Rates-Zeile (Broker-Grenze: Preise → Punkte, Zeit bleibt Epoch-Sekunden)."""
+    return Candle(
+        timestamp=int(r['time']),
+        open=to_points(r['open'], point),
+        high=to_points(r['high'], point),
+        low=to_points(r['low'], point),
+        close=to_points(r['close'], point),
+        volume=(int(r['tick_volume']) if 'tick_volume' in r.dtype.names else 0)
+    )
+
+
 def calc_ema(values, span):
     if len(values) < span:
         return None
@@ -26,27 +60,53 @@ class DataHandler:
     def __init__(self, mt5_module):
         self.mt5 = mt5_module
         self.histories: Dict[str, Dict[int, List[Candle]]] = {}
-        self.subscribers: Dict[str, Dict[int, List[Callable]]] = {}
+        # Gepollte Serien pro Symbol; Empfänger hängen am Event-Bus
+        self.series: Dict[str, List[int]] = {}
+        self.bus = EventBus()
+        self._adapters: Dict[tuple, Callable] = {}
         self._running = False
         self.open_ticket: Optional[int] = None
         self._pending_to_position: Dict[str, Dict[int, int]] = {}
-        self.last_history_ts: Dict[str, Dict[int, Optional[datetime]]] = {}
+        self._last_times: Dict[str, Dict[int, int]] = {}  # Epoch-Sekunden
+        self.points: Dict[str, float] = {}  # symbol_info.point je Symbol (Kerzen in Punkten)
+        self.dispatch_mode = DISPATCH_MODE
+        self.workers: Dict[str, SymbolWorker] = {}
+        self.executor = OrderExecutor(mt5_module)
+        self.history = HistoryCoordinator(self.fetch_history, self.histories)
+        # Umrechnungskurse für die Positionsgröße, gespeist aus den M1-Closes
+        self.fx = CurrencyConverter(mt5_module)
+        # Gemeinsames Exposure/Risiko aller Symbole für Pre-Trade-Checks
+        self.portfolio = PortfolioRisk(self.fx)
+        # Laufende Spread-Statistik pro Symbol (Spread-Feld der M1-Kerzen + Ticks der Controller)
+        self.spreads = SpreadBook()
+        # Tick-Modus: Tickstrom + laufende M1-Kerze pro Symbol, Intra-Bar-Hooks
+        self.tick_mode = TICK_MODE
+        self.tick_streams: Dict[str, TickStream] = {}
+        # Order-/Positions-Events (OrderFilled, SLModified, PositionClosed) per Snapshot-Diff
+        self.monitor_interval = POSITION_MONITOR_INTERVAL
+        self.monitor = PositionMonitor(mt5_module, self.publish) if POSITION_MONITOR_INTERVAL > 0 else None
+        # Außerhalb der Handelsfenster nur Heartbeat-Polling (siehe idle_interval)
+        self.calendar = sessions
+        self.session_polling = SESSION_POLLING
+        self._wake = threading.Event()
+
+    def point(self, symbol: str) -> float:
+        """Punktgröße eines Symbols (einmal vom Broker, danach gecacht)."""
+        point = self.points.get(symbol)
+        if point is None:
+            info = self.mt5.symbol_info(symbol)
+            if info is None:
+                raise RuntimeError(f"symbol_info({symbol}) konnte nicht abgerufen werden")
+            point = self.points[symbol] = info.point
+        return point
 
     def fetch_history(self, symbol: str, timeframe: int, limit: int) -> List[Candle]:
-        rates = self.mt5.copy_rates_from_pos(symbol, timeframe, 0, limit)
+        """Lädt die letzten `limit` abgeschlossenen Kerzen (ohne die laufende) inkl. EMAs."""
+        rates = self.mt5.copy_rates_from_pos(symbol, timeframe, 1, limit)
+        point = self.point(symbol)
         candles = []
-        for r in rates:
-            ts_utc = datetime.fromtimestamp(r['time'], tz=pytz.UTC).replace(tzinfo=None)
-            candles.append(Candle(
-                timestamp=ts_utc,
-                open=r['open'],
-                high=r['high'],
-                low=r['low'],
-                close=r['close'],
-                volume=(r['tick_volume'] if 'tick_volume' in r.dtype.names else 0)
-            ))
-        self.histories.setdefault(symbol, {})[timeframe] = candles.copy()
-        self.last_history_ts.setdefault(symbol, {})[timeframe] = candles[-1].timestamp if candles else None
+        for r in rates if rates is not None else []:
+            candles.append(_candle(r, point))
         # EMAs berechnen
         for i, c in enumerate(candles):
             closes10 = [x.close for x in candles[max(0, i-9):i+1]]
@@ -55,27 +115,17 @@ class DataHandler:
             c.ema20 = calc_ema(closes20, 20) if len(closes20) == 20 else None
         return candles
 
-    def refresh_history(self, symbol, tf):
-        hist = self.fetch_history(symbol, tf, get_history_limit(tf))
-        self.histories[symbol][tf] = hist[:-1]  # Bis vorletzte Kerze
+    def load_history(self, symbol: str, tf: int) -> List[Candle]:
+        """History einer Serie (abgeschlossene Kerzen); vom Broker nur beim ersten Zugriff."""
+        return self.history.ensure(symbol, tf, get_history_limit(tf))
 
     def append_and_get(self, symbol: str, timeframe: int, candle: Candle) -> List[Candle]:
-        if candle.timestamp.tzinfo is not None:
-            candle_ts = candle.timestamp.astimezone(pytz.UTC).replace(tzinfo=None)
-        else:
-            candle_ts = candle.timestamp
+        candle_ts = candle.timestamp
 
-        if timeframe not in self.histories.get(symbol, {}):
-            limit = get_history_limit(timeframe)
-            self.fetch_history(symbol, timeframe, limit)
+        buf = self.load_history(symbol, timeframe)
 
-        buf = self.histories[symbol][timeframe]
-        last_hist_ts = self.last_history_ts.get(symbol, {}).get(timeframe)
-
-        # Keine Duplikate (History-Reload)
-        if last_hist_ts and candle_ts == last_hist_ts:
-            print(f"[PATCH] Candle {candle_ts} wurde schon aus History geladen, wird NICHT erneut angehängt.")
-            self.last_history_ts[symbol][timeframe] = None
+        # Keine Duplikate: die History enthält nur abgeschlossene Kerzen bis zum Ladezeitpunkt
+        if buf and candle_ts <= buf[-1].timestamp:
             return buf
 
         # Neues Candle
@@ -90,7 +140,6 @@ class DataHandler:
         buf.append(new_candle)
         limit = get_history_limit(timeframe)
         self.histories[symbol][timeframe] = buf[-limit:]
-        self.last_history_ts[symbol][timeframe] = candle_ts
         # EMAs für das neue Candle
         buf = self.histories[symbol][timeframe]
         if len(buf) >= 10:
@@ -103,18 +152,35 @@ class DataHandler:
             buf[-1].ema20 = None
         return self.histories[symbol][timeframe]
 
-    def subscribe(self, symbol: str, timeframe: int, callback: Callable):
+    def watch(self, symbol: str, timeframe: int) -> None:
+        """Nimmt eine Serie ins Polling auf (Historie wird dabei einmal geladen)."""
         if timeframe not in self.TIMEFRAME_MAP:
             raise RuntimeError(f"Unsupported timeframe: {timeframe}")
-        subs = self.subscribers.setdefault(symbol, {})
-        if timeframe not in subs:
-            self.fetch_history(symbol, timeframe, get_history_limit(timeframe))
-            subs[timeframe] = []
-        if callback not in subs[timeframe]:
-            subs[timeframe].append(callback)
-            print(f"[DEBUG] Subscriber registriert: Symbol={symbol}, TF={timeframe}, CB={callback}")
-        else:
-            print(f"[DEBUG] Subscriber bereits vorhanden: Symbol={symbol}, TF={timeframe}, CB={callback}")
+        tfs = self.series.setdefault(symbol, [])
+        if timeframe not in tfs:
+            self.load_history(symbol, timeframe)
+            tfs.append(timeframe)
+
+    def watch_ticks(self, symbol: str) -> None:
+        """Tickstrom eines Symbols aktivieren (wird nur im Tick-Modus gepollt)."""
+        if symbol not in self.tick_streams:
+            self.tick_streams[symbol] = TickStream(self.mt5, symbol, self.point(symbol))
+
+    def subscribe(self, symbol: str, timeframe: int, callback: Callable, priority: int = 0):
+        """Kurzform: Serie pollen und callback(candle) für jede abgeschlossene Kerze aufrufen."""
+        self.watch(symbol, timeframe)
+        key = (BarClosed, symbol, timeframe, callback)
+        adapter = self._adapters.setdefault(key, lambda event: callback(event.candle))
+        print(f"[DEBUG] Subscriber registriert: Symbol={symbol}, TF={timeframe}, CB={callback}")
+        return self.bus.subscribe(BarClosed, adapter, symbol=symbol, tf=timeframe, priority=priority)
+
+    def subscribe_ticks(self, symbol: str, callback: Callable, priority: int = 0):
+        """Kurzform für Intra-Bar-Hooks (nur im Tick-Modus): callback(tick, forming_bar) je Poll."""
+        self.watch_ticks(symbol)
+        key = (TickUpdate, symbol, None, callback)
+        adapter = self._adapters.setdefault(key, lambda event: callback(event.tick, event.bar))
+        print(f"[DEBUG] Tick-Subscriber registriert: Symbol={symbol}, CB={callback}")
+        return self.bus.subscribe(TickUpdate, adapter, symbol=symbol, priority=priority)
 
     def get_symbol_info(self, symbol: str) -> SimpleNamespace:
         info = self.mt5.symbol_info(symbol)
@@ -137,6 +203,58 @@ class DataHandler:
         size: float,
         stop_loss: float
     ):
+        """Synchrone Variante (wartet auf den Executor) – nur außerhalb der Strategie-Threads verwenden."""
+        return self.place_order_async(symbol, side, price, size, stop_loss).result()
+
+    def place_order_async(
+        self,
+        symbol: str,
+        side: str,
+        price: float,
+        size: float,
+        stop_loss: float,
+        key: Optional[Hashable] = None,
+        on_done: Optional[Callable] = None,
+        tag: Optional[str] = None
+    ) -> Future:
+        """
+        Pending-Order über den OrderExecutor platzieren; der Request wird im Executor gebaut.
+        tag macht den Order-Kommentar eindeutig: nach Timeout/Verbindungsfehler wird nur neu
+        gesendet, wenn keine Order/Position mit diesem Kommentar existiert. Ohne tag keine
+        Wiederholung bei unbekanntem Ausgang.
+        """
+        key = key if key is not None else (symbol, 'place', side, price)
+        comment = f"{ORDER_COMMENT} {tag}" if tag else ORDER_COMMENT
+        return self.executor.submit(
+            key,
+            build=lambda: self._build_place_request(symbol, side, price, size, stop_loss, comment),
+            check=False,
+            on_done=on_done,
+            idempotent=False,
+            recover=(lambda: self.find_placed_order(symbol, comment)) if tag else None
+        )
+
+    def find_placed_order(self, symbol: str, comment: str) -> Optional[SimpleNamespace]:
+        """Bereits angelegte Bot-Order (pending oder schon gefüllt) anhand des Kommentars suchen."""
+        for getter in (self.mt5.orders_get, self.mt5.positions_get):
+            for o in getter(symbol=symbol) or ():
+                if o.magic == MAGIC and o.comment == comment:
+                    return SimpleNamespace(
+                        retcode=self.mt5.TRADE_RETCODE_DONE, order=o.ticket, deal=0,
+                        volume=getattr(o, 'volume_current', getattr(o, 'volume', 0.0)),
+                        price=o.price_open, comment="Recovered"
+                    )
+        return None
+
+    def _build_place_request(
+        self,
+        symbol: str,
+        side: str,
+        price: float,
+        size: float,
+        stop_loss: float,
+        comment: str = None
+    ) -> Optional[Dict]:
         ok = self.mt5.symbol_select(symbol, True)
         print(f"[DEBUG] symbol_select('{symbol}') → {ok}")
 
@@ -153,21 +271,19 @@ class DataHandler:
         ask = getattr(tick_data, 'ask', None)
         bid = getattr(tick_data, 'bid', None)
 
-        # Preis auf Tickgröße und Mindestabstand prüfen/setzen
+        # Preis auf Tickgröße und Mindestabstand prüfen/setzen (in Punkten, Float erst im Request)
+        price_pts = to_points(price, tick)
         if side == 'buy':
             entry_type = self.mt5.ORDER_TYPE_BUY_STOP
-            price = max(price, (ask or 0) + min_dist)
-            price = round(price / tick) * tick
+            price_pts = max(price_pts, to_points(ask or 0, tick) + stop_level)
             if stop_loss is not None:
-                stop_loss = min(stop_loss, price - min_dist)
-                stop_loss = round(stop_loss / tick) * tick
+                stop_loss = to_price(min(to_points(stop_loss, tick), price_pts - stop_level), tick)
         else:
             entry_type = self.mt5.ORDER_TYPE_SELL_STOP
-            price = min(price, (bid or 0) - min_dist)
-            price = round(price / tick) * tick
+            price_pts = min(price_pts, to_points(bid or 0, tick) - stop_level)
             if stop_loss is not None:
-                stop_loss = max(stop_loss, price + min_dist)
-                stop_loss = round(stop_loss / tick) * tick
+                stop_loss = to_price(max(to_points(stop_loss, tick), price_pts + stop_level), tick)
+        price = to_price(price_pts, tick)
 
         # Mindestabstand-Fehler (MetaTrader lehnt sonst sowieso ab)
         if entry_type == self.mt5.ORDER_TYPE_BUY_STOP and ask is not None and price < ask + min_dist:
@@ -179,9 +295,7 @@ class DataHandler:
 
         # Lotgröße clampen und runden
         min_vol, max_vol, step_vol = info.volume_min, info.volume_max, info.volume_step
-        adj_size = max(min(size, max_vol), min_vol)
-        adj_size = math.floor(adj_size / step_vol) * step_vol
-        adj_size = round(adj_size, 2)
+        adj_size = floor_price(max(min(size, max_vol), min_vol), step_vol)
 
         print(f"[INFO] {symbol}: min_lot={min_vol}, max_lot={max_vol}, lot_step={step_vol}")
         print(f"[DEBUG] stop_level={stop_level}, tick={tick}, min_dist={min_dist}, digits={digits}")
@@ -203,17 +317,26 @@ class DataHandler:
             'price':        price,
             'sl':           stop_loss,
             'deviation':    10,
-            'magic':        234000,
-            'comment':      'EMA Edge Bot',
+            'magic':        MAGIC,
+            'comment':      comment or ORDER_COMMENT,
             'type_time':    self.mt5.ORDER_TIME_GTC,
             'type_filling': self.mt5.ORDER_FILLING_RETURN,
         }
-
-        res = self.mt5.order_send(req)
-        print(f"[INFO] place_order retcode={getattr(res,'retcode',None)}, ticket={getattr(res,'order',None)}")
-        return res
+        return req
 
     def cancel_order(self, ticket: int):
+        """Synchrone Variante (wartet auf den Executor)."""
+        return self.cancel_order_async(ticket).result()
+
+    def cancel_order_async(self, ticket: int, on_done: Optional[Callable] = None) -> Future:
+        return self.executor.submit(
+            ('cancel', ticket),
+            build=lambda: self._build_cancel_request(ticket),
+            check=False,
+            on_done=on_done
+        )
+
+    def _build_cancel_request(self, ticket: int) -> Optional[Dict]:
         order_list = self.mt5.orders_get(ticket=ticket)
         symbol = None
         if order_list and len(order_list) > 0:
@@ -236,9 +359,7 @@ class DataHandler:
             'type_time':    self.mt5.ORDER_TIME_GTC,
             'type_filling': self.mt5.ORDER_FILLING_RETURN,
         }
-        res = self.mt5.order_send(req)
-        print(f"[INFO] cancel_order retcode={getattr(res,'retcode',None)}, ticket={ticket}")
-        return res
+        return req
 
 
     # Go-Candle Detection (stateless helpers)
@@ -255,10 +376,37 @@ class DataHandler:
         new_sl: float,
         new_tp: float = 0.0
     ):
+        """Synchrone Variante (wartet auf den Executor)."""
+        res = self.modify_order_async(symbol, ticket, new_sl, new_tp).result()
+        return res if self.executor.is_ok(res) else None
+
+    def modify_order_async(
+        self,
+        symbol: str,
+        ticket: int,
+        new_sl: float,
+        new_tp: float = 0.0,
+        on_done: Optional[Callable] = None
+    ) -> Future:
         """
         Setzt SL/TP für eine bereits gefillte Position (nicht Pending-Order).
         Ticket kann Pending- oder Position-Ticket sein, wird intern gemappt.
+        order_check + order_send laufen im OrderExecutor.
         """
+        return self.executor.submit(
+            (symbol, 'sltp', ticket, new_sl, new_tp),
+            build=lambda: self._build_modify_request(symbol, ticket, new_sl, new_tp),
+            check=True,
+            on_done=on_done
+        )
+
+    def _build_modify_request(
+        self,
+        symbol: str,
+        ticket: int,
+        new_sl: float,
+        new_tp: float
+    ) -> Optional[Dict]:
         # 1) Symbol sicher auswählen
         if not self.mt5.symbol_select(symbol, True):
             print(f"[ERROR] Symbol {symbol} konnte nicht selektiert werden!")
@@ -301,82 +449,248 @@ class DataHandler:
             "type_filling": self.mt5.ORDER_FILLING_IOC,
         }
         print(f"[DEBUG] Modify-Request: {req}")
+        return req
 
-        # 4) order_check (MetaTrader-Validierung)
-        chk = self.mt5.order_check(req)
-        print(f"[INFO] order_check → retcode={getattr(chk,'retcode',None)}, comment={getattr(chk,'comment',None)}")
-        if not chk or chk.retcode != self.mt5.TRADE_RETCODE_DONE:
-            print(f"[ERROR] order_check fehlgeschlagen: {getattr(chk,'comment',None)}")
-            return None
 
-        # 5) order_send (SL/TP wird gesetzt)
-        res = self.mt5.order_send(req)
-        print(f"[INFO] order_send → retcode={getattr(res,'retcode',None)}, order={getattr(res,'order',None)}")
-        if not res or res.retcode != self.mt5.TRADE_RETCODE_DONE:
-            print(f"[ERROR] order_send fehlgeschlagen: {getattr(res,'comment',None)}")
+
+
+    def poll_closed_bar(self, symbol: str, tf_const: int) -> Optional[Candle]:
+        """
+        Liest die letzte abgeschlossene Kerze (rates[-2]) einer Serie.
+        Liefert None, wenn es seit dem letzten Aufruf keine neue Kerze gibt.
+        """
+        rates = self.mt5.copy_rates_from_pos(symbol, tf_const, 0, 2)
+        if rates is None or len(rates) < 2:
             return None
+        closed = rates[-2]
+        # Vergleich auf Epoch-Sekunden: ohne neue Kerze wird kein Candle gebaut
+        t = int(closed['time'])
+        last = self._last_times.setdefault(symbol, {}).get(tf_const)
+        if last is not None and t <= last:
+            return None
+        self._last_times[symbol][tf_const] = t
+        candle = _candle(closed, self.point(symbol))
+        if tf_const == self.mt5.TIMEFRAME_M1 and 'spread' in closed.dtype.names:
+            spec = self.fx.specs.get(symbol)
+            if spec is not None:
+                self.spreads.update(symbol, float(closed['spread']) * spec.point)
+        if latency.enabled:
+            # Öffnungszeit der laufenden Kerze = Close-Zeit der abgeschlossenen
+            latency.mark_detected(symbol, tf_const, candle.timestamp, close_epoch=float(rates[-1]['time']))
+        return candle
+
+    def poll_closed_bars(self, symbol: str, tf_const: int) -> List[Candle]:
+        """
+        Wie poll_closed_bar, erkennt aber Lücken: liegt die neue abgeschlossene Kerze mehr
+        als eine Periode hinter der zuletzt gesehenen (Stall, Reconnect, Standby), werden
+        die fehlenden Kerzen mit einem copy_rates_range-Aufruf nachgeladen.
+        Liefert alle neuen Kerzen in zeitlicher Reihenfolge.
+        """
+        last = self._last_times.get(symbol, {}).get(tf_const)
+        candle = self.poll_closed_bar(symbol, tf_const)
+        if candle is None:
+            return []
+        t = self._last_times[symbol][tf_const]
+        if last is None or t - last <= get_tf_seconds(tf_const):
+            return [candle]
+        return self.backfill(symbol, tf_const, last, t) + [candle]
+
+    def backfill(self, symbol: str, tf_const: int, after: int, before: int) -> List[Candle]:
+        """Abgeschlossene Kerzen mit after < time < before (Epoch-Sekunden, ein Broker-Aufruf)."""
+        period = get_tf_seconds(tf_const)
+        date_from = datetime.fromtimestamp(after + period, tz=pytz.UTC)
+        date_to = datetime.fromtimestamp(before - 1, tz=pytz.UTC)
+        rates = self.mt5.copy_rates_range(symbol, tf_const, date_from, date_to)
+        point = self.point(symbol)
+        candles = []
+        for r in rates if rates is not None else []:
+            if not after < int(r['time']) < before:
+                continue
+            candle = _candle(r, point)
+            if latency.enabled:
+                latency.mark_detected(symbol, tf_const, candle.timestamp, close_epoch=float(r['time'] + period))
+            candles.append(candle)
+        if candles:
+            print(f"[WARN] Lücke in {symbol}/{tf_const}: {len(candles)} Kerzen zwischen "
+                  f"{from_epoch(after)} und {from_epoch(before)} nachgeladen")
+            metrics.inc("bars_backfilled_total", {"symbol": symbol, "tf": tf_const}, value=len(candles),
+                        help_text="Per copy_rates_range nachgeladene Kerzen")
+        return candles
 
-        print(f"[INFO] SL/TP erfolgreich geändert für Position {position_ticket}: SL={new_sl}, TP={new_tp}")
-        return res
+    def deliver(self, symbol: str, tf_const: int, candle: Candle) -> None:
+        """Kerze in die History puffern, EMAs updaten und an alle Subscriber verteilen."""
+        if latency.enabled:
+            latency.since_detected(symbol, tf_const, candle.timestamp, "detect_to_deliver")
+            t0 = time.monotonic_ns()
+        limit = get_history_limit(tf_const)
+        buf = self.histories.setdefault(symbol, {}).setdefault(tf_const, [])
+        if buf and candle.timestamp <= buf[-1].timestamp:
+            print(f"[DEBUG] Candle {candle.timestamp} bereits in der History ({symbol}/{tf_const}) – übersprungen")
+            return
+        buf.append(candle)
+        buf[:] = buf[-limit:]
+        # EMA updaten
+        if len(buf) >= 10:
+            buf[-1].ema10 = calc_ema([c.close for c in buf[-10:]], 10)
+        else:
+            buf[-1].ema10 = None
+        if len(buf) >= 20:
+            buf[-1].ema20 = calc_ema([c.close for c in buf[-20:]], 20)
+        else:
+            buf[-1].ema20 = None
+        if tf_const == self.mt5.TIMEFRAME_M1:
+            self.fx.on_price(symbol, to_price(candle.close, self.point(symbol)))
+        if latency.enabled:
+            latency.since(symbol, tf_const, "history_ema", t0)
+        metrics.inc("bars_processed_total", {"symbol": symbol, "tf": tf_const}, help_text="Verarbeitete Kerzen")
 
+        print(f"[DEBUG] Sende Candle an Subscriber: TF={tf_const}, Symbol={symbol}, TS={candle.timestamp}")
+        self.bus.publish(BarClosed(symbol, tf_const, candle))
 
+    def poll_ticks(self, symbol: str) -> bool:
+        """
+        Liest neue Ticks eines Symbols und reicht den letzten zusammen mit der laufenden
+        M1-Kerze weiter (deren High/Low decken alle Ticks seit Kerzenbeginn ab).
+        Liefert True, wenn im Tickstrom eine neue Minute begonnen hat.
+        """
+        stream = self.tick_streams[symbol]
+        ticks, rolled = stream.poll()
+        if ticks:
+            self.dispatch_tick(symbol, ticks[-1], stream.bar.candle())
+        return rolled
+
+    def deliver_tick(self, symbol: str, tick: Tick, bar: Candle) -> None:
+        self.spreads.update(symbol, tick.ask - tick.bid)
+        self.bus.publish(TickUpdate(symbol, tick, bar))
+
+    def dispatch_tick(self, symbol: str, tick: Tick, bar: Candle) -> None:
+        """Wie dispatch(), aber für Ticks; im Worker in Reihenfolge mit den Kerzen."""
+        if self.dispatch_mode != "threaded":
+            self.deliver_tick(symbol, tick, bar)
+            return
+        self._worker(symbol).submit((None, (tick, bar)))
+
+    def publish(self, event: Event) -> None:
+        """
+        Order-/Positions-Events über den Worker des Symbols (in Reihenfolge mit dessen Kerzen);
+        sie fallen nicht unter INBOX_OVERFLOW und gehen nie verloren.
+        """
+        if self.dispatch_mode != "threaded":
+            self.bus.publish(event)
+            return
+        self._worker(event.symbol).submit_event(event)
+
+    def _deliver_item(self, symbol: str, item) -> None:
+        if isinstance(item, Event):
+            self.bus.publish(item)
+            return
+        tf_const, payload = item
+        if tf_const is None:
+            self.deliver_tick(symbol, *payload)
+        else:
+            self.deliver(symbol, tf_const, payload)
+
+    def _worker(self, symbol: str) -> SymbolWorker:
+        worker = self.workers.get(symbol)
+        if worker is None:
+            worker = SymbolWorker(
+                symbol,
+                handler=lambda item, symbol=symbol: self._deliver_item(symbol, item),
+                maxsize=INBOX_MAXSIZE,
+                overflow=INBOX_OVERFLOW
+            )
+            worker.start()
+            self.workers[symbol] = worker
+        return worker
+
+    def dispatch(self, symbol: str, tf_const: int, candle: Candle) -> None:
+        """Übergibt eine neue Kerze an den Worker des Symbols (oder direkt, im Inline-Modus)."""
+        if self.dispatch_mode != "threaded":
+            self.deliver(symbol, tf_const, candle)
+            return
+        self._worker(symbol).submit((tf_const, candle))
+
+    def idle_interval(self, now: float) -> Optional[float]:
+        """
+        Schlafdauer im Heartbeat-Modus, None = normaler Takt. Normal gepollt wird bei offenem
+        Markt, wenn ein Entry-Fenster offen ist bzw. in SESSION_WARMUP Sekunden öffnet oder
+        Bot-Trades offen sind (Stopmanagement). Sonst bis kurz vor das nächste Fenster,
+        höchstens SESSION_HEARTBEAT_INTERVAL; neue Kerzen holt dann poll_closed_bars nach.
+        """
+        if not self.session_polling:
+            return None
+        wait = self.calendar.seconds_to_open(now)
+        if self.calendar.is_open(now):
+            if wait is not None and wait <= SESSION_WARMUP:
+                return None
+            if self._has_bot_trades():
+                return None
+        if wait is None:
+            return SESSION_HEARTBEAT_INTERVAL
+        return max(POLL_INTERVAL, min(SESSION_HEARTBEAT_INTERVAL, wait - SESSION_WARMUP))
 
+    def _has_bot_trades(self) -> bool:
+        """Offene Bot-Positionen/-Orders laut Positions-Monitor (ohne Snapshot: ja)."""
+        if self.monitor is None or not self.monitor.started:
+            return True
+        return bool(self.monitor.positions or self.monitor.orders)
 
     def run(self):
         # Letzter Candle-Timestamp pro Symbol/TF merken
-        last_times = {
+        self._last_times = {
             sym: {tf: buf[-1].timestamp for tf, buf in tfs.items() if buf}
             for sym, tfs in self.histories.items()
         }
         self._running = True
+        self._wake.clear()
+        last_bar_poll: Dict[str, float] = {}
+        last_monitor_poll = 0.0
+        was_idle = False
         print("[DATAHANDLER] Starte Run-Loop... (Ctrl+C zum Stop)")
         while self._running:
-            for symbol, tfs in self.subscribers.items():
-                for tf_const, callbacks in tfs.items():
+            cycle_start = time.monotonic()
+            idle = self.idle_interval(self.calendar.clock())
+            if (idle is not None) != was_idle:
+                was_idle = idle is not None
+                if was_idle:
+                    print(f"[INFO] Außerhalb der Handelszeit – Heartbeat-Polling (alle {SESSION_HEARTBEAT_INTERVAL:.0f}s)")
+                else:
+                    print("[INFO] Handelsfenster (bzw. Warm-up) – Polling im normalen Takt")
+            if self.monitor is not None and cycle_start - last_monitor_poll >= self.monitor_interval:
+                last_monitor_poll = cycle_start
+                try:
+                    self.monitor.poll()
+                except Exception as e:
+                    print(f"[ERROR] Exception im Positions-Monitor: {e}")
+            for symbol, tfs in self.series.items():
+                if self.tick_mode and symbol in self.tick_streams and idle is None:
+                    try:
+                        rolled = self.poll_ticks(symbol)
+                    except Exception as e:
+                        print(f"[ERROR] Exception im Tickstrom für {symbol}: {e}")
+                        rolled = True
+                    # Kerzen nur bei Minutenwechsel im Tickstrom, sonst spätestens nach POLL_INTERVAL
+                    if not rolled and cycle_start - last_bar_poll.get(symbol, 0.0) < POLL_INTERVAL:
+                        continue
+                    last_bar_poll[symbol] = cycle_start
+                for tf_const in tfs:
                     try:
-                        rates = self.mt5.copy_rates_from_pos(symbol, tf_const, 0, 2)
-                        if rates is None or len(rates) < 2:
-                            continue
-                        closed = rates[-2]
-                        ts = datetime.fromtimestamp(closed['time'], tz=pytz.UTC).replace(tzinfo=None)
-                        last_ts = last_times.setdefault(symbol, {}).get(tf_const)
-                        if last_ts is not None and ts <= last_ts:
-                            continue
-                        last_times[symbol][tf_const] = ts
-
-                        candle = Candle(
-                            timestamp=ts,
-                            open=closed['open'],
-                            high=closed['high'],
-                            low=closed['low'],
-                            close=closed['close'],
-                            volume=(closed['tick_volume'] if 'tick_volume' in closed.dtype.names else 0)
-                        )
-                        # In History puffern
-                        limit = get_history_limit(tf_const)
-                        buf = self.histories.setdefault(symbol, {}).setdefault(tf_const, [])
-                        buf.append(candle)
-                        buf[:] = buf[-limit:]
-                        # EMA updaten
-                        if len(buf) >= 10:
-                            buf[-1].ema10 = calc_ema([c.close for c in buf[-10:]], 10)
-                        else:
-                            buf[-1].ema10 = None
-                        if len(buf) >= 20:
-                            buf[-1].ema20 = calc_ema([c.close for c in buf[-20:]], 20)
-                        else:
-                            buf[-1].ema20 = None
-
-                        print(f"[DEBUG] Sende Candle an Subscriber: TF={tf_const}, Symbol={symbol}, TS={candle.timestamp}")
-                        for cb in callbacks:
-                            try:
-                                cb(candle)
-                            except Exception as e:
-                                print(f"[ERROR] Callback-Fehler: {e} ({cb})")
+                        for candle in self.poll_closed_bars(symbol, tf_const):
+                            self.dispatch(symbol, tf_const, candle)
                     except Exception as e:
                         print(f"[ERROR] Exception in DataHandler.run für {symbol}/{tf_const}: {e}")
 
-            time.sleep(1)  # Nur 1 Sekunde Pause, damit alle TF regelmäßig gescannt werden
+            metrics.observe("loop_cycle_seconds", time.monotonic() - cycle_start, help_text="Dauer eines Poll-Zyklus")
+            # Kurze Pause, damit alle TF regelmäßig gescannt werden (stop() weckt sofort)
+            pause = TICK_POLL_INTERVAL if self.tick_mode else POLL_INTERVAL
+            self._wake.wait(pause if idle is None else idle)
 
     def stop(self):
         self._running = False
+        self._wake.set()
+        for worker in self.workers.values():
+            worker.stop()
+        self.executor.stop()
+        self.bus.shutdown()
+        # Zuletzt vorgemerkte Controller-Zustände nicht verlieren
+        checkpoints.flush()
@@ -10,16 +10,26 @@ from dotenv import load_dotenv
 import MetaTrader5 as mt5
 from data_handler import DataHandler
 from strategy import TradingStrategy
+from sharded_runtime import ShardedRuntime
+from startup import StartupOrchestrator
+from core.latency import recorder as latency
+from core.metrics import metrics, instrument_mt5, start_metrics_server, process_collector, handler_collector, latency_collector
+from core.profiler import profiler
+from core.dashboard import Dashboard
+from config.runtime import METRICS_HOST, METRICS_PORT, DASHBOARD_ENABLED, DASHBOARD_OUTPUT
 from config.timeframes import K, B, E  # MT5-Integer-Konstanten
 from typing import Dict
 
 def start_periodic_summary(strategies: Dict[str, TradingStrategy], interval: int = 30):
     """
     Ruft strat.controller.print_summary() für jede Strategie alle `interval` Sekunden auf.
+    print_summary() liest nur den zuletzt veröffentlichten Snapshot des Controllers.
     """
     def _report():
         for strat in strategies.values():
             strat.controller.print_summary()
+        if latency.enabled:
+            print(f"[LATENCY]\n{latency.report()}")
         t = threading.Timer(interval, _report)
         t.daemon = True
         t.start()
@@ -46,6 +56,10 @@ if __name__ == '__main__':
     signal.signal(signal.SIGINT, shutdown)
     signal.signal(signal.SIGTERM, shutdown)
 
+    # Profiling auf Anfrage: SIGUSR1 (Unix) oder Kontrolldatei
+    profiler.install_signal()
+    profiler.watch_control_file()
+
     # Umgebungsvariablen laden
     load_dotenv()
 
@@ -65,6 +79,14 @@ if __name__ == '__main__':
     # DataHandler erstellen
     handler = DataHandler(mt5)
 
+    # Optional: Metrik-Endpoint (liest nur In-Memory-Werte, nie MT5)
+    if metrics.enabled:
+        instrument_mt5(mt5)
+        metrics.register_collector(process_collector)
+        metrics.register_collector(handler_collector(handler))
+        metrics.register_collector(latency_collector(latency))
+        start_metrics_server(METRICS_HOST, METRICS_PORT)
+
     # Symbol und Kontostand
     SYMBOLS = ['GBPUSD.r', 'EURUSD.r', 'AUDUSD.r' , 'USDCAD.r', 'GBPJPY.r', 'USDJPY.r', 'EURJPY.r']
     account = mt5.account_info()
@@ -72,36 +94,30 @@ if __name__ == '__main__':
         raise RuntimeError("MT5: Konto-Info nicht abrufbar")
     INITIAL_BALANCE = account.balance
 
-    # 1) Parameter pro Symbol einlesen
-    symbol_params = {}
-    for sym in SYMBOLS:
-        if not mt5.symbol_select(sym, True):
-            raise RuntimeError(f"Symbol {sym} nicht verfügbar")
-        info = mt5.symbol_info(sym)
-        symbol_params[sym] = {
-            'tick_size': info.point,
-            'spread':    info.spread * info.point
-        }
-
-    # 2) Für jedes Symbol eine eigene Strategie anlegen, initialisieren und abonnieren
-    strategies: Dict[str, TradingStrategy] = {}
-    for sym in SYMBOLS:
-        params = symbol_params[sym]
-        strat = TradingStrategy(
-            symbol=sym,
-            data_handler=handler,
-            account_balance=INITIAL_BALANCE,
-            tick_size=params['tick_size'],
-            spread=params['spread']
-        )
-
-        strat.controller.initialize()
-        strat.start()
-        strategies[sym] = strat
-
-
-    # 3) Periodische Zusammenfassung aller Strategien
-    start_periodic_summary(strategies, interval=15)
+    # 1) Parameter aller Symbole in einem Aufruf einlesen
+    startup = StartupOrchestrator(handler, SYMBOLS)
+    symbol_params = startup.load_symbol_params()
+
+    # 2a) Optional: Symbole auf mehrere Worker-Prozesse verteilen (BOT_WORKERS > 0)
+    n_workers = int(os.environ.get('BOT_WORKERS', '0'))
+    if n_workers > 0:
+        runtime = ShardedRuntime(handler, SYMBOLS, symbol_params, INITIAL_BALANCE, n_workers)
+        # Alte Trades genau einmal hier abfragen, die Worker erhalten nur ihre Symbole
+        runtime.start(startup.stale_trades())
+        try:
+            runtime.run()
+        finally:
+            runtime.stop()
+        sys.exit(0)
+
+    # 2) Pro Symbol eine Strategie: History, Replay, Initialisierung und Abos parallel
+    strategies: Dict[str, TradingStrategy] = startup.start(INITIAL_BALANCE, symbol_params)
+
+    # 3) Periodische Zusammenfassung bzw. Live-Dashboard (beide nur aus Snapshots)
+    if DASHBOARD_ENABLED:
+        Dashboard(lambda: [s.controller.snapshot for s in strategies.values()], output=DASHBOARD_OUTPUT).start()
+    else:
+        start_periodic_summary(strategies, interval=15)
 
     # 4) Event-Loop starten (blockierend)
     handler.run()
@@ -0,0 +1,318 @@
+# sharded_runtime.py
+"""
+Sharded Runtime: ein Broker-I/O-Prozess besitzt die MT5-Verbindung, pollt die Kerzen
+und führt Orders aus; N Worker-Prozesse betreiben jeweils die Controller einer
+Teilmenge der Symbole. Kerzen laufen über Shared-Memory-Ringpuffer zu den Workern,
+Order-Requests über eine Queue zurück zum I/O-Prozess.
+
+Bewusste Abweichung vom reinen Single-Owner-Modell: jeder Worker baut mit
+mt5.initialize eine eigene Terminal-Verbindung auf und liest darüber selbst
+(symbol_info/_tick, positions_get/orders_get, History beim Start, Ticks). Nur
+order_send läuft über den I/O-Prozess, damit genau ein Prozess Orders sendet.
+Alle Lesezugriffe über die Queue zu schicken, würde jeden Entry- und Stopp-Check um
+einen Prozess-Roundtrip verlängern und den I/O-Loop (Kerzen-Polling) mit
+Lese-Anfragen aller Worker belasten; lesende MT5-Aufrufe sind für parallele
+Verbindungen unkritisch.
+Alte Bot-Orders/-Positionen werden einmal im I/O-Prozess vor dem Spawnen abgefragt
+(StartupOrchestrator.stale_trades) und jedem Worker nur für seine Symbole mitgegeben –
+ein Worker fasst damit nie Trades fremder Symbole an.
+"""
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+from config.runtime import POLL_INTERVAL, SHM_RING_CAPACITY
+from config.timeframes import K, B, E
+from core.metrics import metrics
+from core.shm_ring import BarRing, ring_name
+from data_handler import DataHandler
+
+TIMEFRAMES = (K, B, E)
+RING_PREFIX = "fxbot"
+
+
+def shard_symbols(symbols: List[str], n_workers: int) -> List[List[str]]:
+    """Verteilt die Symbole round-robin auf höchstens n_workers Shards."""
+    n = max(1, min(n_workers, len(symbols)))
+    return [symbols[i::n] for i in range(n)]
+
+
+def _result_to_ns(res) -> Optional[SimpleNamespace]:
+    """MT5-Resultobjekte picklebar machen (der verschachtelte Request wird verworfen)."""
+    if res is None:
+        return None
+    if hasattr(res, '_asdict'):
+        fields = dict(res._asdict())
+    else:
+        fields = dict(vars(res))
+    fields.pop('request', None)
+    return SimpleNamespace(**fields)
+
+
+def _trades_to_ns(stale: Tuple[list, list]) -> Tuple[list, list]:
+    """(orders, positions) picklebar machen, damit sie an die Worker übergeben werden können."""
+    orders, positions = stale
+    return [_result_to_ns(o) for o in orders], [_result_to_ns(p) for p in positions]
+
+
+class OrderIntentClient:
+    """
+    Ersetzt mt5.order_send im Worker-Prozess: der Request wird als Intent an den
+    I/O-Prozess geschickt, der Worker wartet auf dessen Ergebnis. Ein Reader-Thread
+    liest die gemeinsame Ergebnis-Queue des Workers und ordnet jede Antwort über die
+    req_id ihrem Future zu – parallele Aufrufer verwerfen sich keine Antworten mehr.
+    """
+    def __init__(self, worker_id: int, intent_q, result_q, timeout: float = 30.0):
+        self.worker_id = worker_id
+        self.intent_q = intent_q
+        self.result_q = result_q
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._waiting: Dict[int, Future] = {}
+        self._reader: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._reader is not None:
+                return
+            self._reader = threading.Thread(target=self._read_results, name=f"intent-reader-{self.worker_id}", daemon=True)
+            self._reader.start()
+
+    def _read_results(self) -> None:
+        while True:
+            item = self.result_q.get()
+            if item is None:
+                return
+            rid, result = item
+            with self._lock:
+                fut = self._waiting.pop(rid, None)
+            if fut is None:
+                # Antwort eines bereits abgelaufenen Intents
+                print(f"[WARN] Worker {self.worker_id}: verspätete Antwort für Order-Intent {rid} verworfen")
+                continue
+            fut.set_result(result)
+
+    def order_send(self, request: Dict):
+        self.start()
+        fut: Future = Future()
+        with self._lock:
+            req_id = next(self._ids)
+            self._waiting[req_id] = fut
+        self.intent_q.put((self.worker_id, req_id, request))
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._waiting.pop(req_id, None)
+            print(f"[ERROR] Worker {self.worker_id}: Timeout für Order-Intent {req_id}")
+            return None
+
+    def stop(self) -> None:
+        if self._reader is not None:
+            self.result_q.put(None)
+            self._reader.join(timeout=5)
+            self._reader = None
+
+
+def install_order_proxy(mt5_module, client: OrderIntentClient) -> None:
+    """
+    Leitet im Worker-Prozess alle order_send-Aufrufe (DataHandler, RiskManager, Controller)
+    auf den I/O-Prozess um. Lesende MT5-Aufrufe laufen bewusst weiter über die eigene
+    Verbindung des Workers (siehe Modul-Docstring).
+    """
+    client.start()
+    mt5_module.order_send = client.order_send
+
+
+class ShardDataHandler(DataHandler):
+    """DataHandler im Worker: neue Kerzen kommen aus den Shared-Memory-Ringen statt aus dem Polling."""
+    def __init__(self, mt5_module, rings: Dict[Tuple[str, int], BarRing], notify_q):
+        super().__init__(mt5_module)
+        self.rings = rings
+        self.notify_q = notify_q
+        # Ab aktuellem Stand lesen; ältere Kerzen kommen über load_history
+        self._ring_seq = {key: ring.seq for key, ring in rings.items()}
+        # Positions-Monitor nur für die eigenen Symbole (Events/Snapshots für die Controller)
+        if self.monitor is not None:
+            self.monitor.symbols = {sym for sym, _ in rings}
+
+    def run(self):
+        self._running = True
+        print(f"[SHARD] Worker-Loop gestartet ({len(self.rings)} Serien)")
+        last_monitor_poll = 0.0
+        while self._running:
+            now = time.monotonic()
+            if self.monitor is not None and now - last_monitor_poll >= self.monitor_interval:
+                last_monitor_poll = now
+                try:
+                    self.monitor.poll()
+                except Exception as e:
+                    print(f"[ERROR] Exception im Positions-Monitor: {e}")
+            timeout = 1.0 if self.monitor is None else max(0.0, last_monitor_poll + self.monitor_interval - time.monotonic())
+            try:
+                key = self.notify_q.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if key is None:
+                self.stop()
+                break
+            symbol, tf_const = key
+            try:
+                self._ring_seq[key], candles = self.rings[key].read_since(self._ring_seq[key])
+                for candle in candles:
+                    buf = self.histories.get(symbol, {}).get(tf_const)
+                    if buf and candle.timestamp <= buf[-1].timestamp:
+                        continue  # schon aus der History geladen
+                    self.dispatch(symbol, tf_const, candle)
+            except Exception as e:
+                print(f"[ERROR] Exception im Shard-Worker für {symbol}/{tf_const}: {e}")
+
+
+def _worker_main(
+    worker_id: int,
+    symbols: List[str],
+    symbol_params: Dict[str, Dict[str, float]],
+    account_balance: float,
+    stale_trades: Dict[str, Tuple[list, list]],
+    notify_q,
+    intent_q,
+    result_q
+) -> None:
+    import MetaTrader5 as mt5
+    from strategy import TradingStrategy
+
+    if not mt5.initialize(
+        login=int(os.environ['MT5_LOGIN']),
+        password=os.environ['MT5_PASSWORD'],
+        server=os.environ['MT5_SERVER']
+    ):
+        print(f"[ERROR] Worker {worker_id}: MT5 Init-Fehler: {mt5.last_error()}")
+        return
+    client = OrderIntentClient(worker_id, intent_q, result_q)
+    install_order_proxy(mt5, client)
+
+    rings = {
+        (sym, tf): BarRing.attach(ring_name(RING_PREFIX, sym, tf), SHM_RING_CAPACITY)
+        for sym in symbols for tf in TIMEFRAMES
+    }
+    handler = ShardDataHandler(mt5, rings, notify_q)
+    try:
+        for sym in symbols:
+            params = symbol_params[sym]
+            strat = TradingStrategy(
+                symbol=sym,
+                data_handler=handler,
+                account_balance=account_balance,
+                tick_size=params['tick_size'],
+                spread=params['spread']
+            )
+            strat.start(stale_trades=stale_trades.get(sym, ([], [])))
+        print(f"[SHARD] Worker {worker_id} bereit: {symbols}")
+        handler.run()
+    finally:
+        client.stop()
+        for ring in rings.values():
+            ring.close()
+        mt5.shutdown()
+
+
+class ShardedRuntime:
+    """
+    Broker-I/O-Seite: pollt alle Serien, publiziert neue Kerzen in die Ringe,
+    benachrichtigt den zuständigen Worker und führt dessen Order-Intents aus.
+    """
+    def __init__(
+        self,
+        handler: DataHandler,
+        symbols: List[str],
+        symbol_params: Dict[str, Dict[str, float]],
+        account_balance: float,
+        n_workers: int
+    ):
+        self.handler = handler
+        self.symbol_params = symbol_params
+        self.account_balance = account_balance
+        self.shards = shard_symbols(symbols, n_workers)
+        self.owner = {sym: wid for wid, syms in enumerate(self.shards) for sym in syms}
+        self._ctx = mp.get_context("spawn")
+        self.intent_q = self._ctx.Queue()
+        self.notify_qs = [self._ctx.Queue() for _ in self.shards]
+        self.result_qs = [self._ctx.Queue() for _ in self.shards]
+        self.rings: Dict[Tuple[str, int], BarRing] = {}
+        self.workers: List[mp.Process] = []
+
+    def start(self, stale_trades: Dict[str, Tuple[list, list]]) -> None:
+        """
+        Legt die Ringe an und startet die Worker. stale_trades = (orders, positions) pro Symbol
+        aus einem einzigen Broker-Snapshot (StartupOrchestrator.stale_trades).
+        """
+        for sym in self.owner:
+            for tf in TIMEFRAMES:
+                self.rings[(sym, tf)] = BarRing.create(ring_name(RING_PREFIX, sym, tf), SHM_RING_CAPACITY)
+        for wid, syms in enumerate(self.shards):
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(wid, syms, self.symbol_params, self.account_balance,
+                      {sym: _trades_to_ns(stale_trades.get(sym, ([], []))) for sym in syms},
+                      self.notify_qs[wid], self.intent_q, self.result_qs[wid]),
+                name=f"shard-{wid}",
+                daemon=True
+            )
+            proc.start()
+            self.workers.append(proc)
+            print(f"[SHARD] Worker {wid} gestartet (pid={proc.pid}): {syms}")
+
+    def run(self) -> None:
+        self.handler._running = True
+        print(f"[SHARD] I/O-Loop gestartet ({len(self.workers)} Worker, {len(self.rings)} Serien)")
+        while self.handler._running:
+            cycle_start = time.monotonic()
+            for (sym, tf), ring in self.rings.items():
+                try:
+                    candles = self.handler.poll_closed_bars(sym, tf)
+                    if not candles:
+                        continue
+                    for candle in candles:
+                        ring.publish(candle)
+                    self.notify_qs[self.owner[sym]].put((sym, tf))
+                except Exception as e:
+                    print(f"[ERROR] Exception im I/O-Loop für {sym}/{tf}: {e}")
+            metrics.observe("loop_cycle_seconds", time.monotonic() - cycle_start, help_text="Dauer eines Poll-Zyklus")
+            # Bis zum nächsten Poll-Zyklus Order-Intents ausführen statt zu schlafen
+            # (außerhalb der Handelsfenster nur im Heartbeat-Takt pollen)
+            idle = self.handler.idle_interval(self.handler.calendar.clock())
+            self._drain_intents(until=cycle_start + (POLL_INTERVAL if idle is None else idle))
+
+    def _drain_intents(self, until: float) -> None:
+        while True:
+            timeout = until - time.monotonic()
+            if timeout <= 0:
+                return
+            try:
+                worker_id, req_id, request = self.intent_q.get(timeout=timeout)
+            except queue.Empty:
+                return
+            try:
+                res = self.handler.mt5.order_send(request)
+            except Exception as e:
+                print(f"[ERROR] order_send für Worker {worker_id} fehlgeschlagen: {e}")
+                res = None
+            self.result_qs[worker_id].put((req_id, _result_to_ns(res)))
+
+    def stop(self) -> None:
+        self.handler.stop()
+        for q in self.notify_qs:
+            q.put(None)
+        for proc in self.workers:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for ring in self.rings.values():
+            ring.close()
+        self.rings.clear()
@@ -0,0 +1,324 @@
+# sim/market_data.py
+"""
+Synthetische Kursdaten für Offline-, Last- und Skalierungstests.
+Vollständig vektorisiert (NumPy), reproduzierbar über den Seed. Pro Symbol:
+- Regime (Trend auf/ab, Range) als Segmente mit zufälliger Dauer; Range-Segmente
+  laufen als Brownian Bridge auf ihr Startniveau zurück,
+- Volatilitäts-Cluster über AR(1)-Log-Volatilität plus Tagesprofil (Sessions),
+- Spread-Regime (normal/weit, Rollover-Spitzen), Lücken (fehlende Minuten) und
+  Wochenenden mit Eröffnungs-Gap,
+- optional gemeinsamer Marktfaktor (Korrelation zwischen Symbolen).
+Aus den M1-Kerzen werden M15/H1 konsistent aggregiert. Ausgabe im MT5-Rates-Format
+(sim.mt5_sim.RATES_DTYPE), direkt für mt5_sim.load_rates() oder als .npz.
+
+    python -m sim.market_data --symbols 24 --days 365 --out data/synthetic
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sim.mt5_sim import RATES_DTYPE, TF_SECONDS, TIMEFRAME_M1, TIMEFRAME_M15, TIMEFRAME_H1
+
+REGIME_UP, REGIME_DOWN, REGIME_RANGE = 0, 1, 2
+
+DEFAULT_SYMBOLS = [
+    "EURUSD", "GBPUSD", "AUDUSD", "NZDUSD", "USDCAD", "USDCHF", "USDJPY", "EURJPY",
+    "GBPJPY", "AUDJPY", "EURGBP", "EURAUD", "EURCHF", "EURCAD", "GBPAUD", "GBPCAD",
+    "GBPCHF", "AUDCAD", "AUDCHF", "AUDNZD", "CADJPY", "CHFJPY", "NZDJPY", "NZDCAD",
+]
+
+
+class MarketConfig:
+    """Parameter des Generators (Renditen/Volatilität pro M1-Kerze, relativ zum Preis)."""
+    def __init__(
+        self,
+        base_vol: float = 0.00012,
+        trend_drift: float = 0.05,
+        regime_probs: Sequence[float] = (0.3, 0.3, 0.4),
+        regime_mean_bars: int = 600,
+        vol_persistence: float = 0.995,
+        vol_of_vol: float = 0.08,
+        market_correlation: float = 0.3,
+        spread_points: int = 10,
+        wide_spread_prob: float = 0.03,
+        wide_spread_factor: float = 3.0,
+        gap_prob: float = 0.001,
+        weekend_gap_vol: float = 0.002,
+        weekends: bool = True,
+        wick_factor: float = 0.6,
+        tick_volume: float = 60.0,
+    ):
+        self.base_vol = base_vol                      # Std der M1-Log-Rendite im Normalregime
+        self.trend_drift = trend_drift                # Drift im Trend-Regime als Anteil von base_vol
+        self.regime_probs = regime_probs              # Wahrscheinlichkeit (up, down, range) je Segment
+        self.regime_mean_bars = regime_mean_bars      # mittlere Segmentlänge in M1-Kerzen
+        self.vol_persistence = vol_persistence        # AR(1)-Koeffizient der Log-Volatilität
+        self.vol_of_vol = vol_of_vol                  # Innovations-Std der Log-Volatilität
+        self.market_correlation = market_correlation  # Anteil des gemeinsamen Faktors
+        self.spread_points = spread_points
+        self.wide_spread_prob = wide_spread_prob      # Anteil der Kerzen im Weit-Spread-Regime
+        self.wide_spread_factor = wide_spread_factor
+        self.gap_prob = gap_prob                      # Wahrscheinlichkeit fehlender Minuten (ohne Ticks)
+        self.weekend_gap_vol = weekend_gap_vol        # Std des Gaps zur Wochenöffnung (relativ)
+        self.weekends = weekends
+        self.wick_factor = wick_factor
+        self.tick_volume = tick_volume
+
+
+# ---------------- Bausteine ----------------
+
+def _ar1(noise: np.ndarray, phi: float) -> np.ndarray:
+    """x_t = phi * x_{t-1} + noise_t, per FFT-Faltung mit abgeschnittenem Kern (vektorisiert)."""
+    n = len(noise)
+    k = min(n, int(np.ceil(np.log(1e-6) / np.log(phi))) if 0 < phi < 1 else n)
+    kernel = phi ** np.arange(k)
+    size = 1 << int(np.ceil(np.log2(n + k)))
+    out = np.fft.irfft(np.fft.rfft(noise, size) * np.fft.rfft(kernel, size), size)[:n]
+    return out
+
+
+def _minute_grid(start: int, n_minutes: int, weekends: bool) -> np.ndarray:
+    """M1-Zeitstempel ab start; ohne Handel von Fr 21:00 bis So 21:00 UTC, falls weekends."""
+    t = start // 60 * 60 + np.arange(n_minutes, dtype=np.int64) * 60
+    if not weekends:
+        return t
+    # Wochentag (0 = Montag), Epoch 0 war ein Donnerstag
+    dow = ((t // 86400) + 3) % 7
+    hour = (t // 3600) % 24
+    closed = (dow == 5) | ((dow == 4) & (hour >= 21)) | ((dow == 6) & (hour < 21))
+    return t[~closed]
+
+
+def _session_profile(t: np.ndarray) -> np.ndarray:
+    """Volatilitäts-Multiplikator nach UTC-Stunde (Asien ruhig, London/NY-Overlap aktiv)."""
+    hourly = np.array([
+        0.6, 0.6, 0.7, 0.7, 0.7, 0.7, 0.8, 1.1, 1.4, 1.3, 1.2, 1.1,
+        1.3, 1.6, 1.5, 1.3, 1.1, 1.0, 0.9, 0.8, 0.7, 0.5, 0.5, 0.6,
+    ])
+    return hourly[(t // 3600) % 24]
+
+
+def _regimes(rng: np.random.Generator, n: int, cfg: MarketConfig) -> np.ndarray:
+    n_seg = max(1, int(n / cfg.regime_mean_bars * 2) + 8)
+    lengths = rng.geometric(1.0 / cfg.regime_mean_bars, n_seg)
+    while lengths.sum() < n:
+        lengths = np.concatenate((lengths, rng.geometric(1.0 / cfg.regime_mean_bars, n_seg)))
+    kinds = rng.choice(3, size=len(lengths), p=np.asarray(cfg.regime_probs) / np.sum(cfg.regime_probs))
+    return np.repeat(kinds, lengths)[:n]
+
+
+def _segment_ids(labels: np.ndarray) -> np.ndarray:
+    change = np.empty(len(labels), dtype=bool)
+    change[0] = True
+    change[1:] = labels[1:] != labels[:-1]
+    return np.cumsum(change) - 1
+
+
+def _bridge(increments: np.ndarray, seg: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Zieht in maskierten Segmenten den linearen Drift ab, sodass sie auf ihr Startniveau zurücklaufen."""
+    out = increments.copy()
+    if not mask.any():
+        return out
+    n_seg = seg[-1] + 1
+    seg_sum = np.bincount(seg, weights=increments, minlength=n_seg)
+    seg_len = np.bincount(seg, minlength=n_seg)
+    correction = (seg_sum / np.maximum(seg_len, 1))[seg]
+    out[mask] -= correction[mask]
+    return out
+
+
+# ---------------- Generator ----------------
+
+def _start_price(symbol: str, rng: np.random.Generator) -> Tuple[float, int]:
+    quote = symbol[3:6]
+    if quote == "JPY":
+        return float(rng.uniform(90.0, 190.0)), 3
+    if symbol[:3] in ("EUR", "GBP") and quote in ("USD", "CAD", "AUD", "NZD", "CHF"):
+        return float(rng.uniform(1.05, 1.9)), 5
+    return float(rng.uniform(0.55, 1.45)), 5
+
+
+def generate_m1(
+    symbol: str,
+    start: int,
+    n_minutes: int,
+    cfg: MarketConfig,
+    seed: int,
+    market_noise: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """M1-Kerzen eines Symbols für n_minutes Kalenderminuten ab start (Epoch-Sekunden)."""
+    rng = np.random.default_rng(seed)
+    t = _minute_grid(start, n_minutes, cfg.weekends)
+    n = len(t)
+    price0, digits = _start_price(symbol, rng)
+
+    # Volatilität: AR(1)-Log-Vol (Cluster) × Session-Profil
+    log_vol = _ar1(rng.normal(0.0, cfg.vol_of_vol, n), cfg.vol_persistence)
+    sigma = cfg.base_vol * np.exp(log_vol - log_vol.mean()) * _session_profile(t)
+
+    # Innovationen mit gemeinsamem Marktfaktor
+    z = rng.standard_normal(n)
+    if market_noise is not None and cfg.market_correlation > 0:
+        rho = cfg.market_correlation
+        minute = (t - start // 60 * 60) // 60  # Index ins Kalenderminuten-Raster des Marktfaktors
+        z = rho * market_noise[minute] + np.sqrt(1.0 - rho * rho) * z
+
+    # Regime: Drift im Trend, Brownian Bridge im Range
+    regime = _regimes(rng, n, cfg)
+    drift = np.where(regime == REGIME_UP, 1.0, np.where(regime == REGIME_DOWN, -1.0, 0.0))
+    increments = sigma * (z + cfg.trend_drift * drift)
+    increments = _bridge(increments, _segment_ids(regime), regime == REGIME_RANGE)
+
+    # Wochenöffnung: Gap auf die erste Kerze nach einer Lücke > 1 h
+    gaps = np.zeros(n)
+    gaps[1:] = np.where(np.diff(t) > 3600, rng.normal(0.0, cfg.weekend_gap_vol, n - 1), 0.0)
+
+    log_close = np.log(price0) + np.cumsum(increments + gaps)
+    close = np.exp(log_close)
+    open_ = np.empty(n)
+    open_[0] = price0
+    # Nach einem Gap eröffnet die Kerze auf dem neuen Niveau
+    open_[1:] = np.where(gaps[1:] != 0.0, close[:-1] * np.exp(gaps[1:]), close[:-1])
+    wick = np.abs(rng.standard_normal((2, n))) * sigma * cfg.wick_factor * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+
+    # Spread-Regime + Rollover-Spitze (21–22 UTC)
+    spread = np.full(n, float(cfg.spread_points))
+    wide = _regimes_binary(rng, n, cfg.wide_spread_prob, cfg.regime_mean_bars // 4)
+    spread[wide] *= cfg.wide_spread_factor
+    spread[(t // 3600) % 24 == 21] *= 2.5
+    spread *= 1.0 + 0.3 * (sigma / cfg.base_vol - 1.0).clip(0.0, 3.0)
+
+    rates = np.zeros(n, dtype=RATES_DTYPE)
+    rates['time'] = t
+    rates['open'] = np.round(open_, digits)
+    rates['close'] = np.round(close, digits)
+    rates['high'] = np.round(np.maximum(high, np.maximum(rates['open'], rates['close'])), digits)
+    rates['low'] = np.round(np.minimum(low, np.minimum(rates['open'], rates['close'])), digits)
+    rates['tick_volume'] = rng.poisson(cfg.tick_volume * sigma / cfg.base_vol) + 1
+    rates['spread'] = np.maximum(1, np.round(spread)).astype(np.int32)
+
+    # Lücken: einzelne Minuten ohne Ticks fehlen komplett
+    if cfg.gap_prob > 0:
+        keep = rng.random(n) >= cfg.gap_prob
+        keep[0] = True
+        rates = rates[keep]
+    return rates
+
+
+def _regimes_binary(rng: np.random.Generator, n: int, prob: float, mean_len: int) -> np.ndarray:
+    """Boolesche Segmente (z.B. Weit-Spread-Phasen) mit Anteil ~prob."""
+    if prob <= 0:
+        return np.zeros(n, dtype=bool)
+    mean_len = max(1, mean_len)
+    n_seg = int(n / mean_len) + 8
+    lengths = rng.geometric(1.0 / mean_len, n_seg)
+    while lengths.sum() < n:
+        lengths = np.concatenate((lengths, rng.geometric(1.0 / mean_len, n_seg)))
+    flags = rng.random(len(lengths)) < prob
+    return np.repeat(flags, lengths)[:n]
+
+
+def resample(m1: np.ndarray, timeframe: int) -> np.ndarray:
+    """Aggregiert M1-Kerzen zu einem höheren Timeframe (Open erste, Close letzte Kerze)."""
+    sec = TF_SECONDS[timeframe]
+    bucket = m1['time'] // sec * sec
+    starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+    ends = np.concatenate((starts[1:], [len(m1)])) - 1
+    out = np.zeros(len(starts), dtype=RATES_DTYPE)
+    out['time'] = bucket[starts]
+    out['open'] = m1['open'][starts]
+    out['close'] = m1['close'][ends]
+    out['high'] = np.maximum.reduceat(m1['high'], starts)
+    out['low'] = np.minimum.reduceat(m1['low'], starts)
+    out['tick_volume'] = np.add.reduceat(m1['tick_volume'], starts)
+    out['spread'] = np.minimum.reduceat(m1['spread'], starts)
+    return out
+
+
+def generate_market(
+    symbols: Sequence[str],
+    start: datetime,
+    days: float,
+    cfg: Optional[MarketConfig] = None,
+    seed: int = 1,
+    timeframes: Sequence[int] = (TIMEFRAME_M1, TIMEFRAME_M15, TIMEFRAME_H1),
+) -> Dict[Tuple[str, int], np.ndarray]:
+    """Kursdaten für alle Symbole: {(symbol, timeframe): rates}."""
+    cfg = cfg or MarketConfig()
+    start_ts = int(start.replace(tzinfo=start.tzinfo or timezone.utc).timestamp())
+    n_minutes = int(days * 1440)
+    market = np.random.default_rng(seed).standard_normal(n_minutes)
+    data: Dict[Tuple[str, int], np.ndarray] = {}
+    for i, sym in enumerate(symbols):
+        m1 = generate_m1(sym, start_ts, n_minutes, cfg, seed=seed * 1_000_003 + i + 1, market_noise=market)
+        for tf in timeframes:
+            data[(sym, tf)] = m1 if tf == TIMEFRAME_M1 else resample(m1, tf)
+    return data
+
+
+def symbol_names(n: int) -> List[str]:
+    """Die ersten n Standard-Paare, darüber hinaus synthetische Namen (SY000USD, SY001USD, ...)."""
+    names = list(DEFAULT_SYMBOLS[:n])
+    names += [f"SY{i:03d}USD" for i in range(n - len(names))]
+    return names
+
+
+# ---------------- Ein-/Ausgabe ----------------
+
+def load_into_sim(data: Dict[Tuple[str, int], np.ndarray]) -> None:
+    """Übergibt alle Serien an den simulierten Broker."""
+    from sim import mt5_sim
+    for (sym, tf), rates in data.items():
+        mt5_sim.load_rates(sym, tf, rates)
+
+
+def save(data: Dict[Tuple[str, int], np.ndarray], out_dir: str) -> List[str]:
+    """Eine .npz pro Symbol mit einem Rates-Array pro Timeframe (Schlüssel 'tf_<const>')."""
+    os.makedirs(out_dir, exist_ok=True)
+    by_symbol: Dict[str, Dict[str, np.ndarray]] = {}
+    for (sym, tf), rates in data.items():
+        by_symbol.setdefault(sym, {})[f"tf_{tf}"] = rates
+    paths = []
+    for sym, arrays in by_symbol.items():
+        path = os.path.join(out_dir, f"{sym}.npz")
+        np.savez(path, **arrays)
+        paths.append(path)
+    return paths
+
+
+def load(out_dir: str) -> Dict[Tuple[str, int], np.ndarray]:
+    data: Dict[Tuple[str, int], np.ndarray] = {}
+    for fname in sorted(os.listdir(out_dir)):
+        if not fname.endswith(".npz"):
+            continue
+        sym = fname[:-4]
+        with np.load(os.path.join(out_dir, fname)) as npz:
+            for key in npz.files:
+                data[(sym, int(key[3:]))] = npz[key]
+    return data
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Synthetische M1/M15/H1-Kursdaten erzeugen")
+    parser.add_argument("--symbols", type=int, default=len(DEFAULT_SYMBOLS), help="Anzahl Symbole")
+    parser.add_argument("--days", type=float, default=365.0)
+    parser.add_argument("--start", default="2023-01-02", help="Startdatum (UTC, YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="data/synthetic")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    start = datetime.strptime(args.start, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    data = generate_market(symbol_names(args.symbols), start, args.days, seed=args.seed)
+    t1 = time.perf_counter()
+    paths = save(data, args.out)
+    n_m1 = sum(len(r) for (s, tf), r in data.items() if tf == TIMEFRAME_M1)
+    print(f"[SIM] {args.symbols} Symbole, {n_m1:,} M1-Kerzen in {t1 - t0:.2f}s erzeugt → {len(paths)} Dateien in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
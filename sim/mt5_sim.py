@@ -0,0 +1,594 @@
+# sim/mt5_sim.py
+"""
+Simulierter MetaTrader5-Broker für Benchmarks, Lasttests und Replays.
+Das Modul stellt dieselben modulweiten Funktionen/Konstanten bereit wie das
+MetaTrader5-Paket (soweit der Bot sie nutzt). install() registriert es als
+sys.modules['MetaTrader5'] – muss vor dem Import von data_handler/core/* passieren.
+
+Zeit: eine simulierte Uhr (Epoch-Sekunden, set_time/advance). copy_rates_* liefert
+nur Kerzen mit Öffnungszeit <= now, die letzte davon ist die laufende Kerze.
+Kursdaten: per load_rates() vorgegeben oder bei Bedarf als Random Walk erzeugt.
+Ticks: deterministisch aus den M1-Kerzen (Replay), ticks_per_bar Ticks gleichmäßig über
+die Minute entlang Open→Low→High→Close (bullisch) bzw. Open→High→Low→Close. Bid/Ask,
+symbol_info_tick und copy_ticks_from folgen diesem Pfad bis zur aktuellen Uhrzeit.
+Orders: Pending-Stops werden bei advance() gegen den bisherigen Verlauf der M1-Kerze
+getriggert, Positionen bei SL-Berührung geschlossen.
+"""
+import sys
+import threading
+import zlib
+import time as _time
+from types import SimpleNamespace
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+# ---------------- Konstanten (Werte wie im MetaTrader5-Paket) ----------------
+
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+ORDER_TYPE_BUY_LIMIT = 2
+ORDER_TYPE_SELL_LIMIT = 3
+ORDER_TYPE_BUY_STOP = 4
+ORDER_TYPE_SELL_STOP = 5
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_PENDING = 5
+TRADE_ACTION_SLTP = 6
+TRADE_ACTION_MODIFY = 7
+TRADE_ACTION_REMOVE = 8
+
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_PLACED = 10008
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_DONE_PARTIAL = 10010
+TRADE_RETCODE_ERROR = 10011
+TRADE_RETCODE_TIMEOUT = 10012
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_TOO_MANY_REQUESTS = 10024
+TRADE_RETCODE_CONNECTION = 10031
+
+COPY_TICKS_ALL = -1
+COPY_TICKS_INFO = 1
+COPY_TICKS_TRADE = 2
+
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8'),
+])
+
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+    ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8'),
+])
+TICK_FLAG_BID, TICK_FLAG_ASK = 2, 4
+
+TF_SECONDS: Dict[int, int] = {
+    TIMEFRAME_M1: 60, TIMEFRAME_M5: 300, TIMEFRAME_M15: 900, TIMEFRAME_M30: 1800,
+    TIMEFRAME_H1: 3600, TIMEFRAME_H4: 14400, TIMEFRAME_D1: 86400,
+}
+
+DEFAULT_BARS = 5000
+DEFAULT_TICKS_PER_BAR = 12
+
+
+# ---------------- Broker-Zustand ----------------
+
+class _Broker:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.now = int(_time.time()) // 3600 * 3600
+        self.rates: Dict[Tuple[str, int], np.ndarray] = {}
+        self.generated = set()  # Serien, die per Random Walk erzeugt wurden
+        self.symbols: Dict[str, SimpleNamespace] = {}
+        self.positions: Dict[int, SimpleNamespace] = {}
+        self.orders: Dict[int, SimpleNamespace] = {}
+        self.next_ticket = 1000
+        self.balance = 10_000.0
+        self.currency = "USD"
+        self.leverage = 100
+        self.latency = 0.0
+        self.jitter = 0.0
+        self.ticks_per_bar = DEFAULT_TICKS_PER_BAR
+        self.checked: Dict[int, int] = {}  # Ticket → time_msc der letzten Order-/SL-Prüfung
+        self.calls: Dict[str, int] = {}
+        self.sent = []
+        self.last_error = (1, "Success")
+        self.seed = 42
+
+
+_broker = _Broker()
+
+
+def reset(now: Optional[int] = None, balance: float = 10_000.0, seed: int = 42) -> None:
+    """Setzt den kompletten Broker-Zustand zurück."""
+    global _broker
+    _broker = _Broker()
+    _broker.balance = balance
+    _broker.seed = seed
+    if now is not None:
+        _broker.now = int(now)
+
+
+def configure(latency: float = 0.0, jitter: float = 0.0, ticks_per_bar: Optional[int] = None) -> None:
+    """Simulierte Round-Trip-Latenz (Sekunden) pro API-Aufruf, optional mit Jitter; Tick-Dichte des Replays."""
+    _broker.latency = latency
+    _broker.jitter = jitter
+    if ticks_per_bar is not None:
+        _broker.ticks_per_bar = max(4, int(ticks_per_bar))
+
+
+def call_counts() -> Dict[str, int]:
+    return dict(_broker.calls)
+
+
+def _api(name: str) -> None:
+    _broker.calls[name] = _broker.calls.get(name, 0) + 1
+    if _broker.latency or _broker.jitter:
+        delay = _broker.latency + (np.random.random() * _broker.jitter if _broker.jitter else 0.0)
+        _time.sleep(delay)
+
+
+def install() -> None:
+    """Registriert den Simulator als MetaTrader5-Modul (vor allen Bot-Imports aufrufen)."""
+    sys.modules['MetaTrader5'] = sys.modules[__name__]
+
+
+# ---------------- Uhr & Kursdaten ----------------
+
+def now() -> int:
+    return _broker.now
+
+
+def set_time(epoch: int) -> None:
+    with _broker.lock:
+        _broker.now = int(epoch)
+        _match_orders()
+
+
+def advance(seconds: int) -> None:
+    set_time(_broker.now + int(seconds))
+
+
+def add_symbol(name: str, digits: Optional[int] = None, spread_points: int = 10, stops_level: int = 10, **extra) -> SimpleNamespace:
+    base, profit = name[:3], name[3:6]
+    if digits is None:
+        digits = 3 if profit == "JPY" else 5
+    point = 10.0 ** -digits
+    info = SimpleNamespace(
+        name=name, digits=digits, point=point, spread=spread_points, trade_stops_level=stops_level,
+        volume_min=0.01, volume_max=100.0, volume_step=0.01,
+        trade_contract_size=100_000.0, trade_tick_size=point,
+        trade_tick_value=point * 100_000.0 / (150.0 if profit == "JPY" else 1.0),
+        currency_base=base, currency_profit=profit, currency_margin=base,
+        visible=True, select=True, path=f"Forex\\{name}",
+    )
+    for k, v in extra.items():
+        setattr(info, k, v)
+    with _broker.lock:
+        _broker.symbols[name] = info
+    return info
+
+
+def _symbol(name: str) -> SimpleNamespace:
+    info = _broker.symbols.get(name)
+    return info if info is not None else add_symbol(name)
+
+
+def load_rates(symbol: str, timeframe: int, rates: np.ndarray) -> None:
+    """Gibt die Kursdaten einer Serie vor (strukturiertes Array, mind. time/open/high/low/close)."""
+    arr = np.zeros(len(rates), dtype=RATES_DTYPE)
+    for name in rates.dtype.names:
+        if name in RATES_DTYPE.names:
+            arr[name] = rates[name]
+    with _broker.lock:
+        _symbol(symbol)
+        _broker.rates[(symbol, timeframe)] = arr
+        _broker.generated.discard((symbol, timeframe))
+
+
+def random_walk(symbol: str, timeframe: int, n_back: int, n_forward: int, seed: Optional[int] = None) -> np.ndarray:
+    """Einfacher Random Walk um die simulierte Uhr (Fallback ohne vorgegebene Kursdaten)."""
+    sec = TF_SECONDS[timeframe]
+    start = (_broker.now // sec - n_back) * sec
+    n = n_back + n_forward
+    if seed is None:
+        seed = zlib.crc32(f"{symbol}:{timeframe}:{_broker.seed}".encode())
+    rng = np.random.default_rng(seed)
+    price0 = 150.0 if symbol[3:6] == "JPY" else 1.1
+    vol = 0.0002 * np.sqrt(sec / 60.0) * price0
+    closes = price0 + np.cumsum(rng.normal(0.0, vol, n))
+    opens = np.concatenate(([price0], closes[:-1]))
+    wick = np.abs(rng.normal(0.0, vol * 0.5, (2, n)))
+    rates = np.zeros(n, dtype=RATES_DTYPE)
+    rates['time'] = start + np.arange(n, dtype=np.int64) * sec
+    rates['open'] = opens
+    rates['close'] = closes
+    rates['high'] = np.maximum(opens, closes) + wick[0]
+    rates['low'] = np.minimum(opens, closes) - wick[1]
+    rates['tick_volume'] = rng.integers(10, 500, n)
+    rates['spread'] = _symbol(symbol).spread
+    return rates
+
+
+def _series(symbol: str, timeframe: int, need_back: int = 0) -> np.ndarray:
+    key = (symbol, timeframe)
+    arr = _broker.rates.get(key)
+    if arr is not None and (key not in _broker.generated or _visible_end(arr) >= need_back):
+        return arr
+    arr = random_walk(symbol, timeframe, max(need_back + 10, DEFAULT_BARS), DEFAULT_BARS)
+    _broker.rates[key] = arr
+    _broker.generated.add(key)
+    return arr
+
+
+def _visible_end(arr: np.ndarray) -> int:
+    """Index hinter der letzten Kerze mit Öffnungszeit <= now."""
+    return int(np.searchsorted(arr['time'], _broker.now, side='right'))
+
+
+def _tick_path(bars: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(time_msc, bid) von n Ticks pro Kerze entlang Open→Extrem→Extrem→Close."""
+    bull = bars['close'] >= bars['open']
+    first = np.where(bull, bars['low'], bars['high'])
+    second = np.where(bull, bars['high'], bars['low'])
+    anchors = np.stack([bars['open'], first, second, bars['close']], axis=1)
+    # Stützstellen so legen, dass Hoch und Tief exakt als Tick vorkommen
+    knots = np.round(np.arange(4) * (n - 1) / 3.0)
+    i = np.arange(n)
+    seg = np.clip(np.searchsorted(knots, i, side='right') - 1, 0, 2)
+    w = (i - knots[seg]) / (knots[seg + 1] - knots[seg])
+    bid = anchors[:, seg] * (1.0 - w) + anchors[:, seg + 1] * w
+    times = bars['time'][:, None] * 1000 + (np.arange(n, dtype=np.int64) * 60000 // n)[None, :]
+    return times.ravel(), bid.ravel()
+
+
+def _bar_so_far(symbol: str) -> Optional[Tuple[float, float, float, int]]:
+    """(high, low, bid, time_msc) der laufenden M1-Kerze bis zur aktuellen Uhrzeit."""
+    arr = _broker.rates.get((symbol, TIMEFRAME_M1))
+    if arr is None:
+        return None
+    end = _visible_end(arr)
+    if not end:
+        return None
+    times, bid = _tick_path(arr[end - 1:end], _broker.ticks_per_bar)
+    j = int(np.searchsorted(times, _broker.now * 1000, side='right'))
+    seen = bid[:max(j, 1)]
+    return float(seen.max()), float(seen.min()), float(seen[-1]), int(times[max(j, 1) - 1])
+
+
+def _last_price(symbol: str) -> Optional[float]:
+    so_far = _bar_so_far(symbol)
+    if so_far is not None:
+        return so_far[2]
+    for tf in (TIMEFRAME_M15, TIMEFRAME_H1):
+        arr = _broker.rates.get((symbol, tf))
+        if arr is not None:
+            end = _visible_end(arr)
+            if end:
+                return float(arr['close'][end - 1])
+    arr = _series(symbol, TIMEFRAME_M1)
+    end = _visible_end(arr)
+    return float(arr['close'][end - 1]) if end else None
+
+
+# ---------------- Verbindungs-API ----------------
+
+def initialize(*args, **kwargs) -> bool:
+    _api('initialize')
+    return True
+
+
+def login(*args, **kwargs) -> bool:
+    _api('login')
+    return True
+
+
+def shutdown() -> None:
+    _api('shutdown')
+
+
+def last_error():
+    return _broker.last_error
+
+
+# ---------------- Marktdaten-API ----------------
+
+def copy_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int):
+    _api('copy_rates_from_pos')
+    with _broker.lock:
+        arr = _series(symbol, timeframe, start_pos + count)
+        end = _visible_end(arr) - start_pos
+        if end <= 0:
+            return None
+        return arr[max(0, end - count):end].copy()
+
+
+def copy_rates_range(symbol: str, timeframe: int, date_from, date_to):
+    _api('copy_rates_range')
+    t0 = int(date_from.timestamp()) if hasattr(date_from, 'timestamp') else int(date_from)
+    t1 = int(date_to.timestamp()) if hasattr(date_to, 'timestamp') else int(date_to)
+    with _broker.lock:
+        arr = _series(symbol, timeframe)
+        t1 = min(t1, _broker.now)
+        lo = int(np.searchsorted(arr['time'], t0, side='left'))
+        hi = int(np.searchsorted(arr['time'], t1, side='right'))
+        return arr[lo:hi].copy()
+
+
+def copy_rates_from(symbol: str, timeframe: int, date_from, count: int):
+    _api('copy_rates_from')
+    t = int(date_from.timestamp()) if hasattr(date_from, 'timestamp') else int(date_from)
+    with _broker.lock:
+        arr = _series(symbol, timeframe, count)
+        hi = int(np.searchsorted(arr['time'], min(t, _broker.now), side='right'))
+        return arr[max(0, hi - count):hi].copy()
+
+
+def copy_ticks_from(symbol: str, date_from, count: int, flags: int = COPY_TICKS_ALL):
+    """Tick-Replay: bis zu count Ticks ab date_from (Sekunden), höchstens bis zur aktuellen Uhrzeit."""
+    _api('copy_ticks_from')
+    t0 = int(date_from.timestamp()) if hasattr(date_from, 'timestamp') else int(date_from)
+    with _broker.lock:
+        info = _symbol(symbol)
+        arr = _series(symbol, TIMEFRAME_M1)
+        n = _broker.ticks_per_bar
+        lo = max(0, int(np.searchsorted(arr['time'], t0, side='right')) - 1)
+        hi = min(_visible_end(arr), lo + count // n + 2)
+        if hi <= lo:
+            return np.zeros(0, dtype=TICK_DTYPE)
+        times, bid = _tick_path(arr[lo:hi], n)
+        keep = (times >= t0 * 1000) & (times <= _broker.now * 1000)
+        times, bid = times[keep][:count], bid[keep][:count]
+        ticks = np.zeros(len(times), dtype=TICK_DTYPE)
+        ticks['time_msc'] = times
+        ticks['time'] = times // 1000
+        ticks['bid'] = np.round(bid, info.digits)
+        ticks['ask'] = np.round(ticks['bid'] + info.spread * info.point, info.digits)
+        ticks['volume'] = 1
+        ticks['flags'] = TICK_FLAG_BID | TICK_FLAG_ASK
+        return ticks
+
+
+def symbols_get(group: Optional[str] = None):
+    _api('symbols_get')
+    return tuple(_broker.symbols.values())
+
+
+def symbols_total() -> int:
+    return len(_broker.symbols)
+
+
+def symbol_select(symbol: str, enable: bool = True) -> bool:
+    _api('symbol_select')
+    _symbol(symbol)
+    return True
+
+
+def symbol_info(symbol: str):
+    _api('symbol_info')
+    with _broker.lock:
+        info = _symbol(symbol)
+        bid = _last_price(symbol)
+        if bid is not None:
+            info.bid = bid
+            info.ask = round(bid + info.spread * info.point, info.digits)
+        return info
+
+
+def symbol_info_tick(symbol: str):
+    _api('symbol_info_tick')
+    with _broker.lock:
+        info = _symbol(symbol)
+        so_far = _bar_so_far(symbol)
+        if so_far is not None:
+            bid, time_msc = round(so_far[2], info.digits), so_far[3]
+        else:
+            bid, time_msc = _last_price(symbol), _broker.now * 1000
+        if bid is None:
+            return None
+        return SimpleNamespace(
+            time=time_msc // 1000, time_msc=time_msc, bid=bid,
+            ask=round(bid + info.spread * info.point, info.digits), last=0.0, volume=0, flags=6
+        )
+
+
+# ---------------- Konto & Handel ----------------
+
+def account_info():
+    _api('account_info')
+    return SimpleNamespace(
+        login=1, balance=_broker.balance, equity=_broker.balance, margin_free=_broker.balance,
+        currency=_broker.currency, leverage=_broker.leverage, server="Sim"
+    )
+
+
+def order_calc_margin(order_type: int, symbol: str, volume: float, price: float) -> float:
+    _api('order_calc_margin')
+    return volume * _symbol(symbol).trade_contract_size * price / _broker.leverage
+
+
+def positions_get(symbol: Optional[str] = None, ticket: Optional[int] = None, group: Optional[str] = None):
+    _api('positions_get')
+    with _broker.lock:
+        return tuple(
+            SimpleNamespace(**vars(p)) for p in _broker.positions.values()
+            if (symbol is None or p.symbol == symbol) and (ticket is None or p.ticket == ticket)
+        )
+
+
+def positions_total() -> int:
+    return len(_broker.positions)
+
+
+def orders_get(symbol: Optional[str] = None, ticket: Optional[int] = None, group: Optional[str] = None, magic: Optional[int] = None):
+    _api('orders_get')
+    with _broker.lock:
+        return tuple(
+            SimpleNamespace(**vars(o)) for o in _broker.orders.values()
+            if (symbol is None or o.symbol == symbol) and (ticket is None or o.ticket == ticket)
+            and (magic is None or o.magic == magic)
+        )
+
+
+def orders_total() -> int:
+    return len(_broker.orders)
+
+
+def _result(retcode: int, req: Dict, order: int = 0, comment: str = "") -> SimpleNamespace:
+    return SimpleNamespace(
+        retcode=retcode, order=order, deal=order if retcode == TRADE_RETCODE_DONE else 0,
+        volume=req.get('volume', 0.0), price=req.get('price', 0.0), comment=comment,
+        request=SimpleNamespace(**req), request_id=0, retcode_external=0, bid=0.0, ask=0.0
+    )
+
+
+def order_check(request: Dict):
+    _api('order_check')
+    return SimpleNamespace(retcode=0, comment="Done", request=SimpleNamespace(**request))
+
+
+def order_send(request: Dict):
+    _api('order_send')
+    with _broker.lock:
+        _broker.sent.append(dict(request))
+        action = request.get('action')
+        if action == TRADE_ACTION_PENDING:
+            return _place_pending(request)
+        if action == TRADE_ACTION_DEAL:
+            return _deal(request)
+        if action == TRADE_ACTION_SLTP:
+            pos = _broker.positions.get(request.get('position'))
+            if pos is None:
+                return _result(TRADE_RETCODE_INVALID, request, comment="Position not found")
+            pos.sl = float(request.get('sl', 0.0) or 0.0)
+            _broker.checked[pos.ticket] = _broker.now * 1000
+            pos.tp = float(request.get('tp', 0.0) or 0.0)
+            return _result(TRADE_RETCODE_DONE, request, order=pos.ticket, comment="Done")
+        if action == TRADE_ACTION_MODIFY:
+            order = _broker.orders.get(request.get('order'))
+            if order is None:
+                return _result(TRADE_RETCODE_INVALID, request, comment="Order not found")
+            for field in ('price', 'sl', 'tp'):
+                if field in request:
+                    setattr(order, 'price_open' if field == 'price' else field, float(request[field]))
+            return _result(TRADE_RETCODE_DONE, request, order=order.ticket, comment="Done")
+        if action == TRADE_ACTION_REMOVE:
+            order = _broker.orders.pop(request.get('order'), None)
+            if order is None:
+                return _result(TRADE_RETCODE_INVALID, request, comment="Order not found")
+            _broker.checked.pop(order.ticket, None)
+            return _result(TRADE_RETCODE_DONE, request, order=order.ticket, comment="Done")
+        return _result(TRADE_RETCODE_INVALID, request, comment="Unsupported action")
+
+
+def _new_ticket() -> int:
+    _broker.next_ticket += 1
+    return _broker.next_ticket
+
+
+def _place_pending(req: Dict) -> SimpleNamespace:
+    ticket = _new_ticket()
+    _broker.orders[ticket] = SimpleNamespace(
+        ticket=ticket, symbol=req['symbol'], type=req['type'], volume_initial=req['volume'],
+        volume_current=req['volume'], price_open=float(req['price']), sl=float(req.get('sl', 0.0) or 0.0),
+        tp=float(req.get('tp', 0.0) or 0.0), magic=req.get('magic', 0), comment=req.get('comment', ""),
+        time_setup=_broker.now,
+    )
+    return _result(TRADE_RETCODE_DONE, req, order=ticket, comment="Placed")
+
+
+def _open_position(symbol: str, side_type: int, volume: float, price: float, sl: float, tp: float,
+                   magic: int, comment: str, ticket: Optional[int] = None) -> SimpleNamespace:
+    ticket = ticket if ticket is not None else _new_ticket()
+    pos = SimpleNamespace(
+        ticket=ticket, symbol=symbol, type=side_type, volume=volume, price_open=price,
+        price_current=price, sl=sl, tp=tp, magic=magic, comment=comment, time=_broker.now,
+        time_msc=_broker.now * 1000, profit=0.0, identifier=ticket,
+    )
+    _broker.positions[ticket] = pos
+    return pos
+
+
+def _deal(req: Dict) -> SimpleNamespace:
+    position = req.get('position')
+    if position:
+        pos = _broker.positions.pop(position, None)
+        if pos is None:
+            return _result(TRADE_RETCODE_INVALID, req, comment="Position not found")
+        _broker.checked.pop(position, None)
+        return _result(TRADE_RETCODE_DONE, req, order=_new_ticket(), comment="Closed")
+    pos = _open_position(
+        req['symbol'], POSITION_TYPE_BUY if req['type'] == ORDER_TYPE_BUY else POSITION_TYPE_SELL,
+        float(req['volume']), float(req.get('price') or _last_price(req['symbol']) or 0.0),
+        float(req.get('sl', 0.0) or 0.0), float(req.get('tp', 0.0) or 0.0),
+        req.get('magic', 0), req.get('comment', "")
+    )
+    return _result(TRADE_RETCODE_DONE, req, order=pos.ticket, comment="Done")
+
+
+def _range_since(symbol: str, since_msc: int) -> Optional[Tuple[float, float, float]]:
+    """(high, low, bid) der Replay-Ticks in (since_msc, now]; None ohne neue Ticks."""
+    arr = _broker.rates.get((symbol, TIMEFRAME_M1))
+    if arr is None:
+        return None
+    end = _visible_end(arr)
+    lo = max(0, int(np.searchsorted(arr['time'], since_msc // 1000, side='right')) - 1, end - 1440)
+    if end <= lo:
+        return None
+    times, bid = _tick_path(arr[lo:end], _broker.ticks_per_bar)
+    seen = bid[(times > since_msc) & (times <= _broker.now * 1000)]
+    if not len(seen):
+        return None
+    return float(seen.max()), float(seen.min()), float(seen[-1])
+
+
+def _match_orders() -> None:
+    """Pending-Stops und SLs gegen die Replay-Ticks seit der letzten Prüfung (bzw. Platzierung/Änderung)."""
+    now_msc = _broker.now * 1000
+    for ticket, order in list(_broker.orders.items()):
+        rng = _range_since(order.symbol, _broker.checked.get(ticket, order.time_setup * 1000))
+        _broker.checked[ticket] = now_msc
+        if rng is None:
+            continue
+        high, low = rng[0], rng[1]
+        hit = (
+            (order.type == ORDER_TYPE_BUY_STOP and high >= order.price_open)
+            or (order.type == ORDER_TYPE_SELL_STOP and low <= order.price_open)
+        )
+        if hit:
+            del _broker.orders[ticket]
+            side = POSITION_TYPE_BUY if order.type == ORDER_TYPE_BUY_STOP else POSITION_TYPE_SELL
+            # Position behält das Order-Ticket (wie bei Netting/Hedging-Konten üblich)
+            _open_position(order.symbol, side, order.volume_current, order.price_open,
+                           order.sl, order.tp, order.magic, order.comment, ticket=ticket)
+    for ticket, pos in list(_broker.positions.items()):
+        rng = _range_since(pos.symbol, _broker.checked.get(ticket, pos.time_msc))
+        _broker.checked[ticket] = now_msc
+        if rng is None:
+            continue
+        high, low, pos.price_current = rng
+        if pos.sl and (
+            (pos.type == POSITION_TYPE_BUY and low <= pos.sl)
+            or (pos.type == POSITION_TYPE_SELL and high >= pos.sl)
+        ):
+            del _broker.positions[ticket]
+            _broker.checked.pop(ticket, None)
@@ -0,0 +1,130 @@
+# startup.py
+"""
+Paralleler Start aller Symbole.
+- Symbol-Metadaten in einem Aufruf (symbols_get) statt symbol_select/symbol_info pro Symbol;
+  daraus auch die Specs/Umrechnungspfade des CurrencyConverters,
+- ein gemeinsamer Snapshot der Bot-Orders/-Positionen; jede wird genau einmal bereinigt,
+- pro Symbol ein Task im Thread-Pool: History laden, FSMs replayen, Controller genau
+  einmal initialisieren, Candle-Callbacks abonnieren.
+Die Startzeit hängt damit am langsamsten Symbol statt an der Summe aller Symbole.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+from config.runtime import STARTUP_WORKERS
+from strategy import TradingStrategy
+
+MAGIC = 234000
+
+
+class StartupOrchestrator:
+    def __init__(self, handler, symbols: List[str], workers: int = STARTUP_WORKERS):
+        self.handler = handler
+        self.mt5 = handler.mt5
+        self.symbols = list(symbols)
+        self.workers = max(1, workers)
+
+    def load_symbol_params(self) -> Dict[str, Dict[str, float]]:
+        """tick_size/spread pro Symbol; nur nicht sichtbare Symbole werden einzeln selektiert."""
+        infos = {s.name: s for s in self.mt5.symbols_get() or []}
+        params = {}
+        for sym in self.symbols:
+            info = infos.get(sym)
+            if info is None or not getattr(info, 'visible', True):
+                if not self.mt5.symbol_select(sym, True):
+                    raise RuntimeError(f"Symbol {sym} nicht verfügbar")
+                info = self.mt5.symbol_info(sym)
+                if info is None:
+                    raise RuntimeError(f"Symbol {sym} nicht verfügbar")
+            params[sym] = {
+                'tick_size': info.point,
+                'spread':    info.spread * info.point
+            }
+            infos[sym] = info
+        # Specs + Umrechnungspfade für die Positionsgröße aus demselben Abruf
+        self.handler.fx.register(self.symbols, infos)
+        return params
+
+    def stale_trades(self, cleanup_unlisted: bool = True) -> Dict[str, Tuple[list, list]]:
+        """
+        Bot-Orders/-Positionen aus einem Snapshot, gruppiert nach Symbol (auch für die
+        Worker der Sharded Runtime, die nur ihre eigenen Symbole erhalten).
+        """
+        orders = [o for o in self.mt5.orders_get(magic=MAGIC) or [] if getattr(o, 'magic', MAGIC) == MAGIC]
+        positions = [p for p in self.mt5.positions_get() or [] if p.magic == MAGIC]
+        by_symbol: Dict[str, Tuple[list, list]] = {sym: ([], []) for sym in self.symbols}
+        unlisted: Tuple[list, list] = ([], [])
+        for o in orders:
+            by_symbol.get(o.symbol, unlisted)[0].append(o)
+        for p in positions:
+            by_symbol.get(p.symbol, unlisted)[1].append(p)
+        if cleanup_unlisted and (unlisted[0] or unlisted[1]):
+            # Symbole, die nicht mehr konfiguriert sind: wie bisher beim Start schließen
+            print(f"[STARTUP] Bereinige {len(unlisted[0])} Orders/{len(unlisted[1])} Positionen nicht konfigurierter Symbole")
+            for o in unlisted[0]:
+                self.handler.cancel_order(o.ticket)
+            for p in unlisted[1]:
+                self.handler.executor.execute(('close', p.ticket), lambda p=p: self._close_request(p), check=False)
+        return by_symbol
+
+    def _close_request(self, p) -> Dict:
+        tick = self.mt5.symbol_info_tick(p.symbol)
+        return {
+            "action": self.mt5.TRADE_ACTION_DEAL,
+            "position": p.ticket,
+            "symbol": p.symbol,
+            "volume": p.volume,
+            "type": self.mt5.ORDER_TYPE_BUY if p.type == self.mt5.ORDER_TYPE_SELL else self.mt5.ORDER_TYPE_SELL,
+            "price": tick.bid if p.type == self.mt5.ORDER_TYPE_BUY else tick.ask,
+            "deviation": 20,
+            "magic": MAGIC,
+            "comment": "Bot-Startup Cleanup"
+        }
+
+    def start(
+        self,
+        account_balance: float,
+        symbol_params: Dict[str, Dict[str, float]],
+        cleanup_unlisted: bool = True
+    ) -> Dict[str, TradingStrategy]:
+        """Startet alle Strategien parallel; wirft RuntimeError, wenn ein Symbol scheitert."""
+        stale = self.stale_trades(cleanup_unlisted)
+        t0 = time.monotonic()
+        durations: Dict[str, float] = {}
+
+        def start_one(sym: str) -> TradingStrategy:
+            t = time.monotonic()
+            params = symbol_params[sym]
+            strat = TradingStrategy(
+                symbol=sym,
+                data_handler=self.handler,
+                account_balance=account_balance,
+                tick_size=params['tick_size'],
+                spread=params['spread']
+            )
+            strat.start(stale_trades=stale[sym])
+            durations[sym] = time.monotonic() - t
+            return strat
+
+        strategies: Dict[str, TradingStrategy] = {}
+        failed: Dict[str, Exception] = {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(self.symbols) or 1),
+                                thread_name_prefix="startup") as pool:
+            futures = {pool.submit(start_one, sym): sym for sym in self.symbols}
+            for fut in as_completed(futures):
+                sym = futures[fut]
+                try:
+                    strategies[sym] = fut.result()
+                except Exception as e:
+                    print(f"[ERROR] Start von {sym} fehlgeschlagen: {e}")
+                    failed[sym] = e
+        if failed:
+            raise RuntimeError(f"Start fehlgeschlagen für: {', '.join(sorted(failed))}")
+
+        slowest = max(durations, key=durations.get) if durations else None
+        print(
+            f"[STARTUP] {len(strategies)} Symbole in {time.monotonic() - t0:.2f}s gestartet"
+            + (f" (langsamstes: {slowest} {durations[slowest]:.2f}s)" if slowest else "")
+        )
+        # Reihenfolge der Konfiguration beibehalten
+        return {sym: strategies[sym] for sym in self.symbols}
@@ -2,6 +2,7 @@ import MetaTrader5 as mt5
 from config.timeframes import K, B, E
 from core.tf_manager import MultiTimeframeController
 from core.phase_manager import Candle
+from core.events import BarClosed, TickUpdate, OrderFilled, SLModified, PositionClosed
 
 
 def max_lots(symbol: str, risk_per_trade: float = 0.01) -> float:
@@ -52,20 +53,32 @@ class TradingStrategy:
             spread=spread
         )
 
-    def start(self) -> None:
+    def start(self, stale_trades=None) -> None:
         """
         Starte die Strategie: initialisiere Controller und abonniere Candle-Updates auf allen Timeframes.
+        stale_trades wird an MultiTimeframeController.initialize() durchgereicht.
         """
-        # Erstinitialisierung
-        self.controller.initialize()
+        # Erstinitialisierung (einzige Stelle – nicht zusätzlich von außen aufrufen)
+        self.controller.initialize(stale_trades)
 
-        # Abonniere neue Kerzen (Candles) für alle Timeframes
+        # Abonniere neue Kerzen (Candles) für alle Timeframes sowie Order-/Positions-Events
+        data = self.controller.data
         for tf in (K, B, E):
-            self.controller.data.subscribe(
-                symbol=self.symbol,
-                timeframe=tf,
-                callback=lambda raw_candle, tf=tf: self._on_candle(tf, raw_candle)
-            )
+            data.watch(self.symbol, tf)
+            data.bus.subscribe(BarClosed, self._on_bar, symbol=self.symbol, tf=tf)
+        data.bus.subscribe(OrderFilled, self.controller.on_order_filled, symbol=self.symbol)
+        data.bus.subscribe(SLModified, self.controller.on_sl_modified, symbol=self.symbol)
+        data.bus.subscribe(PositionClosed, self.controller.on_position_closed, symbol=self.symbol)
+        # Tick-Modus: Intra-Bar-Stopmanagement über die laufende M1-Kerze
+        if data.tick_mode:
+            data.watch_ticks(self.symbol)
+            data.bus.subscribe(TickUpdate, self._on_tick, symbol=self.symbol)
+
+    def _on_bar(self, event: BarClosed) -> None:
+        self._on_candle(event.tf, event.candle)
+
+    def _on_tick(self, event: TickUpdate) -> None:
+        self.controller.on_tick(event.tick, event.bar)
 
     def _on_candle(self, timeframe: int, raw_candle) -> None:
         print(f"[CHECK] Type: {type(raw_candle)}, Content: {raw_candle}")
@@ -0,0 +1,110 @@
+# tests/conftest.py
+"""
+Gemeinsame Test-Umgebung: der simulierte Broker (sim/mt5_sim) ersetzt das
+MetaTrader5-Paket und muss vor allen Bot-Imports registriert sein.
+"""
+import os
+import sys
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from sim import mt5_sim  # noqa: E402
+
+mt5_sim.install()
+
+import config.runtime as runtime  # noqa: E402
+
+# Keine Checkpoint-Dateien aus den Tests ins Arbeitsverzeichnis schreiben
+runtime.CHECKPOINT_ENABLED = False
+
+import pytest  # noqa: E402
+
+START = int(datetime(2024, 1, 3, 12, 0, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.fixture
+def broker():
+    """Frischer Simulator-Zustand pro Test (Mittwoch 12:00 UTC)."""
+    mt5_sim.reset(now=START)
+    mt5_sim.configure(latency=0.0, jitter=0.0)
+    yield mt5_sim
+    mt5_sim.reset(now=START)
+
+
+SYMBOLS = ("EURUSD", "GBPUSD")
+
+
+@pytest.fixture(scope="session")
+def market_rates():
+    from sim import market_data
+    return market_data.generate_market(list(SYMBOLS), datetime(2024, 1, 1, tzinfo=timezone.utc), 6)
+
+
+@pytest.fixture
+def market(broker, market_rates, tmp_path, monkeypatch):
+    """Simulator mit synthetischen Kursen; Arbeitsverzeichnis (summary_log.csv, Checkpoints) im tmp_path."""
+    from sim import market_data
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("core.checkpoint.CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    market_data.load_into_sim(market_rates)
+    yield broker
+    # Vorgemerkte Checkpoints noch ins tmp_path schreiben, nicht später ins Repo
+    from core.checkpoint import writer
+    writer.flush()
+
+
+@pytest.fixture
+def start_bot(market):
+    """Fabrik: DataHandler (inline-Dispatch) + gestartete Strategien für SYMBOLS."""
+    from data_handler import DataHandler
+    from strategy import TradingStrategy
+    handlers = []
+
+    def start(symbols=SYMBOLS):
+        handler = DataHandler(mt5_sim)
+        handler.dispatch_mode = "inline"
+        handler.monitor = None
+        strategies = {}
+        for sym in symbols:
+            info = mt5_sim.symbol_info(sym)
+            strategies[sym] = TradingStrategy(sym, handler, 10_000, info.point, info.spread * info.point)
+            strategies[sym].start(([], []))
+        handler._last_times = {
+            sym: {tf: buf[-1].timestamp for tf, buf in tfs.items() if buf}
+            for sym, tfs in handler.histories.items()
+        }
+        handlers.append(handler)
+        return handler, strategies
+
+    yield start
+    for handler in handlers:
+        handler.executor.stop()
+
+
+def _run_minutes(handler, minutes: int) -> None:
+    for _ in range(minutes):
+        mt5_sim.advance(60)
+        for sym, tfs in handler.series.items():
+            for tf in tfs:
+                for candle in handler.poll_closed_bars(sym, tf):
+                    handler.dispatch(sym, tf, candle)
+
+
+@pytest.fixture
+def run_minutes(market):
+    """Simulierte Uhr minutenweise vorstellen und alle neuen Kerzen ausliefern (wie der Run-Loop)."""
+    return _run_minutes
+
+
+@pytest.fixture
+def rewind_market(market, market_rates):
+    """Simulator auf den Startzeitpunkt zurücksetzen (gleiche Kurse, leere Orders/Positionen)."""
+    from sim import market_data
+
+    def rewind():
+        mt5_sim.reset(now=START)
+        market_data.load_into_sim(market_rates)
+    return rewind
@@ -0,0 +1,82 @@
+# tests/test_break_even.py
+import MetaTrader5 as mt5
+import pytest
+
+from core.order_executor import OrderExecutor
+from core.prices import to_points
+from core.risk_manager import RiskManager
+from core.stop_manager import BEState, StopManager
+from data_handler import MAGIC
+
+POINT = 0.00001
+
+
+@pytest.fixture
+def risk(broker):
+    broker.add_symbol('EURUSD', stops_level=10)
+    broker.symbol_info_tick('EURUSD')  # M1-Serie erzeugen
+    rm = RiskManager(account_balance=10_000)
+    rm.executor = OrderExecutor(mt5, base_delay=0.001, max_delay=0.005)
+    yield rm
+    rm.executor.stop()
+
+
+def _open(side, price, sl):
+    res = mt5.order_send({
+        'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+        'type': mt5.ORDER_TYPE_BUY if side == 'buy' else mt5.ORDER_TYPE_SELL,
+        'price': price, 'sl': sl, 'magic': MAGIC, 'comment': 'test',
+    })
+    return res.order
+
+
+def _due(ticket, side, entry, stop, spread):
+    stops = StopManager(ticket, side, entry, stop, spread, point=0.00001)
+    stops.be_state = BEState.DUE
+    return stops
+
+
+@pytest.mark.parametrize("side", ["buy", "sell"])
+def test_break_even_rounds_towards_entry(risk, side):
+    tick = mt5.symbol_info_tick('EURUSD')
+    # Entry weit genug vom Markt, Spread mit Bruchteil eines Punkts
+    entry = tick.bid - 0.005 if side == 'buy' else tick.ask + 0.005
+    stop = entry - 0.002 if side == 'buy' else entry + 0.002
+    spread = 0.000125
+    ticket = _open(side, entry, stop)
+    stops = _due(ticket, side, entry, stop, spread)
+
+    sl = risk.try_break_even('EURUSD', side, stop, ticket, stops).result(timeout=5)
+    entry_pts = to_points(entry, POINT)
+    if side == 'buy':
+        # Entry - 12.5 Punkte → aufgerundet auf Entry - 12, nicht abgerundet auf Entry - 13
+        assert to_points(sl, POINT) == entry_pts - 12
+    else:
+        assert to_points(sl, POINT) == entry_pts + 12
+    assert mt5.positions_get(ticket=ticket)[0].sl == sl
+    assert stops.be_state == BEState.APPLIED
+
+
+@pytest.mark.parametrize("side", ["buy", "sell"])
+def test_break_even_respects_min_distance(risk, side):
+    tick = mt5.symbol_info_tick('EURUSD')
+    # BE-Ziel liegt innerhalb des Mindestabstands (10 Punkte) zum Markt
+    entry = tick.bid - 0.00005 if side == 'buy' else tick.ask + 0.00005
+    stop = entry - 0.002 if side == 'buy' else entry + 0.002
+    ticket = _open(side, entry, stop)
+    stops = _due(ticket, side, entry, stop, 0.0)
+
+    sl = risk.try_break_even('EURUSD', side, stop, ticket, stops).result(timeout=5)
+    if side == 'buy':
+        assert to_points(sl, POINT) == to_points(tick.bid, POINT) - 10
+    else:
+        assert to_points(sl, POINT) == to_points(tick.ask, POINT) + 10
+
+
+def test_break_even_skipped_when_sl_already_beyond(risk):
+    tick = mt5.symbol_info_tick('EURUSD')
+    entry = tick.bid - 0.005
+    ticket = _open('buy', entry, entry + 0.001)
+    stops = _due(ticket, 'buy', entry, entry - 0.002, 0.0001)
+    assert risk.try_break_even('EURUSD', 'buy', entry + 0.001, ticket, stops) is None
+    assert stops.be_state == BEState.APPLIED
@@ -0,0 +1,77 @@
+# tests/test_buffer_only.py
+from config.timeframes import K, B, E
+
+MINUTES = 240
+
+
+def _fsm_summary(ctrl):
+    return {
+        tf: (ctrl.phases[tf], ctrl.machines[tf].state.last_candle_ts, len(ctrl.machines[tf].state.last_candles))
+        for tf in (K, B, E)
+    }
+
+
+def _run(start_bot, run_minutes, buffer_only, monkeypatch):
+    monkeypatch.setattr("core.tf_manager.TF_BUFFER_ONLY", buffer_only)
+    # Puffer nicht kappen: hier wird das exakte Nachspielen geprüft (Überlauf siehe unten)
+    monkeypatch.setattr("core.tf_manager.get_history_limit", lambda tf: 10 * MINUTES)
+    handler, strategies = start_bot()
+    run_minutes(handler, MINUTES)
+    return {sym: s.controller for sym, s in strategies.items()}
+
+
+def test_catch_up_replays_buffer_to_the_live_state(start_bot, run_minutes, rewind_market, monkeypatch):
+    live = _run(start_bot, run_minutes, False, monkeypatch)
+    expected = {sym: _fsm_summary(c) for sym, c in live.items()}
+
+    rewind_market()
+    buffered = _run(start_bot, run_minutes, True, monkeypatch)
+    assert any(c.buffered[tf] for c in buffered.values() for tf in (B, E)), "kein TF war buffer-only"
+
+    for sym, ctrl in buffered.items():
+        with ctrl._lock:
+            for tf in (B, E):
+                pending = len(ctrl.buffered[tf])
+                if ctrl.buffer_only[tf]:
+                    assert ctrl.machines[tf].state.last_candle_ts < ctrl.buffered[tf][-1].timestamp
+                missed = ctrl._catch_up(tf)
+                assert missed >= pending
+                assert ctrl.buffered[tf] == []
+        assert _fsm_summary(ctrl) == expected[sym]
+
+
+def test_reactivation_catches_up_before_going_live(start_bot, run_minutes, monkeypatch):
+    controllers = _run(start_bot, run_minutes, True, monkeypatch)
+    dormant = [(c, tf) for c in controllers.values() for tf in (B, E) if c.buffer_only[tf]]
+    assert dormant, "kein TF war buffer-only"
+
+    ctrl, tf = dormant[0]
+    with ctrl._lock:
+        last = ctrl.buffered[tf][-1].timestamp
+        ctrl.active_tf = E  # B und E müssen live sein
+        ctrl._update_tf_modes()
+        assert not ctrl.buffer_only[tf]
+        assert ctrl.buffered[tf] == []
+        assert ctrl.machines[tf].state.last_candle_ts == last
+
+
+
+def test_buffer_is_capped_and_overflow_rebuilds_from_history(start_bot, run_minutes, monkeypatch):
+    from core.phase_manager import PhaseStateMachine
+    from config.timeframes import get_history_limit
+    monkeypatch.setattr("core.tf_manager.TF_BUFFER_ONLY", True)
+    handler, strategies = start_bot()
+    run_minutes(handler, MINUTES)
+    ctrls = [s.controller for s in strategies.values()]
+    assert all(len(c.buffered[tf]) <= get_history_limit(tf) for c in ctrls for tf in (B, E))
+    overflowed = [(c, tf) for c in ctrls for tf in (B, E) if c.buffer_overflow[tf]]
+    assert overflowed, "kein Puffer ist übergelaufen"
+
+    ctrl, tf = overflowed[0]
+    with ctrl._lock:
+        hist = handler.histories[ctrl.symbol][tf]
+        assert ctrl._catch_up(tf) == len(hist)
+        assert not ctrl.buffer_overflow[tf] and ctrl.buffered[tf] == []
+        expected, _ = PhaseStateMachine().replay_batch(hist)
+        assert ctrl.phases[tf] == expected
+        assert ctrl.machines[tf].state.last_candle_ts == hist[-1].timestamp
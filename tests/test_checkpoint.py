@@ -0,0 +1,125 @@
+# tests/test_checkpoint.py
+import json
+
+import pytest
+
+import core.checkpoint as checkpoint
+from config.timeframes import K, B, E
+from core.checkpoint import CheckpointWriter, load_checkpoint, save_checkpoint
+
+
+def _fsm_view(ctrl):
+    """Vergleichbare Sicht auf den FSM-Zustand (Kerzen als OHLC-Tupel)."""
+    view = {}
+    for tf in (K, B, E):
+        st = ctrl.machines[tf].state
+        view[tf] = (
+            st.current_phase, st.prev_phase, st.last_candle_ts,
+            [(c.timestamp, c.open, c.high, c.low, c.close) for c in st.last_candles],
+            st.last_confirmation_bullish.valid, st.last_confirmation_bearish.valid,
+            st.switch_bull_initial_low, st.switch_bear_initial_high,
+            st.switch_bull_pivot_idx, st.pivot_idx_bear,
+        )
+    return view
+
+
+def test_state_is_plain_json_and_round_trips(start_bot, run_minutes):
+    handler, strategies = start_bot()
+    run_minutes(handler, 120)
+    ctrl = strategies["EURUSD"].controller
+
+    state = ctrl.checkpoint_state()
+    # Nur reine Daten: muss ohne Fallbacks JSON-serialisierbar sein
+    text = json.dumps(state)
+    save_checkpoint("EURUSD", state)
+    loaded = load_checkpoint("EURUSD")
+    assert loaded == json.loads(text)
+
+    decoded = ctrl._decode_checkpoint(loaded)
+    assert decoded['phases'] == ctrl.phases
+    assert decoded['last_update_ts'] == ctrl.last_update_ts
+    assert decoded['buffer_only'] == ctrl.buffer_only
+    assert decoded['active_tf'] == ctrl.active_tf
+    for tf in (K, B, E):
+        original, restored = ctrl.machines[tf].state, decoded['fsm_states'][tf]
+        assert restored.current_phase == original.current_phase
+        assert restored.last_candle_ts == original.last_candle_ts
+        assert restored.last_candles == original.last_candles
+
+
+def test_warm_restart_restores_identical_state(start_bot, run_minutes, monkeypatch, capsys):
+    monkeypatch.setattr("core.tf_manager.CHECKPOINT_ENABLED", True)
+    handler, strategies = start_bot()
+    run_minutes(handler, 90)
+    checkpoint.writer.flush()
+    # Gepufferte (buffer-only) TFs holt der Restore nach; verglichen werden die live laufenden
+    live = {sym: [tf for tf in (K, B, E) if not s.controller.buffer_only[tf]] for sym, s in strategies.items()}
+    expected = {sym: _fsm_view(s.controller) for sym, s in strategies.items()}
+    expected_phases = {sym: dict(s.controller.phases) for sym, s in strategies.items()}
+    expected_active = {sym: s.controller.active_tf for sym, s in strategies.items()}
+
+    capsys.readouterr()
+    _, restarted = start_bot()
+    out = capsys.readouterr().out
+    assert out.count("Warm-Restart aus Checkpoint") == len(restarted)
+    for sym, s in restarted.items():
+        ctrl = s.controller
+        view = _fsm_view(ctrl)
+        for tf in live[sym]:
+            assert ctrl.phases[tf] == expected_phases[sym][tf]
+            assert view[tf] == expected[sym][tf]
+        assert ctrl.active_tf == expected_active[sym]
+
+
+def test_stale_version_and_missing_fields_are_ignored(market, capsys):
+    path = checkpoint.checkpoint_path("EURUSD")
+    save_checkpoint("EURUSD", {f: None for f in checkpoint.STATE_FIELDS})
+    assert load_checkpoint("EURUSD") is not None
+
+    with open(path) as f:
+        payload = json.load(f)
+    payload["version"] = 1
+    with open(path, "w") as f:
+        json.dump(payload, f)
+    assert load_checkpoint("EURUSD") is None
+
+    payload["version"] = checkpoint.CHECKPOINT_VERSION
+    del payload["state"]["fsm_states"]
+    with open(path, "w") as f:
+        json.dump(payload, f)
+    assert load_checkpoint("EURUSD") is None
+
+    with pytest.raises(checkpoint.CheckpointError):
+        save_checkpoint("EURUSD", {"phases": {}})
+    assert "ignoriert" in capsys.readouterr().out
+
+
+def test_schema_errors_fall_back_to_cold_start(start_bot, run_minutes, monkeypatch, capsys):
+    handler, strategies = start_bot(("EURUSD",))
+    run_minutes(handler, 30)
+    state = strategies["EURUSD"].controller.checkpoint_state()
+    state["phases"][str(K)] = "NO_SUCH_PHASE"
+    save_checkpoint("EURUSD", state)
+
+    monkeypatch.setattr("core.tf_manager.CHECKPOINT_ENABLED", True)
+    capsys.readouterr()
+    _, restarted = start_bot(("EURUSD",))
+    assert "passt nicht zum Schema" in capsys.readouterr().out
+    assert restarted["EURUSD"].controller.phases[K] == strategies["EURUSD"].controller.phases[K]
+
+
+def test_writer_coalesces_marks(market):
+    writer = CheckpointWriter(interval=60.0)
+    snapshots = []
+
+    def snapshot():
+        snapshots.append(1)
+        return {f: len(snapshots) for f in checkpoint.STATE_FIELDS}
+
+    for _ in range(100):
+        writer.mark("EURUSD", snapshot)
+    assert writer.pending() == ["EURUSD"]
+    writer.stop()
+    assert len(snapshots) == 1 and writer.writes == 1
+    assert load_checkpoint("EURUSD")["phases"] == 1
+    assert writer.pending() == []
@@ -0,0 +1,67 @@
+# tests/test_dispatch.py
+import threading
+
+import MetaTrader5 as mt5
+import pytest
+
+from core.dispatch import OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST, SymbolWorker
+from core.events import PositionClosed
+from core.position_monitor import PositionMonitor
+from sim import mt5_sim
+
+
+def _blocked_worker(overflow):
+    """Worker, dessen erstes Item bis release.set() hängt – die Inbox läuft dahinter voll."""
+    seen, release = [], threading.Event()
+
+    def handle(item):
+        if item == 'first':
+            release.wait(5)
+        seen.append(item)
+
+    worker = SymbolWorker('EURUSD', handle, maxsize=2, overflow=overflow)
+    worker.start()
+    worker.submit('first')
+    while worker.depth():
+        pass  # 'first' ist beim Handler
+    return worker, seen, release
+
+
+@pytest.mark.parametrize("overflow", [OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST])
+def test_events_are_never_dropped(overflow):
+    worker, seen, release = _blocked_worker(overflow)
+    event = PositionClosed('EURUSD', 1, 'buy', 0.1, 1.1, 1.2)
+    worker.submit('c1')
+    worker.submit_event(event)
+    worker.submit('c2')
+    accepted = worker.submit('c3')
+    release.set()
+    worker.join()
+    worker.stop()
+    assert worker.dropped == 1
+    assert accepted == (overflow == OVERFLOW_DROP_OLDEST)
+    assert event in seen
+    expected = ['first', 'c1', event, 'c2'] if overflow == OVERFLOW_DROP_NEWEST else ['first', event, 'c2', 'c3']
+    assert seen == expected
+
+
+def test_events_do_not_block_on_full_inbox():
+    worker, seen, release = _blocked_worker("block")
+    worker.submit('c1')
+    worker.submit('c2')
+    worker.submit_event('event')  # Inbox voll – darf trotzdem nicht warten
+    release.set()
+    worker.join()
+    worker.stop()
+    assert seen == ['first', 'c1', 'c2', 'event']
+
+
+def test_controller_reads_trades_from_monitor_snapshot(start_bot, run_minutes):
+    handler, _ = start_bot()
+    handler.monitor = PositionMonitor(mt5, handler.publish)
+    handler.monitor.poll()
+    before = mt5_sim.call_counts()
+    run_minutes(handler, 30)
+    after = mt5_sim.call_counts()
+    for name in ('positions_get', 'orders_get'):
+        assert after.get(name, 0) == before.get(name, 0)
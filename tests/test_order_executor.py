@@ -0,0 +1,165 @@
+# tests/test_order_executor.py
+from types import SimpleNamespace
+
+import MetaTrader5 as mt5
+import pytest
+
+from core.order_executor import OrderExecutor
+from data_handler import DataHandler, MAGIC
+
+
+def _sltp_request():
+    return {'action': mt5.TRADE_ACTION_SLTP, 'symbol': 'EURUSD', 'position': 1, 'sl': 1.0}
+
+
+def _pending_request(comment="EMA Edge Bot"):
+    return {
+        'action': mt5.TRADE_ACTION_PENDING, 'symbol': 'EURUSD', 'volume': 0.1,
+        'type': mt5.ORDER_TYPE_BUY_STOP, 'price': 1.2, 'sl': 1.1, 'magic': MAGIC, 'comment': comment,
+    }
+
+
+@pytest.fixture
+def executor(broker):
+    ex = OrderExecutor(mt5, base_delay=0.001, max_delay=0.005)
+    yield ex
+    ex.stop()
+
+
+def _scripted_send(monkeypatch, retcodes):
+    """order_send liefert nacheinander die vorgegebenen Retcodes (None = Exception), danach den Simulator."""
+    calls = []
+    real_send = mt5.order_send
+
+    def send(req):
+        calls.append(req)
+        if len(calls) <= len(retcodes):
+            rc = retcodes[len(calls) - 1]
+            if rc is None:
+                raise ConnectionError("simulierter Verbindungsabbruch")
+            if rc == 'placed-timeout':
+                real_send(req)
+                return SimpleNamespace(retcode=mt5.TRADE_RETCODE_TIMEOUT, order=0, comment="Timeout")
+            return SimpleNamespace(retcode=rc, order=0, comment="scripted")
+        return real_send(req)
+
+    monkeypatch.setattr(mt5, 'order_send', send)
+    return calls
+
+
+def test_rejected_retcode_is_retried_with_fresh_request(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, [mt5.TRADE_RETCODE_REQUOTE, mt5.TRADE_RETCODE_PRICE_CHANGED])
+    builds = []
+
+    def build():
+        builds.append(1)
+        return _pending_request()
+
+    res = executor.submit(('EURUSD', 'place', 1), build, check=False, idempotent=False).result(timeout=5)
+    assert executor.is_ok(res)
+    assert len(calls) == 3 and len(builds) == 3
+    assert len(mt5.orders_get(symbol='EURUSD')) == 1
+
+
+def test_retries_stop_after_max_attempts(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, [mt5.TRADE_RETCODE_REQUOTE] * 10)
+    res = executor.submit('k', _pending_request, check=False, max_attempts=3).result(timeout=5)
+    assert res.retcode == mt5.TRADE_RETCODE_REQUOTE
+    assert len(calls) == 3
+
+
+def test_unknown_outcome_without_recovery_is_not_resent(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, ['placed-timeout'])
+    res = executor.submit('k', _pending_request, check=False, idempotent=False).result(timeout=5)
+    assert res.retcode == mt5.TRADE_RETCODE_TIMEOUT
+    assert len(calls) == 1
+    assert len(mt5.orders_get(symbol='EURUSD')) == 1
+
+
+def test_exception_after_send_without_recovery_is_not_resent(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, [None])
+    res = executor.submit('k', _pending_request, check=False, idempotent=False).result(timeout=5)
+    assert res is None
+    assert len(calls) == 1
+
+
+def test_unknown_outcome_is_retried_for_idempotent_intents(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, [mt5.TRADE_RETCODE_TIMEOUT, mt5.TRADE_RETCODE_CONNECTION])
+    res = executor.submit('k', _sltp_request, check=False).result(timeout=5)
+    # Simulator kennt Position 1 nicht → endgültige Antwort, aber erst nach zwei Wiederholungen
+    assert res.retcode == mt5.TRADE_RETCODE_INVALID
+    assert len(calls) == 3
+
+
+def test_recover_finds_order_placed_despite_timeout(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, ['placed-timeout'])
+    comment = "EMA Edge Bot 1704283200"
+    handler = DataHandler(mt5)
+    res = executor.submit(
+        'k', lambda: _pending_request(comment), check=False, idempotent=False,
+        recover=lambda: handler.find_placed_order('EURUSD', comment)
+    ).result(timeout=5)
+    orders = mt5.orders_get(symbol='EURUSD')
+    assert len(calls) == 1
+    assert len(orders) == 1
+    assert res.retcode == mt5.TRADE_RETCODE_DONE and res.order == orders[0].ticket
+
+
+def test_recover_without_match_resends(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, [mt5.TRADE_RETCODE_TIMEOUT])
+    handler = DataHandler(mt5)
+    res = executor.submit(
+        'k', lambda: _pending_request("EMA Edge Bot 1"), check=False, idempotent=False,
+        recover=lambda: handler.find_placed_order('EURUSD', "EMA Edge Bot 1")
+    ).result(timeout=5)
+    assert executor.is_ok(res)
+    assert len(calls) == 2
+    assert len(mt5.orders_get(symbol='EURUSD')) == 1
+
+
+def test_same_key_is_sent_once(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, [])
+    first = executor.submit('k', _pending_request, check=False, delay=0.05)
+    second = executor.submit('k', _pending_request, check=False)
+    assert first is second
+    assert executor.is_ok(first.result(timeout=5))
+    # Erfolgreiche Intents bleiben gemerkt (IDEMPOTENCY_TTL)
+    assert executor.submit('k', _pending_request, check=False) is first
+    assert len(calls) == 1
+
+
+def test_forget_allows_resend(executor, monkeypatch):
+    calls = _scripted_send(monkeypatch, [])
+    first = executor.submit('k', _pending_request, check=False)
+    first.result(timeout=5)
+    executor.forget('k')
+    assert executor.submit('k', _pending_request, check=False) is not first
+    assert executor.drain(timeout=5)
+    assert len(calls) == 2
+
+
+def test_drain_waits_for_callbacks(executor, monkeypatch):
+    _scripted_send(monkeypatch, [mt5.TRADE_RETCODE_REQUOTE])
+    seen = []
+    executor.submit('k', _pending_request, check=False, on_done=seen.append)
+    assert executor.drain(timeout=5)
+    assert executor.pending() == 0
+    assert len(seen) == 1 and executor.is_ok(seen[0])
+
+
+def test_place_order_async_tags_comment_and_recovers(broker, monkeypatch):
+    broker.add_symbol('EURUSD')
+    handler = DataHandler(mt5)
+    handler.executor.base_delay = 0.001
+    calls = _scripted_send(monkeypatch, ['placed-timeout'])
+    try:
+        tick = mt5.symbol_info_tick('EURUSD')
+        res = handler.place_order_async(
+            'EURUSD', 'buy', tick.ask + 0.01, 0.1, tick.ask - 0.01, key=('EURUSD', 'place', 1), tag='1704283200'
+        ).result(timeout=5)
+    finally:
+        handler.executor.stop()
+    orders = mt5.orders_get(symbol='EURUSD')
+    assert len(calls) == 1 and len(orders) == 1
+    assert orders[0].comment == "EMA Edge Bot 1704283200"
+    assert res.order == orders[0].ticket
@@ -0,0 +1,107 @@
+# tests/test_prices.py
+from datetime import datetime, timezone
+
+import MetaTrader5 as mt5
+import pytest
+
+from core.prices import (
+    ceil_points, ceil_price, floor_points, floor_price, from_epoch, point_digits,
+    round_price, to_epoch, to_points, to_price
+)
+from core.risk_manager import RiskManager
+
+
+@pytest.mark.parametrize("point, digits", [(0.00001, 5), (0.001, 3), (0.01, 2), (0.25, 2), (1.0, 0), (0.1, 1)])
+def test_point_digits(point, digits):
+    assert point_digits(point) == digits
+
+
+def test_floor_ceil_do_not_drift_on_float_residue():
+    # 0.7 / 0.1 = 6.999999999999999 → math.floor wäre 6
+    assert floor_points(0.7, 0.1) == 7
+    assert floor_price(0.7, 0.1) == 0.7
+    # 0.3 / 0.1 = 2.9999999999999996 bzw. 1.1 / 0.1 = 11.000000000000002
+    assert ceil_points(1.1, 0.1) == 11
+    assert ceil_price(1.1, 0.1) == 1.1
+    assert floor_price(1.234567, 0.00001) == 1.23456
+    assert ceil_price(1.234561, 0.00001) == 1.23457
+
+
+def test_round_trip_has_no_float_tail():
+    point = 0.00001
+    for pts in (112345, 99999, 100000, 123456789):
+        price = to_price(pts, point)
+        assert to_points(price, point) == pts
+        assert repr(price) == repr(round(price, 5))
+    assert round_price(1.123456, 0.00001) == 1.12346
+    assert to_price(3, 0.1) == 0.3
+
+
+def test_lot_steps():
+    assert floor_price(0.29, 0.01) == 0.29
+    assert floor_price(1.005, 0.01) == 1.0
+    assert floor_price(0.57, 0.1) == 0.5
+
+
+def test_epoch_round_trip():
+    ts = datetime(2024, 3, 31, 1, 30)
+    t = to_epoch(ts)
+    assert t == int(datetime(2024, 3, 31, 1, 30, tzinfo=timezone.utc).timestamp())
+    assert from_epoch(t) == ts
+    assert from_epoch(t).tzinfo is None
+    assert to_epoch(datetime(2024, 3, 31, 3, 30, tzinfo=timezone.utc)) == t + 7200
+
+
+@pytest.fixture
+def risk(broker):
+    broker.add_symbol('EURUSD', stops_level=10)
+    # Erster Abruf erzeugt die M1-Serie; danach kommt der Bid vom Tick-Pfad
+    broker.symbol_info_tick('EURUSD')
+    return RiskManager(account_balance=10_000)
+
+
+@pytest.mark.parametrize("side", ["buy", "sell"])
+def test_clamp_trailing_sl_without_current_sl(risk, side):
+    tick = mt5.symbol_info_tick('EURUSD')
+    candidate = tick.bid - 0.002 if side == 'buy' else tick.ask + 0.002
+    sl = risk._clamp_trailing_sl('EURUSD', side, candidate, None)
+    assert sl is not None
+    assert to_points(sl, 0.00001) == (ceil_points(candidate, 0.00001) if side == 'buy' else floor_points(candidate, 0.00001))
+
+
+def test_clamp_trailing_sl_respects_progress_and_min_distance(risk):
+    tick = mt5.symbol_info_tick('EURUSD')
+    # Kein Fortschritt gegenüber dem bisherigen SL
+    assert risk._clamp_trailing_sl('EURUSD', 'buy', tick.bid - 0.002, tick.bid - 0.001) is None
+    # Kandidat zu nah am Markt → auf stops_level (10 Punkte) unter Bid geklemmt
+    sl = risk._clamp_trailing_sl('EURUSD', 'buy', tick.bid, tick.bid - 0.01)
+    assert to_points(sl, 0.00001) == to_points(tick.bid, 0.00001) - 10
+
+
+def test_candles_are_points_and_epoch_seconds(market):
+    from data_handler import DataHandler
+    handler = DataHandler(mt5)
+    try:
+        candles = handler.fetch_history('EURUSD', mt5.TIMEFRAME_M1, 30)
+        rates = mt5.copy_rates_from_pos('EURUSD', mt5.TIMEFRAME_M1, 1, 30)
+    finally:
+        handler.executor.stop()
+    point = mt5.symbol_info('EURUSD').point
+    for c, r in zip(candles, rates):
+        assert type(c.timestamp) is int and c.timestamp == int(r['time'])
+        assert all(type(v) is int for v in (c.open, c.high, c.low, c.close))
+        assert to_price(c.close, point) == round(float(r['close']), 5)
+    assert candles[-1].ema20 is not None
+    assert min(c.close for c in candles[-20:]) <= candles[-1].ema20 <= max(c.close for c in candles[-20:])
+
+
+def test_stop_manager_trails_in_points():
+    from core.stop_manager import StopManager
+    from core.types import Candle
+    stops = StopManager(1, 'buy', 1.1, 1.099, 0.0001, 0.00001, entry_ts=600)
+    stops.on_candle(Candle(660, 110000, 110310, 109990, 110300, 1))
+    assert (stops.rr, stops.extreme, stops.level) == (100, 110310, 3)
+    # Kandidat Entry + 2RR exakt als Broker-Preis, ohne Float-Rest
+    assert stops.trailing_candidate(1.099, 0) == (1.102, 3)
+    assert stops.trailing_candidate(1.102, 0) == (None, 0)
+    assert stops.on_price(110405) and stops.level == 4
@@ -0,0 +1,82 @@
+# tests/test_sessions.py
+from datetime import datetime, timezone
+
+import pytest
+
+from core.sessions import SessionCalendar
+
+
+def _utc(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.fixture
+def cal():
+    return SessionCalendar(
+        windows=("08:00-12:00", "13:00-15:00", "15:00-20:00"), tz="Europe/Berlin", days=(0, 1, 2, 3, 4),
+        market_tz="America/New_York", week_open=(6, 17, 0), week_close=(4, 17, 0),
+        holidays=("12-25", "01-01", "2024-01-02"), horizon_days=14, clock=lambda: _utc(2024, 1, 3, 12)
+    )
+
+
+def test_entry_windows_in_winter(cal):
+    # Mittwoch, Berlin = UTC+1
+    assert cal.is_trading(_utc(2024, 1, 3, 7, 0))        # 08:00 Berlin
+    assert not cal.is_trading(_utc(2024, 1, 3, 6, 59))
+    assert not cal.is_trading(_utc(2024, 1, 3, 11, 30))  # Mittagspause 12:00-13:00
+    assert cal.is_trading(_utc(2024, 1, 3, 13, 59))      # 14:59 → 15:00 lückenlos
+    assert cal.is_trading(_utc(2024, 1, 3, 14, 0))
+    assert not cal.is_trading(_utc(2024, 1, 3, 19, 0))   # 20:00 Berlin
+    assert cal.is_open(_utc(2024, 1, 3, 19, 0))
+
+
+def test_seconds_to_open(cal):
+    assert cal.seconds_to_open(_utc(2024, 1, 3, 9)) == 0.0
+    assert cal.seconds_to_open(_utc(2024, 1, 3, 6, 30)) == 1800
+    assert cal.seconds_to_open(_utc(2024, 1, 3, 6, 30, 20)) == 1780
+    assert cal.seconds_to_open(_utc(2024, 1, 3, 11, 15)) == 45 * 60
+
+
+def test_weekend_close_and_reopen(cal):
+    # Freitag 17:00 New York (EST) = 22:00 UTC, Sonntag 17:00 New York = 22:00 UTC
+    assert cal.is_open(_utc(2024, 1, 5, 21, 59))
+    assert not cal.is_open(_utc(2024, 1, 5, 22, 0))
+    assert not cal.is_open(_utc(2024, 1, 6, 12))
+    assert not cal.is_open(_utc(2024, 1, 7, 21, 59))
+    assert cal.is_open(_utc(2024, 1, 7, 22, 0))
+    # Sonntagabend offen, aber kein Entry-Fenster (SESSION_DAYS ohne Sonntag)
+    assert not cal.is_trading(_utc(2024, 1, 7, 22, 0))
+    # Samstag 12:00 UTC → Montag 08:00 Berlin (07:00 UTC)
+    assert cal.seconds_to_open(_utc(2024, 1, 6, 12)) == 43 * 3600
+
+
+def test_holidays(cal):
+    # Jährlicher Feiertag (in New York-Zeit gesperrt) und datumsgenauer Feiertag
+    assert not cal.is_open(_utc(2024, 1, 1, 12))
+    assert not cal.is_open(_utc(2024, 1, 2, 12))
+    assert not cal.is_trading(_utc(2024, 1, 2, 9))
+    assert cal.is_trading(_utc(2024, 1, 3, 9))
+    assert not cal.is_open(_utc(2024, 12, 25, 10))
+    assert cal.is_trading(_utc(2024, 12, 26, 10))
+    # Nächstes Fenster nach dem datumsgenauen Feiertag: Mittwoch 08:00 Berlin
+    assert cal.seconds_to_open(_utc(2024, 1, 2, 9)) == 22 * 3600
+
+
+def test_dst_shifts_market_and_windows(cal):
+    # USA schon auf Sommerzeit (EDT), Europa noch nicht: Freitagsschluss 21:00 UTC
+    assert cal.is_open(_utc(2024, 3, 15, 20, 59))
+    assert not cal.is_open(_utc(2024, 3, 15, 21, 0))
+    # Europa auf Sommerzeit (CEST): Fenster ab 06:00 UTC
+    assert not cal.is_trading(_utc(2024, 4, 3, 5, 59))
+    assert cal.is_trading(_utc(2024, 4, 3, 6, 0))
+    assert not cal.is_trading(_utc(2024, 4, 3, 18, 0))
+
+
+def test_default_clock_and_rebuild_outside_horizon(cal):
+    assert cal.is_trading()
+    assert cal.seconds_to_open() == 0.0
+    base = cal._maps[0]
+    # Abfrage jenseits des Horizonts baut den Kalender neu auf
+    assert cal.is_trading(_utc(2024, 6, 5, 9))
+    assert cal._maps[0] > base
+    assert not cal.is_open(_utc(2024, 6, 8, 12))
@@ -0,0 +1,150 @@
+# tests/test_sl_verification.py
+import threading
+import time
+
+import MetaTrader5 as mt5
+import pytest
+
+from core.order_executor import OrderExecutor
+from core.risk_manager import RiskManager
+from core.stop_manager import StopManager
+from data_handler import MAGIC
+
+
+def _wait(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            raise AssertionError("Bedingung nicht rechtzeitig erfüllt")
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def setup(broker):
+    broker.add_symbol('EURUSD', stops_level=10)
+    broker.symbol_info_tick('EURUSD')  # M1-Serie erzeugen
+    bid = mt5.symbol_info_tick('EURUSD').bid
+    res = mt5.order_send({
+        'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1, 'type': mt5.ORDER_TYPE_BUY,
+        'price': bid - 0.01, 'sl': bid - 0.012, 'magic': MAGIC, 'comment': 'test',
+    })
+    ticket = res.order
+    risk = RiskManager(account_balance=10_000)
+    risk.executor = OrderExecutor(mt5, base_delay=0.001, max_delay=0.005)
+    stops = StopManager(ticket, 'buy', bid - 0.01, bid - 0.012, spread=0.0001, point=0.00001)
+    stops.level = 3  # 3RR erreicht → Trailing-Kandidat bei Entry + 2RR
+    yield risk, ticket, stops
+    risk.executor.stop()
+
+
+def _expectation(risk, ticket):
+    with risk._pending_lock:
+        exp = risk.pending_sl.get(ticket)
+        return exp is not None and exp.sl is not None
+
+
+def _trail(risk, ticket, stops):
+    pos = mt5.positions_get(ticket=ticket)[0]
+    fut = risk.try_trailing('EURUSD', 'buy', pos.sl, ticket, stops)
+    assert fut is not None
+    _wait(lambda: _expectation(risk, ticket))
+    return fut
+
+
+def test_verified_sl_resolves_future_and_level(setup):
+    risk, ticket, stops = setup
+    fut = _trail(risk, ticket, stops)
+    assert not fut.done()
+    # Solange die Erwartung offen ist, kein zweites Update
+    assert risk.try_trailing('EURUSD', 'buy', None, ticket, stops) is None
+
+    risk.verify_pending(mt5.positions_get(symbol='EURUSD'))
+    pos = mt5.positions_get(ticket=ticket)[0]
+    assert fut.result(timeout=1) == pos.sl
+    assert risk.trailing_levels[ticket] == 3
+    assert ticket not in risk.pending_sl
+
+
+def test_float_noise_in_broker_sl_still_verifies(setup, broker):
+    risk, ticket, stops = setup
+    fut = _trail(risk, ticket, stops)
+    expected = risk.pending_sl[ticket].sl
+    # Broker meldet den SL mit Rest unterhalb eines halben Punkts
+    broker._broker.positions[ticket].sl = expected + 2e-7
+    risk.verify_pending(mt5.positions_get(symbol='EURUSD'))
+    assert fut.result(timeout=1) == expected
+    assert risk.trailing_levels[ticket] == 3
+
+
+def test_mismatch_triggers_single_retry(setup, broker):
+    risk, ticket, stops = setup
+    fut = _trail(risk, ticket, stops)
+    # Broker hat den SL nicht übernommen
+    broker._broker.positions[ticket].sl = 0.5
+    risk.verify_pending(mt5.positions_get(symbol='EURUSD'))
+    assert not fut.done()
+    _wait(lambda: _expectation(risk, ticket))
+
+    retry_sl = risk.pending_sl[ticket].sl
+    assert mt5.positions_get(ticket=ticket)[0].sl == retry_sl
+    # Auch der Retry wird überschrieben → kein weiterer Versuch
+    broker._broker.positions[ticket].sl = 0.5
+    risk.verify_pending(mt5.positions_get(symbol='EURUSD'))
+    assert fut.result(timeout=1) is None
+    assert ticket not in risk.pending_sl
+
+
+def test_retry_success_resolves_with_retry_sl(setup, broker):
+    risk, ticket, stops = setup
+    fut = _trail(risk, ticket, stops)
+    broker._broker.positions[ticket].sl = 0.5
+    risk.verify_pending(mt5.positions_get(symbol='EURUSD'))
+    _wait(lambda: _expectation(risk, ticket))
+    retry_sl = risk.pending_sl[ticket].sl
+    risk.verify_pending(mt5.positions_get(symbol='EURUSD'))
+    assert fut.result(timeout=1) == retry_sl
+
+
+def test_closed_position_resolves_none(setup):
+    risk, ticket, stops = setup
+    fut = _trail(risk, ticket, stops)
+    risk.verify_pending([])
+    assert fut.result(timeout=1) is None
+    assert ticket not in risk.pending_sl
+
+
+def test_drop_ticket_resolves_open_expectation(setup):
+    risk, ticket, stops = setup
+    fut = _trail(risk, ticket, stops)
+    risk.drop_ticket(ticket)
+    assert fut.result(timeout=1) is None
+
+
+def test_verify_races_with_executor_callbacks(setup):
+    """Sent-Callbacks (Executor-Thread) und verify_pending (Controller-Thread) laufen parallel."""
+    risk, ticket, stops = setup
+    stop = threading.Event()
+    errors = []
+
+    def verifier():
+        while not stop.is_set():
+            try:
+                risk.verify_pending(mt5.positions_get(symbol='EURUSD'))
+            except Exception as e:  # z.B. "dictionary changed size during iteration"
+                errors.append(e)
+                return
+
+    t = threading.Thread(target=verifier)
+    t.start()
+    try:
+        for level in range(3, 40):
+            stops.level = level
+            pos = mt5.positions_get(ticket=ticket)[0]
+            fut = risk.try_trailing('EURUSD', 'buy', pos.sl, ticket, stops)
+            if fut is not None:
+                fut.result(timeout=5)
+    finally:
+        stop.set()
+        t.join()
+    assert not errors
+    assert ticket not in risk.pending_sl
@@ -0,0 +1,68 @@
+# tests/test_startup.py
+import pickle
+
+import MetaTrader5 as mt5
+import pytest
+
+from data_handler import DataHandler, MAGIC
+from sharded_runtime import _trades_to_ns
+
+# startup/strategy importieren core.tf_manager, das beim Import summary_log.csv im
+# Arbeitsverzeichnis anlegt – daher erst im Test (nach chdir in tmp_path durch market)
+
+
+def _open(symbol, magic=MAGIC):
+    tick = mt5.symbol_info_tick(symbol)
+    res = mt5.order_send({
+        'action': mt5.TRADE_ACTION_DEAL, 'symbol': symbol, 'volume': 0.1, 'type': mt5.ORDER_TYPE_BUY,
+        'price': tick.ask, 'magic': magic, 'comment': 'test',
+    })
+    return res.order
+
+
+@pytest.fixture
+def handler(market):
+    h = DataHandler(mt5)
+    h.dispatch_mode = "inline"
+    h.monitor = None
+    yield h
+    h.executor.stop()
+
+
+def test_stale_trades_grouped_per_symbol_and_picklable(handler):
+    from startup import StartupOrchestrator
+    eur, gbp = _open('EURUSD'), _open('GBPUSD')
+    _open('EURUSD', magic=1)  # fremde Position bleibt außen vor
+    stale = StartupOrchestrator(handler, ['EURUSD', 'GBPUSD']).stale_trades()
+    assert [p.ticket for p in stale['EURUSD'][1]] == [eur]
+    assert [p.ticket for p in stale['GBPUSD'][1]] == [gbp]
+    shipped = pickle.loads(pickle.dumps(_trades_to_ns(stale['EURUSD'])))
+    assert [p.ticket for p in shipped[1]] == [eur]
+
+
+def test_initialize_without_snapshot_only_cleans_own_symbol(handler):
+    from strategy import TradingStrategy
+    eur = _open('EURUSD')
+    _open('GBPUSD')
+    info = mt5.symbol_info('GBPUSD')
+    TradingStrategy('GBPUSD', handler, 10_000, info.point, info.spread * info.point).start()
+    assert [p.ticket for p in mt5.positions_get()] == [eur]
+
+
+def test_worker_start_keeps_other_workers_trades(handler):
+    from startup import StartupOrchestrator
+    from strategy import TradingStrategy
+    # Worker-Start wie in sharded_runtime: nur die eigenen Symbole aus dem Snapshot
+    _open('EURUSD')
+    _open('GBPUSD')
+    stale = StartupOrchestrator(handler, ['EURUSD', 'GBPUSD']).stale_trades()
+    info = mt5.symbol_info('EURUSD')
+    TradingStrategy('EURUSD', handler, 10_000, info.point, info.spread * info.point).start(
+        stale_trades=_trades_to_ns(stale['EURUSD'])
+    )
+    late = _open('EURUSD')  # nach dem Start eines anderen Workers eröffnet
+    info = mt5.symbol_info('GBPUSD')
+    TradingStrategy('GBPUSD', handler, 10_000, info.point, info.spread * info.point).start(
+        stale_trades=_trades_to_ns(stale['GBPUSD'])
+    )
+    assert [p.ticket for p in mt5.positions_get()] == [late]